@@ -76,6 +76,14 @@ class AttributeAdmin(GuardedModelAdmin):
 admin.site.register(models.Attribute, AttributeAdmin)
 
 
+class SavedQueryAdmin(GuardedModelAdmin):
+    list_display = ("name", "resource_name", "query", "version", "site")
+    list_filter = ("resource_name", "site")
+
+
+admin.site.register(models.SavedQuery, SavedQueryAdmin)
+
+
 class ValueAdmin(GuardedModelAdmin):
     list_display = ("name", "value", "resource_name", "resource_id")
     list_filter = ("name", "value", "resource_name")
@@ -3,7 +3,8 @@ import logging
 import django_filters
 from django.db.models import Q
 
-from .. import models
+from .. import exc, models, validators
+from ..models.attribute_backend import attribute_q
 from ..util import qpbool
 
 log = logging.getLogger(__name__)
@@ -93,214 +94,16 @@ class ResourceFilter(django_filters.rest_framework.FilterSet):
         for attribute in attributes:
             attr_name, _, attr_value = attribute.partition("=")
 
-            # Retrieve next set of objects with explicit matches.
-            explicit_ids = set(
-                models.Value.objects.filter(
-                    name=attr_name,
-                    value=attr_value,
-                    resource_name=resource_name,
-                ).values_list("resource_id", flat=True)
-            )
+            # Explicit matches, plus resources that have the value as their
+            # effective value for an inheritable attribute (which includes
+            # both explicit and inherited values).
+            effective_ids = models.EffectiveValue.objects.filter(
+                name=attr_name, value=attr_value, resource_name=resource_name
+            ).values_list("resource_id", flat=True)
 
-            matching_ids = set(explicit_ids)
-
-            # Check if this attribute is inheritable and expand to descendants.
-            try:
-                # Derive site from the queryset (all resources share a site).
-                site_id = None
-                request = getattr(self, "request", None)
-                if request is None:
-                    site_value = self.data.get("site_pk") or self.data.get(
-                        "site_id"
-                    )
-                    if site_value:
-                        site_id = int(site_value)
-                if site_id is None and request is not None:
-                    # Try from view kwargs
-                    view_obj = getattr(request, "parser_context", {}).get(
-                        "view"
-                    )
-                    if view_obj:
-                        site_id = view_obj.kwargs.get("site_pk")
-                if site_id is None:
-                    # Last resort: peek at queryset
-                    first = queryset.first()
-                    if first:
-                        site_id = first.site_id
-
-                if site_id is not None:
-                    attr_obj = models.Attribute.objects.filter(
-                        name=attr_name,
-                        resource_name=resource_name,
-                        site_id=site_id,
-                        inheritable=True,
-                    ).first()
-
-                    if attr_obj is not None and hasattr(
-                        queryset.model, "get_descendants"
-                    ):
-                        # For each explicit match, get its descendants.
-                        explicit_resources = queryset.model.objects.filter(
-                            id__in=explicit_ids
-                        )
-                        descendant_ids = set()
-                        for resource in explicit_resources:
-                            descendant_ids.update(
-                                resource.get_descendants().values_list(
-                                    "id", flat=True
-                                )
-                            )
-
-                        # Exclude descendants that have their own explicit
-                        # value for this attribute (they override).
-                        # For multi-value attributes, a resource that has
-                        # BOTH the matching value and a different value is
-                        # NOT an overrider — it still matches.  Only
-                        # resources that have a value for this attribute
-                        # but do NOT have the queried value are overriders.
-                        descendants_with_attr = set(
-                            models.Value.objects.filter(
-                                name=attr_name,
-                                resource_name=resource_name,
-                                resource_id__in=descendant_ids,
-                            ).values_list("resource_id", flat=True)
-                        )
-                        descendants_with_match = set(
-                            models.Value.objects.filter(
-                                name=attr_name,
-                                resource_name=resource_name,
-                                resource_id__in=descendant_ids,
-                                value=attr_value,
-                            ).values_list("resource_id", flat=True)
-                        )
-                        # Set difference: resources that have this attr
-                        # but NOT with the queried value. These are
-                        # "overriders" — children that set their own
-                        # different value, breaking the inheritance chain.
-                        #
-                        # Example: root has region=us-west, child has
-                        # region=us-east → child is an overrider.
-                        # But if child has region=us-west too (multi),
-                        # it's NOT an overrider (it still matches).
-                        overrider_ids = (
-                            descendants_with_attr - descendants_with_match
-                        )
-
-                        # Recursively exclude the entire subtree below
-                        # each overrider, since those descendants inherit
-                        # the overrider's value, not the original.
-                        # E.g. if B overrides A's region, then B's
-                        # children C, D also inherit B's value, not A's.
-                        overrider_subtree_ids = set()
-                        overrider_resources = queryset.model.objects.filter(
-                            id__in=overrider_ids
-                        )
-                        for overrider in overrider_resources:
-                            overrider_subtree_ids.update(
-                                overrider.get_descendants().values_list(
-                                    "id", flat=True
-                                )
-                            )
-
-                        # Re-override check: within the excluded subtrees,
-                        # find any descendant that sets the attr BACK to
-                        # the queried value. These "re-overriders" restart
-                        # the inheritance chain for their own subtree.
-                        #
-                        # Example: A(us-west) → B(us-east) → C(us-west)
-                        # B is an overrider, but C re-overrides back to
-                        # us-west, so C and C's children should match.
-                        re_overrider_ids = set(
-                            models.Value.objects.filter(
-                                name=attr_name,
-                                resource_name=resource_name,
-                                resource_id__in=overrider_subtree_ids,
-                                value=attr_value,
-                            ).values_list("resource_id", flat=True)
-                        )
-                        re_overrider_subtree_ids = set()
-                        if re_overrider_ids:
-                            for ro in queryset.model.objects.filter(
-                                id__in=re_overrider_ids
-                            ):
-                                ro_descendants = set(
-                                    ro.get_descendants().values_list(
-                                        "id", flat=True
-                                    )
-                                )
-                                # Apply the same overrider-exclusion
-                                # logic: exclude descendants that have
-                                # their own explicit override to a
-                                # DIFFERENT value within these subtrees.
-                                ro_desc_with_attr = set(
-                                    models.Value.objects.filter(
-                                        name=attr_name,
-                                        resource_name=resource_name,
-                                        resource_id__in=ro_descendants,
-                                    ).values_list("resource_id", flat=True)
-                                )
-                                ro_desc_with_match = set(
-                                    models.Value.objects.filter(
-                                        name=attr_name,
-                                        resource_name=resource_name,
-                                        resource_id__in=ro_descendants,
-                                        value=attr_value,
-                                    ).values_list("resource_id", flat=True)
-                                )
-                                ro_overriders = (
-                                    ro_desc_with_attr - ro_desc_with_match
-                                )
-                                ro_overrider_subtrees = set()
-                                for roo in queryset.model.objects.filter(
-                                    id__in=ro_overriders
-                                ):
-                                    ro_overrider_subtrees.update(
-                                        roo.get_descendants().values_list(
-                                            "id", flat=True
-                                        )
-                                    )
-                                re_overrider_subtree_ids.update(
-                                    ro_descendants
-                                    - ro_overriders
-                                    - ro_overrider_subtrees
-                                )
-
-                        # Final set assembly:
-                        #
-                        #   explicit_ids         — resources that explicitly
-                        #                          have the queried attr=value
-                        #
-                        #   descendant_ids        — ALL descendants of explicit
-                        #     - overrider_ids       matches, MINUS overriders
-                        #     - overrider_subtree_ids (different value) and
-                        #                          their subtrees
-                        #
-                        #   re_overrider_ids      — descendants within excluded
-                        #   re_overrider_subtree_ids subtrees that set the value
-                        #                          BACK to the queried value,
-                        #                          plus THEIR subtrees
-                        #
-                        # This produces the complete set of resources that
-                        # either explicitly have the value OR would inherit
-                        # it from an ancestor through the parent chain.
-                        matching_ids = (
-                            explicit_ids
-                            | (
-                                descendant_ids
-                                - overrider_ids
-                                - overrider_subtree_ids
-                            )
-                            | re_overrider_ids
-                            | re_overrider_subtree_ids
-                        )
-            except ValueError:
-                log.warning(
-                    "Inheritance expansion failed for %r, using explicit only",
-                    attr_name,
-                    exc_info=True,
-                )
-
-            next_set = Q(id__in=matching_ids)
+            next_set = attribute_q(queryset.model, attr_name, attr_value) | Q(
+                id__in=effective_ids
+            )
             queryset = queryset.filter(next_set)
 
         return queryset
@@ -399,6 +202,7 @@ class InterfaceFilter(ResourceFilter):
     """
 
     mac_address = django_filters.CharFilter(method="filter_mac_address")
+    address_within = django_filters.CharFilter(method="filter_address_within")
 
     class Meta:
         model = models.Interface
@@ -415,6 +219,7 @@ class InterfaceFilter(ResourceFilter):
             "description",
             "parent_id",
             "attributes",
+            "address_within",
             "device_hostname",
             "expired",
             "expires_before",
@@ -430,6 +235,28 @@ class InterfaceFilter(ResourceFilter):
         """
         return queryset.filter(mac_address=value)
 
+    def filter_address_within(self, queryset, name, value):
+        """
+        Filter to Interfaces with an address inside the CIDR ``value``, using
+        a range query on the addresses of their assignments.
+        """
+        if not value:
+            return queryset
+
+        try:
+            cidr = validators.validate_cidr(value)
+        except exc.ValidationError:
+            raise exc.ValidationError(
+                {name: "%r is not a valid IPv4 or IPv6 network." % value}
+            )
+
+        assignments = models.Assignment.objects.filter(
+            address__ip_version=str(cidr.version),
+            address__network_address__gte=str(cidr.network_address),
+            address__network_address__lte=str(cidr.broadcast_address),
+        )
+        return queryset.filter(id__in=assignments.values("interface_id"))
+
 
 class CircuitFilter(ResourceFilter):
     """Filter for Circuit objects."""
@@ -5,6 +5,7 @@ from collections import OrderedDict
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Manager
 from rest_flex_fields.serializers import FlexFieldsSerializerMixin
 from rest_framework import fields, serializers
 from rest_framework import validators as drf_validators
@@ -15,6 +16,7 @@ from nsot.vendor.rest_framework_bulk import (
 )
 
 from .. import exc, models, validators
+from ..models import constants
 from ..util import get_field_attr
 from . import auth
 
@@ -559,6 +561,53 @@ class AttributeUpdateSerializer(
         )
 
 
+############
+# SavedQuery
+############
+class SavedQuerySerializer(NsotSerializer):
+    """Used for GET, DELETE on SavedQueries."""
+
+    site_id = serializers.IntegerField(
+        read_only=True,
+        label=get_field_attr(models.SavedQuery, "site", "verbose_name"),
+        help_text=get_field_attr(models.SavedQuery, "site", "help_text"),
+    )
+
+    class Meta:
+        model = models.SavedQuery
+        exclude = ["site"]
+
+
+class SavedQueryCreateSerializer(WriteSerializerMixin, SavedQuerySerializer):
+    """Used for POST on SavedQueries."""
+
+    read_serializer_class = SavedQuerySerializer
+
+    site_id = fields.IntegerField(
+        label=get_field_attr(models.SavedQuery, "site", "verbose_name"),
+        help_text=get_field_attr(models.SavedQuery, "site", "help_text"),
+    )
+
+    class Meta:
+        model = models.SavedQuery
+        fields = ("name", "description", "resource_name", "query", "site_id")
+
+
+class SavedQueryUpdateSerializer(
+    BulkSerializerMixin, SavedQueryCreateSerializer
+):
+    """
+    Used for PUT, PATCH on SavedQueries.
+
+    The name, resource_name and site of a SavedQuery may not be changed.
+    """
+
+    class Meta:
+        model = models.SavedQuery
+        list_serializer_class = BulkListSerializer
+        fields = ("id", "description", "query")
+
+
 ############
 # Assignment
 ############
@@ -611,7 +660,7 @@ class ValueSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.Value
-        exclude = ["site"]
+        exclude = ["site", *constants.TYPED_VALUE_FIELDS]
 
 
 class ValueCreateSerializer(ValueSerializer):
@@ -650,9 +699,26 @@ class ResourceSerializer(NsotSerializer):
     def get_merged_attributes(self, obj):
         """Return merged attributes if ``?include_inherited=true``."""
         request = self.context.get("request")
-        if request and request.query_params.get("include_inherited") == "true":
-            return obj.get_merged_attributes()
-        return None
+        if not (
+            request and request.query_params.get("include_inherited") == "true"
+        ):
+            return None
+
+        # When serializing a list, resolve the whole list at once and reuse
+        # the results for each object.
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            merged = getattr(parent, "_merged_attributes", None)
+            if merged is None:
+                objects = parent.instance
+                if isinstance(objects, Manager):
+                    objects = objects.all()
+                merged = obj.get_merged_attributes_bulk(objects or [])
+                parent._merged_attributes = merged
+            if obj.id in merged:
+                return merged[obj.id]
+
+        return obj.get_merged_attributes()
 
     def create(self, validated_data, commit=True):
         """Create that is aware of attributes."""
@@ -707,7 +773,7 @@ class DeviceSerializer(ResourceSerializer):
 
     class Meta:
         model = models.Device
-        exclude = ["_attributes_cache", "site"]
+        exclude = ["_attributes_cache", "site", "version"]
         expandable_fields = {
             "site_id": (
                 "nsot.api.serializers.SiteSerializer",
@@ -783,7 +849,7 @@ class NetworkSerializer(ResourceSerializer):
 
     class Meta:
         model = models.Network
-        exclude = ["_attributes_cache", "broadcast_address", "site"]
+        exclude = ["_attributes_cache", "broadcast_address", "site", "version"]
         expandable_fields = {
             "site_id": (
                 "nsot.api.serializers.SiteSerializer",
@@ -905,6 +971,7 @@ class InterfaceSerializer(ResourceSerializer):
             "_addresses_cache",
             "_networks_cache",
             "site",
+            "version",
         ]
         expandable_fields = {
             "device": ("nsot.api.serializers.DeviceSerializer", {}),
@@ -983,6 +1050,44 @@ class InterfaceSerializer(ResourceSerializer):
         return obj
 
 
+class InterfaceBulkListSerializer(BulkListSerializer):
+    """
+    Used to create or update many Interfaces at once, assigning the addresses
+    of all of them together.
+    """
+
+    def create(self, validated_data):
+        addresses = [attrs.pop("addresses", []) for attrs in validated_data]
+        objects = super().create(validated_data)
+
+        try:
+            models.Interface.objects.assign_addresses(
+                dict(zip(objects, addresses, strict=True))
+            )
+        except exc.ValidationError:
+            for obj in objects:
+                obj.delete()
+            raise
+
+        return objects
+
+    def update(self, queryset, all_validated_data):
+        # Existing assignments are purged by each Interface's update, and the
+        # new ones are then made all at once.
+        addresses = {}
+        for attrs in all_validated_data:
+            if attrs.get("addresses") is not None:
+                addresses[attrs["id"]] = attrs["addresses"]
+                attrs["addresses"] = []
+
+        objects = super().update(queryset, all_validated_data)
+        models.Interface.objects.assign_addresses(
+            {obj: addresses[obj.id] for obj in objects if obj.id in addresses}
+        )
+
+        return objects
+
+
 class InterfaceTypeField(serializers.Field):
     """Accepts integer type IDs or string type names (e.g. 6 or "ethernet")."""
 
@@ -1045,6 +1150,7 @@ class InterfaceCreateSerializer(WriteSerializerMixin, InterfaceSerializer):
 
     class Meta:
         model = models.Interface
+        list_serializer_class = InterfaceBulkListSerializer
         fields = (
             "device",
             "name",
@@ -1067,7 +1173,7 @@ class InterfacePartialUpdateSerializer(
 
     class Meta:
         model = models.Interface
-        list_serializer_class = BulkListSerializer
+        list_serializer_class = InterfaceBulkListSerializer
         fields = (
             "id",
             "name",
@@ -1108,7 +1214,7 @@ class CircuitSerializer(ResourceSerializer):
 
     class Meta:
         model = models.Circuit
-        exclude = ["_attributes_cache", "site"]
+        exclude = ["_attributes_cache", "site", "version"]
         expandable_fields = {
             "site_id": (
                 "nsot.api.serializers.SiteSerializer",
@@ -1251,7 +1357,7 @@ class ProtocolSerializer(ResourceSerializer):
 
     class Meta:
         model = models.Protocol
-        exclude = ["_attributes_cache"]
+        exclude = ["_attributes_cache", "version"]
         expandable_fields = {
             "site": (
                 "nsot.api.serializers.SiteSerializer",
@@ -1371,6 +1477,18 @@ class ProtocolUpdateSerializer(ProtocolPartialUpdateSerializer):
         extra_kwargs = {"attributes": {"required": True}}
 
 
+########
+# Bundle
+########
+class DeviceBundleSerializer(serializers.Serializer):
+    """Used for GET on Device bundles."""
+
+    device = DeviceSerializer(read_only=True)
+    interfaces = InterfaceSerializer(many=True, read_only=True)
+    circuits = CircuitSerializer(many=True, read_only=True)
+    protocols = ProtocolSerializer(many=True, read_only=True)
+
+
 ###########
 # AuthToken
 ###########
@@ -1,9 +1,12 @@
+import json
 import logging
 from collections import OrderedDict, namedtuple
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import (
     mixins,
@@ -20,7 +23,9 @@ from rest_framework.views import APIView
 from nsot.vendor.rest_framework_bulk import mixins as bulk_mixins
 
 from .. import exc, models
-from ..util import cidr_to_dict, qpbool
+from ..models import attribute_operations, bundle, cascade, topology
+from ..models.interface import deferred_address_refresh
+from ..util import cidr_to_dict, mac_to_int, qpbool
 from . import auth, filters, serializers
 
 log = logging.getLogger(__name__)
@@ -359,11 +364,11 @@ class NsotViewSet(BaseNsotViewSet, viewsets.ModelViewSet):
             queryset = queryset.filter(site=site_pk)
 
         # Look up all objects and check permissions
+        found = queryset.in_bulk(ids)
         objects = []
         for id_ in ids:
-            try:
-                obj = queryset.get(pk=id_)
-            except exc.ObjectDoesNotExist:
+            obj = found.get(id_)
+            if obj is None:
                 self.not_found(id_, site_pk)
 
             self.check_object_permissions(request, obj)
@@ -372,11 +377,20 @@ class NsotViewSet(BaseNsotViewSet, viewsets.ModelViewSet):
         # Perform deletion atomically so partial failures don't leave
         # the database in a half-deleted state.
         with transaction.atomic():
-            for obj in objects:
-                self.perform_destroy(obj)
+            self.perform_bulk_destroy(objects)
 
         return Response(status=status_codes.HTTP_204_NO_CONTENT)
 
+    def perform_bulk_destroy(self, objects):
+        """
+        Delete many objects at once.
+
+        :param objects:
+            List of model instances to delete
+        """
+        for obj in objects:
+            self.perform_destroy(obj)
+
 
 class SiteViewSet(NsotViewSet):
     """
@@ -422,15 +436,158 @@ class ResourceViewSet(
     Resource views that include set query list endpoints.
     """
 
+    def get_object(self):
+        """
+        Enhanced default to support optimistic concurrency control.
+
+        Resources are returned with an ``ETag`` header that changes whenever
+        they do. An object being updated is locked until the update is
+        committed, and if the ``If-Match`` request header is set, it must match
+        the current ``ETag`` of the object.
+        """
+        updating = self.action in ("update", "partial_update")
+        if updating:
+            self.queryset = self.queryset.select_for_update()
+
+        obj = super().get_object()
+        etag = getattr(obj, "etag", None)
+        if etag is None:
+            return obj
+
+        if self.action == "retrieve":
+            self.headers["ETag"] = etag
+        elif updating:
+            if_match = self.request.headers.get("If-Match")
+            if if_match is not None:
+                tags = [tag.strip() for tag in if_match.split(",")]
+                if "*" not in tags and etag not in tags:
+                    raise exc.PreconditionFailed(
+                        "%s has been modified. Its current ETag is %s."
+                        % (self.model_name, etag)
+                    )
+
+        return obj
+
+    def update(self, request, *args, **kwargs):
+        # Hold the lock taken by get_object() until the update is committed.
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        etag = getattr(serializer.instance, "etag", None)
+        if etag is not None:
+            self.headers["ETag"] = etag
+
+    def perform_destroy(self, instance):
+        """
+        Overload default to delete objects and everything that cascades from
+        them using set-based queries where possible.
+
+        :param instance:
+            Model instance to delete
+        """
+        if self.queryset.model in cascade.CASCADE_MODELS:
+            self.perform_bulk_destroy([instance])
+        else:
+            super().perform_destroy(instance)
+
+    def perform_bulk_destroy(self, objects):
+        """
+        Overload default to delete all of the objects in one go, along with
+        everything that cascades from them.
+
+        :param objects:
+            List of model instances to delete
+        """
+        model = self.queryset.model
+        if model not in cascade.CASCADE_MODELS:
+            super().perform_bulk_destroy(objects)
+            return
+
+        log.debug("ResourceViewSet.perform_bulk_destroy() %r", objects)
+        try:
+            cascade.delete_cascade(
+                model, [obj.id for obj in objects], user=self.request.user
+            )
+        except exc.ProtectedError as err:
+            raise exc.Conflict(err.args[0])
+
     @action(methods=["get"], detail=False)
     def query(self, request, site_pk=None, *args, **kwargs):
         """Perform a set query."""
         query = request.query_params.get("query", "")
         unique = qpbool(request.query_params.get("unique", False))
-        qs = self.queryset.set_query(query, site_id=site_pk, unique=unique)
+        qs = self.queryset.cached_set_query(
+            query, site_id=site_pk, unique=unique
+        )
         objects = self.filter_queryset(qs)
         return self.list(request, queryset=objects, *args, **kwargs)
 
+    @action(methods=["get"], detail=False)
+    def facets(self, request, site_pk=None, *args, **kwargs):
+        """
+        Return counts of each value of attributes, most common first.
+
+        Pass one or more ``attribute`` params to choose the attributes
+        (defaults to all), and ``query`` to only count the results of a set
+        query. Results are cached until the attributes involved change.
+        """
+        if not hasattr(self.queryset, "facets"):
+            raise exc.BadRequest("Facets are not supported for this resource.")
+
+        if site_pk is None:
+            site_pk = request.query_params.get("site_id")
+        names = request.query_params.getlist("attribute")
+        query = request.query_params.get("query")
+
+        facets = self.queryset.model.objects.site_facets(
+            site_pk, names=names, query=query
+        )
+        return self.success(facets)
+
+    @action(methods=["post"], detail=False)
+    def bulk_attributes(self, request, site_pk=None, *args, **kwargs):
+        """
+        Update attributes of every object matching a set query at once.
+
+        The payload has a ``query`` and any of ``set`` (attribute values to
+        set), ``append`` (values to add to multi-value attributes) and
+        ``delete`` (attribute names to remove). Returns the IDs of the objects
+        that changed.
+        """
+        if not hasattr(self.queryset, "bulk_update_attributes"):
+            raise exc.BadRequest(
+                "Bulk attribute updates are not supported for this resource."
+            )
+
+        data = request.data
+        query = data.get("query")
+        if not query:
+            raise exc.ValidationError({"query": "A query is required."})
+        if site_pk is None:
+            site_pk = data.get("site_id")
+
+        delete = data.get("delete") or []
+        if not isinstance(delete, list):
+            raise exc.ValidationError(
+                {"delete": "Expected a list of attribute names."}
+            )
+
+        with transaction.atomic():
+            objects = self.queryset.set_query(query, site_id=site_pk)
+            changed_ids = objects.bulk_update_attributes(
+                set_values=data.get("set"),
+                append=data.get("append"),
+                delete=delete,
+            )
+            changed = self.queryset.model.objects.filter(id__in=changed_ids)
+            models.Change.bulk_record(
+                changed.order_by("id"), user=request.user, event="Update"
+            )
+
+        return self.success(sorted(changed_ids))
+
     def get_resource_object(self, pk, site_pk):
         """Return a resource object based on pk or site_pk."""
         # FIXME(jathan): Revisit this after we've seen if we can need to get
@@ -466,6 +623,110 @@ class AttributeViewSet(ResourceViewSet):
             return serializers.AttributeUpdateSerializer
         return self.serializer_class
 
+    def run_operation(self, operation, pk, site_pk, *args):
+        """
+        Run an attribute-wide ``operation`` on the Attribute ``pk``, and
+        return it along with the number of resources updated.
+        """
+        attribute = self.get_resource_object(pk, site_pk)
+        chunk_size = self.request.data.get(
+            "chunk_size", attribute_operations.CHUNK_SIZE
+        )
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise exc.ValidationError(
+                {"chunk_size": "Expected a positive integer."}
+            )
+
+        try:
+            updated = operation(attribute, *args, chunk_size=chunk_size)
+        except exc.DjangoValidationError as err:
+            raise exc.ValidationError(err.message_dict)
+
+        if operation is not attribute_operations.backfill_default:
+            models.Change.objects.create(
+                obj=attribute, user=self.request.user, event="Update"
+            )
+
+        serializer = self.serializer_class(attribute)
+        return self.success({"updated": updated, "data": serializer.data})
+
+    @action(methods=["post"], detail=True)
+    def backfill(self, request, pk=None, site_pk=None, *args, **kwargs):
+        """Set the default value on every resource that lacks it."""
+        return self.run_operation(
+            attribute_operations.backfill_default, pk, site_pk
+        )
+
+    @action(methods=["post"], detail=True)
+    def rename(self, request, pk=None, site_pk=None, *args, **kwargs):
+        """Rename the attribute and all of its values."""
+        name = request.data.get("name")
+        if not name:
+            raise exc.ValidationError({"name": "A new name is required."})
+        return self.run_operation(
+            attribute_operations.rename_attribute, pk, site_pk, name
+        )
+
+    @action(methods=["post"], detail=True)
+    def convert(self, request, pk=None, site_pk=None, *args, **kwargs):
+        """Convert the attribute between single and multi-valued."""
+        multi = request.data.get("multi")
+        if not isinstance(multi, bool):
+            raise exc.ValidationError({"multi": "Expected a boolean."})
+        return self.run_operation(
+            attribute_operations.convert_attribute, pk, site_pk, multi
+        )
+
+
+class SavedQueryViewSet(NsotBulkUpdateModelMixin, NsotViewSet):
+    """
+    API endpoint that allows SavedQueries to be viewed or edited.
+
+    The results of a SavedQuery are materialized and kept up to date as
+    attribute values change, and may be retrieved from the ``members``
+    endpoint without re-evaluating the set query.
+    """
+
+    queryset = models.SavedQuery.objects.all()
+    serializer_class = serializers.SavedQuerySerializer
+    filterset_fields = ("name", "resource_name")
+
+    def get_serializer_class(self):
+        if self.request.method == "POST":
+            return serializers.SavedQueryCreateSerializer
+        if self.request.method in ("PUT", "PATCH"):
+            return serializers.SavedQueryUpdateSerializer
+        return self.serializer_class
+
+    @action(methods=["get"], detail=True)
+    def members(self, request, pk=None, site_pk=None, *args, **kwargs):
+        """
+        Return the IDs of the resources currently matching this SavedQuery.
+
+        The response includes an ``ETag`` header that changes only when the
+        membership changes. If the ``If-None-Match`` request header matches
+        it, a ``304 Not Modified`` is returned without a body.
+        """
+        saved_query = self.get_object()
+        etag = saved_query.etag
+        headers = {"ETag": etag}
+
+        if request.headers.get("If-None-Match") == etag:
+            return Response(
+                status=status_codes.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+
+        return self.success(saved_query.get_member_ids(), headers=headers)
+
+    @action(methods=["post"], detail=True)
+    def refresh(self, request, pk=None, site_pk=None, *args, **kwargs):
+        """Fully re-evaluate the query and rebuild the membership."""
+        saved_query = self.get_object()
+        saved_query.refresh()
+        return self.success(
+            saved_query.get_member_ids(), headers={"ETag": saved_query.etag}
+        )
+
 
 class DeviceViewSet(ResourceViewSet):
     """
@@ -502,11 +763,39 @@ class DeviceViewSet(ResourceViewSet):
             **kwargs,
         )
 
+    @action(methods=["get"], detail=True)
+    def interface_tree(self, request, pk=None, site_pk=None, *args, **kwargs):
+        """
+        Return all interfaces for this Device nested by parent, each with a
+        list of its ``children``.
+        """
+        device = self.get_resource_object(pk, site_pk)
+        interfaces = device.interfaces.select_related(
+            "device", "parent"
+        ).order_by("name", "id")
+        serializer = serializers.InterfaceSerializer(
+            interfaces, many=True, context=self.get_serializer_context()
+        )
+
+        # Nest the interfaces in memory, keeping them in order by name.
+        nodes = {
+            item["id"]: {**item, "children": []} for item in serializer.data
+        }
+        tree = []
+        for node in nodes.values():
+            parent = nodes.get(node["parent_id"])
+            siblings = tree if parent is None else parent["children"]
+            siblings.append(node)
+
+        return self.success(tree)
+
     @action(methods=["get"], detail=True)
     def circuits(self, request, pk=None, site_pk=None, *args, **kwargs):
         """Return a list of Circuits for this Device"""
         device = self.get_resource_object(pk, site_pk)
-        circuits = device.circuits
+        circuits = filters.CircuitFilter(
+            request.query_params, queryset=device.circuits, request=request
+        ).qs
 
         return self.list(
             request,
@@ -516,6 +805,157 @@ class DeviceViewSet(ResourceViewSet):
             **kwargs,
         )
 
+    @action(methods=["get"], detail=True)
+    def circuit_addresses(
+        self, request, pk=None, site_pk=None, *args, **kwargs
+    ):
+        """
+        Return a list of addresses for the interfaces on all of the Circuits
+        of this Device.
+        """
+        device = self.get_resource_object(pk, site_pk)
+        addresses = filters.NetworkFilter(
+            request.query_params,
+            queryset=models.Circuit.objects.addresses_for(device.circuits),
+            request=request,
+        ).qs
+
+        return self.list(
+            request,
+            queryset=addresses,
+            serializer_class=serializers.NetworkSerializer,
+            *args,
+            **kwargs,
+        )
+
+    @action(methods=["get"], detail=True)
+    def neighbors(self, request, pk=None, site_pk=None, *args, **kwargs):
+        """Return the Devices connected to this Device by Circuits."""
+        device = self.get_resource_object(pk, site_pk)
+        graph = topology.get_graph(device.site_id)
+        neighbors = models.Device.objects.filter(
+            id__in=list(graph.neighbors(device.id))
+        ).order_by("id")
+
+        return self.list(request, queryset=neighbors, *args, **kwargs)
+
+    @action(methods=["get"], detail=True)
+    def neighborhood(self, request, pk=None, site_pk=None, *args, **kwargs):
+        """
+        Return the Devices at most ``hops`` (default: 1) Circuits away from
+        this Device.
+        """
+        device = self.get_resource_object(pk, site_pk)
+        try:
+            hops = int(request.query_params.get("hops", 1))
+        except ValueError:
+            raise exc.BadRequest("Hops must be an integer.")
+        if hops < 1:
+            raise exc.BadRequest("Hops must be at least 1.")
+
+        graph = topology.get_graph(device.site_id)
+        devices = models.Device.objects.filter(
+            id__in=list(graph.neighborhood(device.id, hops=hops))
+        ).order_by("id")
+
+        return self.list(request, queryset=devices, *args, **kwargs)
+
+    @action(methods=["get"], detail=True)
+    def shortest_path(self, request, pk=None, site_pk=None, *args, **kwargs):
+        """
+        Return the Devices and Circuits along the shortest path from this
+        Device to the Device given as ``target``.
+        """
+        device = self.get_resource_object(pk, site_pk)
+        target = request.query_params.get("target")
+        if not target:
+            raise exc.BadRequest("A target Device is required.")
+        target = self.get_resource_object(target, site_pk or device.site_id)
+
+        graph = topology.get_graph(device.site_id)
+        path = graph.shortest_path(device.id, target.id)
+        if path is None:
+            self.not_found(
+                msg="No path found from %s to %s." % (device, target)
+            )
+
+        device_ids, circuit_ids = path
+        devices = models.Device.objects.in_bulk(device_ids)
+        circuits = models.Circuit.objects.select_related(
+            "endpoint_a", "endpoint_z"
+        ).in_bulk(circuit_ids)
+        context = self.get_serializer_context()
+
+        return self.success(
+            {
+                "devices": serializers.DeviceSerializer(
+                    [devices[i] for i in device_ids],
+                    many=True,
+                    context=context,
+                ).data,
+                "circuits": serializers.CircuitSerializer(
+                    [circuits[i] for i in circuit_ids],
+                    many=True,
+                    context=context,
+                ).data,
+            }
+        )
+
+    @action(methods=["get"], detail=True)
+    def bundle(self, request, pk=None, site_pk=None, *args, **kwargs):
+        """
+        Return this Device along with its Interfaces, Circuits and Protocols.
+        """
+        device = self.get_resource_object(pk, site_pk)
+        serializer = serializers.DeviceBundleSerializer(
+            bundle.bundle(device), context=self.get_serializer_context()
+        )
+        return self.success(serializer.data)
+
+    @action(methods=["get"], detail=False)
+    def bundles(self, request, site_pk=None, *args, **kwargs):
+        """
+        Return the bundle of every Device matching the filters, or the set
+        query given as ``query``.
+
+        Responses are paginated like ``list`` when ``limit`` is given. Pass
+        ``stream=true`` to stream the bundles of every matching Device as
+        newline-delimited JSON, one Device per line, instead.
+        """
+        query = request.query_params.get("query")
+        if query:
+            devices = self.queryset.cached_set_query(query, site_id=site_pk)
+        else:
+            devices = self.get_queryset()
+        devices = self.filter_queryset(devices)
+        if site_pk is not None:
+            devices = devices.filter(site=site_pk)
+        devices = devices.order_by("id")
+
+        context = self.get_serializer_context()
+        if not qpbool(request.query_params.get("stream", False)):
+            page = self.paginate_queryset(devices)
+            serializer = serializers.DeviceBundleSerializer(
+                bundle.bundles(devices if page is None else page),
+                many=True,
+                context=context,
+            )
+            if page is not None:
+                return self.get_paginated_response(serializer.data)
+            return self.success(serializer.data)
+
+        lines = (
+            json.dumps(
+                serializers.DeviceBundleSerializer(b, context=context).data,
+                cls=DjangoJSONEncoder,
+            )
+            + "\n"
+            for b in bundle.bundles(devices)
+        )
+        return StreamingHttpResponse(
+            lines, content_type="application/x-ndjson"
+        )
+
 
 class NetworkViewSet(ResourceViewSet):
     """
@@ -554,6 +994,20 @@ class NetworkViewSet(ResourceViewSet):
         """Return a dict of kwargs for natural_key lookup."""
         return cidr_to_dict(filter_value)
 
+    # Networks may be created, updated or deleted in bulk, so the Interfaces
+    # whose addresses they affect are only refreshed once for all of them.
+    def perform_create(self, serializer):
+        with deferred_address_refresh():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with deferred_address_refresh():
+            super().perform_update(serializer)
+
+    def perform_bulk_destroy(self, objects):
+        with deferred_address_refresh():
+            super().perform_bulk_destroy(objects)
+
     @action(methods=["get"], detail=False)
     def query(self, request, site_pk=None, *args, **kwargs):
         """Override base query to inherit filtering by query params."""
@@ -868,6 +1322,45 @@ class InterfaceViewSet(ResourceViewSet):
             msg = msg.format(site_pk, pk)
             self.not_found(pk, msg=msg)
 
+    @action(methods=["post"], detail=False)
+    def mac_lookup(self, request, site_pk=None, *args, **kwargs):
+        """
+        Resolve many MAC addresses to the Interfaces that have them at once.
+
+        The payload has a list of ``mac_addresses``. Returns a mapping of each
+        of them, as given, to a list of Interfaces with their ``name_slug``,
+        ``device_hostname`` and ``addresses``.
+        """
+        if site_pk is None:
+            site_pk = request.data.get("site_id")
+
+        mac_addresses = request.data.get("mac_addresses")
+        if not isinstance(mac_addresses, list):
+            raise exc.ValidationError(
+                {"mac_addresses": "Expected a list of MAC addresses."}
+            )
+
+        parsed, invalid = {}, []
+        for mac in mac_addresses:
+            try:
+                parsed[str(mac)] = mac_to_int(mac)
+            except ValueError:
+                invalid.append(mac)
+        if invalid:
+            raise exc.ValidationError(
+                {
+                    "mac_addresses": "Invalid MAC addresses: %s"
+                    % ", ".join(map(str, invalid))
+                }
+            )
+
+        found = models.Interface.objects.by_mac_address(
+            set(parsed.values()), site_id=site_pk
+        )
+        return self.success(
+            {mac: found[value] for mac, value in parsed.items()}
+        )
+
 
 class CircuitViewSet(ResourceViewSet):
     """
@@ -943,7 +1436,9 @@ class CircuitViewSet(ResourceViewSet):
     def addresses(self, request, pk=None, site_pk=None, *args, **kwargs):
         """Return a list of addresses for the interfaces on this Circuit."""
         circuit = self.get_resource_object(pk, site_pk)
-        addresses = circuit.addresses
+        addresses = filters.NetworkFilter(
+            request.query_params, queryset=circuit.addresses, request=request
+        ).qs
 
         return self.list(
             request,
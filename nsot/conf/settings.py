@@ -358,6 +358,20 @@ LOGGING = {
 # Acceptable regex pattern for naming Attribute objects.
 ATTRIBUTE_NAME = re.compile(r"^[a-z][a-z0-9_]*$")
 
+# The backend used to store and query attribute values. With "value", each
+# attribute value is also stored as a row in the Value table, which is used
+# for set queries and filtering. With "json", queries use the JSON attributes
+# stored on each object directly (JSON1 on SQLite, jsonb on PostgreSQL) and
+# Value rows are no longer maintained, which halves the cost of setting
+# attributes. The Values API endpoint is empty when using "json".
+# Default: "value"
+NSOT_ATTRIBUTE_BACKEND = "value"
+
+# The number of seconds between runs of ``nsot-server reap --schedule``, which
+# deletes expired resources. Set this to 0 to disable the scheduler.
+# Default: 3600
+NSOT_REAPER_INTERVAL = 3600
+
 ###########
 # Devices #
 ###########
@@ -26,6 +26,7 @@ __all__ = (
     "MultipleObjectsReturned",
     "NotFound",
     "ObjectDoesNotExist",
+    "PreconditionFailed",
     "ProtectedError",
     "Unauthorized",
     "ValidationError",
@@ -123,3 +124,10 @@ class Conflict(BaseHttpError, IntegrityError):
     """HTTP 409 error."""
 
     status_code = 409
+
+
+class PreconditionFailed(BaseHttpError):
+    """HTTP 412 error."""
+
+    status_code = 412
+    default_detail = "Precondition failed."
@@ -0,0 +1,95 @@
+"""
+Command for running attribute-wide operations over every resource.
+"""
+
+from nsot import exc, models
+from nsot.models import attribute_operations
+from nsot.util.commands import CommandError, NsotCommand
+
+
+class Command(NsotCommand):
+    help = (
+        "Backfill the default of an Attribute, rename it, or convert it "
+        "between single and multi-valued on every resource."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "operation",
+            choices=("backfill", "rename", "convert"),
+            help="Operation to perform.",
+        )
+        parser.add_argument(
+            "site_id",
+            type=int,
+            help="ID of the Site the Attribute is under.",
+        )
+        parser.add_argument(
+            "resource_name",
+            help="Resource type of the Attribute (e.g. Device).",
+        )
+        parser.add_argument(
+            "name",
+            help="Name of the Attribute.",
+        )
+        parser.add_argument(
+            "--new-name",
+            type=str,
+            default=None,
+            help="New name of the Attribute (rename only).",
+        )
+        parser.add_argument(
+            "--multi",
+            type=str,
+            choices=("true", "false"),
+            default=None,
+            help="Whether the Attribute becomes multi-valued (convert only).",
+        )
+        parser.add_argument(
+            "-c",
+            "--chunk-size",
+            type=int,
+            default=attribute_operations.CHUNK_SIZE,
+            help="Number of resources updated in each transaction.",
+        )
+
+    def progress(self, done, total):
+        self.stdout.write(f"Updated {done} of {total} resources.")
+
+    def handle(self, **options):
+        try:
+            attribute = models.Attribute.objects.get(
+                site_id=options["site_id"],
+                resource_name=options["resource_name"],
+                name=options["name"],
+            )
+        except models.Attribute.DoesNotExist:
+            raise CommandError("No such Attribute: %(name)s" % options)
+
+        operation = options["operation"]
+        kwargs = {
+            "chunk_size": options["chunk_size"],
+            "progress": self.progress,
+        }
+
+        try:
+            if operation == "backfill":
+                count = attribute_operations.backfill_default(
+                    attribute, **kwargs
+                )
+            elif operation == "rename":
+                if not options["new_name"]:
+                    raise CommandError("--new-name is required to rename.")
+                count = attribute_operations.rename_attribute(
+                    attribute, options["new_name"], **kwargs
+                )
+            else:
+                if options["multi"] is None:
+                    raise CommandError("--multi is required to convert.")
+                count = attribute_operations.convert_attribute(
+                    attribute, options["multi"] == "true", **kwargs
+                )
+        except exc.ValidationError as err:
+            raise CommandError(str(err))
+
+        self.stdout.write(f"Done: {count} resources updated.")
@@ -0,0 +1,102 @@
+"""
+Command for deleting expired resources.
+"""
+
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from nsot import models
+from nsot.models import reaper
+from nsot.util.commands import CommandError, NsotCommand
+
+
+class Command(NsotCommand):
+    help = (
+        "Delete resources whose expiration time has passed, either once or "
+        "periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-u",
+            "--user",
+            required=True,
+            help="Email of the User the deletions are recorded under.",
+        )
+        parser.add_argument(
+            "-r",
+            "--resource-name",
+            action="append",
+            dest="resource_names",
+            choices=[model.__name__ for model in reaper.REAP_ORDER],
+            help="Resource type to reap. May be given more than once.",
+        )
+        parser.add_argument(
+            "-c",
+            "--chunk-size",
+            type=int,
+            default=reaper.CHUNK_SIZE,
+            help="Number of resources deleted in each transaction.",
+        )
+        parser.add_argument(
+            "--schedule",
+            action="store_true",
+            default=False,
+            help="Keep running, reaping expired resources every --interval.",
+        )
+        parser.add_argument(
+            "-i",
+            "--interval",
+            type=int,
+            default=settings.NSOT_REAPER_INTERVAL,
+            help=(
+                "Number of seconds between runs when using --schedule, or 0 "
+                "to disable the scheduler."
+            ),
+        )
+
+    def progress(self, resource_name, deleted):
+        self.log.debug(
+            "Deleted %d expired %s objects.", deleted, resource_name
+        )
+
+    def reap(self, user, options):
+        results = reaper.reap_expired(
+            user,
+            resource_names=options["resource_names"],
+            chunk_size=options["chunk_size"],
+            progress=self.progress,
+        )
+        for resource_name, (deleted, skipped) in results.items():
+            msg = f"{resource_name}: {deleted} deleted"
+            if skipped:
+                msg += f", {skipped} skipped (still in use)"
+            self.stdout.write(msg + ".")
+
+    def handle(self, **options):
+        try:
+            user = models.User.objects.get(email=options["user"])
+        except models.User.DoesNotExist:
+            raise CommandError("No such User: %(user)s" % options)
+
+        if not options["schedule"]:
+            self.reap(user, options)
+            return
+
+        interval = options["interval"]
+        if interval < 0:
+            raise CommandError("--interval must not be negative.")
+        if interval == 0:
+            self.log.info("Not reaping, as the scheduler is disabled.")
+            return
+
+        while True:
+            try:
+                self.reap(user, options)
+            except Exception:
+                # Keep the scheduler running; the next run will retry.
+                self.log.exception("Error reaping expired resources.")
+            close_old_connections()
+            time.sleep(interval)
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nsot', '0045_attribute_inheritable'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='change',
+            name='resource_name',
+            field=models.CharField(choices=[('Site', 'Site'), ('Network', 'Network'), ('Attribute', 'Attribute'), ('Device', 'Device'), ('Interface', 'Interface'), ('Circuit', 'Circuit'), ('Protocol', 'Protocol'), ('ProtocolType', 'ProtocolType'), ('SavedQuery', 'SavedQuery')], db_index=True, help_text='The name of the Resource for this Change.', max_length=20, verbose_name='Resource Type'),
+        ),
+        migrations.CreateModel(
+            name='SavedQuery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, help_text='The name of the SavedQuery.', max_length=64)),
+                ('description', models.CharField(blank=True, default='', help_text='A helpful description of the SavedQuery.', max_length=255)),
+                ('query', models.CharField(help_text="The set query string (e.g. 'role=spine +role=leaf').", max_length=255)),
+                ('resource_name', models.CharField(choices=[('Network', 'Network'), ('Device', 'Device'), ('Interface', 'Interface'), ('Circuit', 'Circuit'), ('Protocol', 'Protocol')], db_index=True, help_text='The name of the Resource type this SavedQuery returns.', max_length=20, verbose_name='Resource Name')),
+                ('version', models.PositiveIntegerField(default=0, editable=False, help_text='Incremented each time the membership changes. Used as the ETag of the membership.')),
+                ('refreshed_at', models.DateTimeField(blank=True, default=None, editable=False, help_text='The timestamp of the last full refresh of the membership.', null=True)),
+                ('site', models.ForeignKey(help_text='Unique ID of the Site this SavedQuery is under.', on_delete=django.db.models.deletion.PROTECT, related_name='saved_queries', to='nsot.site', verbose_name='Site')),
+            ],
+            options={
+                'verbose_name_plural': 'saved queries',
+                'unique_together': {('site', 'resource_name', 'name')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedQueryMember',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource_id', models.IntegerField(help_text='The unique ID of the member Resource.', verbose_name='Resource ID')),
+                ('saved_query', models.ForeignKey(help_text='SavedQuery to which this member belongs.', on_delete=django.db.models.deletion.CASCADE, related_name='members', to='nsot.savedquery')),
+            ],
+            options={
+                'unique_together': {('saved_query', 'resource_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_effective_values(apps, schema_editor):
+    """Resolve existing inheritable attribute values down each hierarchy."""
+    Attribute = apps.get_model("nsot", "Attribute")
+    Value = apps.get_model("nsot", "Value")
+    EffectiveValue = apps.get_model("nsot", "EffectiveValue")
+
+    for attribute in Attribute.objects.filter(inheritable=True):
+        model = apps.get_model("nsot", attribute.resource_name)
+        parents = dict(
+            model.objects.filter(site_id=attribute.site_id).values_list(
+                "id", "parent_id"
+            )
+        )
+        explicit = {}
+        for rid, value in (
+            Value.objects.filter(attribute=attribute)
+            .order_by("id")
+            .values_list("resource_id", "value")
+        ):
+            explicit.setdefault(rid, []).append(value)
+
+        resolved = {}
+        for node in parents:
+            chain = []
+            current = node
+            while current is not None and current not in resolved:
+                if current in explicit:
+                    resolved[current] = (current, explicit[current])
+                    break
+                chain.append(current)
+                current = parents.get(current)
+            found = resolved.get(current)
+            for item in chain:
+                resolved[item] = found
+
+        EffectiveValue.objects.bulk_create(
+            [
+                EffectiveValue(
+                    attribute=attribute,
+                    name=attribute.name,
+                    value=value,
+                    resource_name=attribute.resource_name,
+                    resource_id=node,
+                    source_id=source_id,
+                    site_id=attribute.site_id,
+                )
+                for node, found in resolved.items()
+                if found is not None
+                for source_id, values in [found]
+                for value in values
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nsot', '0046_savedquery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EffectiveValue',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='The name of the Attribute. (Internal use only)', max_length=64, verbose_name='Name')),
+                ('value', models.CharField(blank=True, help_text='The resolved Attribute value.', max_length=255)),
+                ('resource_id', models.IntegerField(help_text='The unique ID of the Resource the value applies to.', verbose_name='Resource ID')),
+                ('resource_name', models.CharField(choices=[('Network', 'Network'), ('Device', 'Device'), ('Interface', 'Interface'), ('Circuit', 'Circuit'), ('Protocol', 'Protocol')], help_text='The name of the Resource type the value applies to.', max_length=20, verbose_name='Resource Type')),
+                ('source_id', models.IntegerField(help_text='The unique ID of the Resource the value is set on.', verbose_name='Source ID')),
+                ('attribute', models.ForeignKey(help_text='The Attribute to which this EffectiveValue is assigned.', on_delete=django.db.models.deletion.CASCADE, related_name='effective_values', to='nsot.attribute')),
+                ('site', models.ForeignKey(help_text='Unique ID of the Site this EffectiveValue is under.', on_delete=django.db.models.deletion.CASCADE, related_name='effective_values', to='nsot.site', verbose_name='Site')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name', 'value', 'resource_name'], name='nsot_effect_name_2f0d0d_idx'), models.Index(fields=['resource_name', 'resource_id'], name='nsot_effect_resourc_cd96c7_idx')],
+            },
+        ),
+        migrations.RunPython(
+            populate_effective_values, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# Resource tables whose JSON attributes cache may be queried directly when
+# NSOT_ATTRIBUTE_BACKEND = "json".
+RESOURCE_TABLES = (
+    "nsot_circuit",
+    "nsot_device",
+    "nsot_interface",
+    "nsot_network",
+    "nsot_protocol",
+)
+
+
+def create_gin_indexes(apps, schema_editor):
+    """Index the attributes cache for jsonb containment on PostgreSQL."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for table in RESOURCE_TABLES:
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS %s_attrs_gin ON %s "
+            "USING gin (((_attributes_cache)::jsonb) jsonb_path_ops)"
+            % (table, table)
+        )
+
+
+def drop_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for table in RESOURCE_TABLES:
+        schema_editor.execute("DROP INDEX IF EXISTS %s_attrs_gin" % table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nsot", "0047_effectivevalue"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_indexes, drop_gin_indexes),
+    ]
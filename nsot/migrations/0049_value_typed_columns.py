@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nsot", "0048_attributes_cache_gin_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="value",
+            name="value_float",
+            field=models.FloatField(
+                blank=True,
+                help_text="The value as a float. (Internal use only)",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="value",
+            name="value_int",
+            field=models.BigIntegerField(
+                blank=True,
+                help_text="The value as an integer. (Internal use only)",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="value",
+            name="value_ip_high",
+            field=models.CharField(
+                blank=True,
+                help_text="Last address covered by the value. (Internal use only)",
+                max_length=33,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="value",
+            name="value_ip_low",
+            field=models.CharField(
+                blank=True,
+                help_text="First address covered by the value. (Internal use only)",
+                max_length=33,
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="value",
+            index=models.Index(
+                fields=["attribute", "value_int"],
+                name="nsot_value_attribu_3822df_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="value",
+            index=models.Index(
+                fields=["attribute", "value_float"],
+                name="nsot_value_attribu_d8c9a9_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="value",
+            index=models.Index(
+                fields=["attribute", "value_ip_low", "value_ip_high"],
+                name="nsot_value_attribu_8daa26_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nsot", "0049_value_typed_columns"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="circuit",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1,
+                editable=False,
+                help_text="Incremented each time the object changes. Used for optimistic concurrency control. (Internal use only)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="device",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1,
+                editable=False,
+                help_text="Incremented each time the object changes. Used for optimistic concurrency control. (Internal use only)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="interface",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1,
+                editable=False,
+                help_text="Incremented each time the object changes. Used for optimistic concurrency control. (Internal use only)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="network",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1,
+                editable=False,
+                help_text="Incremented each time the object changes. Used for optimistic concurrency control. (Internal use only)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="protocol",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1,
+                editable=False,
+                help_text="Incremented each time the object changes. Used for optimistic concurrency control. (Internal use only)",
+            ),
+        ),
+    ]
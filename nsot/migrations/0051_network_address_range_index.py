@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nsot", "0050_resource_version"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="network",
+            index=models.Index(
+                fields=["ip_version", "network_address"],
+                name="nsot_networ_ip_vers_b21196_idx",
+            ),
+        ),
+    ]
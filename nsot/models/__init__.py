@@ -1,16 +1,23 @@
 from django.db import models as djmodels
 
+from .. import signals, util
 from .assignment import Assignment
 from .attribute import Attribute
 from .change import Change
 from .circuit import Circuit
 from .device import Device
+from .effective_value import EffectiveValue, refresh_effective_values
 from .interface import Interface
 from .network import Network
 from .protocol import Protocol
 from .protocol_type import ProtocolType
 from .resource import Resource
+from .saved_query import SavedQuery, SavedQueryMember, refresh_saved_queries
 from .site import Site
+from .topology import (
+    invalidate_circuit_topology,
+    invalidate_interface_topology,
+)
 from .user import User
 from .value import Value
 
@@ -20,10 +27,13 @@ __all__ = [
     "Change",
     "Circuit",
     "Device",
+    "EffectiveValue",
     "Interface",
     "Network",
     "Protocol",
     "ProtocolType",
+    "SavedQuery",
+    "SavedQueryMember",
     "Site",
     "User",
     "Value",
@@ -34,8 +44,45 @@ __all__ = [
 def delete_resource_values(sender, instance, **kwargs):
     """Delete values when a Resource object is deleted."""
     instance.attributes.delete()  # These are instances of Value
+    instance.effective_values.delete()
 
 
+def send_attributes_changed(sender, instance, created=True, **kwargs):
+    """Notify receivers when a Resource object is created or deleted."""
+    if not created:
+        return
+
+    signals.attributes_changed.send(
+        sender=sender,
+        site_id=instance.site_id,
+        resource_ids=[instance.id],
+        names=None,
+    )
+
+
+def bump_attribute_generations(
+    sender, site_id, resource_ids, names=None, **kwargs
+):
+    """Invalidate cached results that depend on the changed attributes."""
+    resource_name = sender.__name__
+    if names is None:
+        util.bump_generation(util.generation_key(site_id, resource_name))
+        return
+
+    for name in names:
+        util.bump_generation(util.generation_key(site_id, resource_name, name))
+
+
+signals.attributes_changed.connect(
+    bump_attribute_generations, dispatch_uid="bump_attribute_generations"
+)
+signals.attributes_changed.connect(
+    refresh_effective_values, dispatch_uid="refresh_effective_values"
+)
+signals.attributes_changed.connect(
+    refresh_saved_queries, dispatch_uid="refresh_saved_queries"
+)
+
 resource_subclasses = Resource.__subclasses__()
 for model_class in resource_subclasses:
     # Value post_delete
@@ -44,3 +91,26 @@ for model_class in resource_subclasses:
         sender=model_class,
         dispatch_uid="value_post_delete_" + model_class.__name__,
     )
+    # Attribute change notification on create & delete
+    djmodels.signals.post_save.connect(
+        send_attributes_changed,
+        sender=model_class,
+        dispatch_uid="attributes_changed_post_save_" + model_class.__name__,
+    )
+    djmodels.signals.post_delete.connect(
+        send_attributes_changed,
+        sender=model_class,
+        dispatch_uid="attributes_changed_post_delete_" + model_class.__name__,
+    )
+
+# Topology graph invalidation
+djmodels.signals.post_save.connect(
+    invalidate_circuit_topology,
+    sender=Circuit,
+    dispatch_uid="invalidate_topology_post_save_circuit",
+)
+djmodels.signals.post_save.connect(
+    invalidate_interface_topology,
+    sender=Interface,
+    dispatch_uid="invalidate_topology_post_save_interface",
+)
@@ -1,9 +1,12 @@
+import ipaddress
+import math
 import re
 
+from django.apps import apps
 from django.conf import settings
 from django.db import models
 
-from .. import exc, fields, validators
+from .. import exc, fields, util, validators
 from . import constants
 
 # Internal key used to wrap default values for JSON serialization.
@@ -12,6 +15,47 @@ from . import constants
 _DEFAULT_VALUE_KEY = "_v"
 
 
+def _ip_key(address):
+    """Return a string for ``address`` that sorts in address order."""
+    return "%d%032x" % (address.version, int(address))
+
+
+def typed_columns(attr_type, value):
+    """
+    Return a dict of the typed ``Value`` fields for ``value`` as ``attr_type``.
+
+    Addresses and networks are stored as the range of addresses they cover,
+    so that containment is a pair of range comparisons. Raises ``ValueError``
+    if ``value`` isn't valid for the type.
+
+    :param attr_type:
+        One of ``constants.ATTRIBUTE_TYPES``
+
+    :param value:
+        String value
+    """
+    columns = dict.fromkeys(constants.TYPED_VALUE_FIELDS)
+    if attr_type == "int":
+        number = int(value)
+        if not -(2**63) <= number < 2**63:
+            raise ValueError("Integer out of range: %r" % value)
+        columns["value_int"] = number
+    elif attr_type == "float":
+        number = float(value)
+        if not math.isfinite(number):
+            raise ValueError("Float must be finite: %r" % value)
+        columns["value_float"] = number
+    elif attr_type in ("ip", "cidr"):
+        if attr_type == "ip":
+            network = ipaddress.ip_network(ipaddress.ip_address(value))
+        else:
+            network = ipaddress.ip_network(value, strict=False)
+        columns["value_ip_low"] = _ip_key(network.network_address)
+        columns["value_ip_high"] = _ip_key(network.broadcast_address)
+
+    return columns
+
+
 class Attribute(models.Model):
     """Represents a flexible attribute for Resource objects."""
 
@@ -132,6 +176,11 @@ class Attribute(models.Model):
         help_text="The name of the Resource to which this Attribute is bound.",
     )
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._original_inheritable = self.__dict__.get("inheritable")
+        self._original_type = self.type
+
     def __str__(self):
         return "%s %s (site_id: %s)" % (
             self.resource_name,
@@ -142,6 +191,14 @@ class Attribute(models.Model):
     class Meta:
         unique_together = ("site", "resource_name", "name")
 
+    @property
+    def type(self):
+        """The type values are constrained to, if any."""
+        constraints = self.__dict__.get("constraints")
+        if not isinstance(constraints, dict):
+            return None
+        return constraints.get("type") or None
+
     @classmethod
     def all_by_name(cls, resource_name=None, site=None):
         if resource_name is None:
@@ -180,6 +237,16 @@ class Attribute(models.Model):
                 {"constraints": "valid_values expected type list."}
             )
 
+        # Only untyped attributes omit the type.
+        attr_type = value.get("type")
+        if attr_type:
+            if attr_type not in constants.ATTRIBUTE_TYPES:
+                types = ", ".join(constants.ATTRIBUTE_TYPES)
+                raise exc.ValidationError(
+                    {"constraints": f"type expected one of: {types}."}
+                )
+            constraints["type"] = attr_type
+
         return constraints
 
     def clean_display(self, value):
@@ -295,11 +362,47 @@ class Attribute(models.Model):
                 )
             )
 
+        # Make sure that typed values can be stored as their type.
+        self.typed_columns(value, constraints)
+
         return {
             "attribute_id": self.id,
             "value": value,
         }
 
+    def typed_columns(self, value, constraints=None):
+        """
+        Return a dict of the typed ``Value`` fields for ``value``, which are
+        all ``None`` if this attribute isn't typed or ``value`` is empty.
+        """
+        if constraints is None:
+            constraints = self.constraints
+
+        attr_type = constraints.get("type")
+        if not attr_type or value == "":
+            return dict.fromkeys(constants.TYPED_VALUE_FIELDS)
+
+        try:
+            return typed_columns(attr_type, value)
+        except ValueError:
+            msg = f"Attribute value {value} for {self.name} is not a valid {attr_type}"
+            raise exc.ValidationError({"type": msg})
+
+    def refresh_typed_values(self):
+        """Recompute the typed fields of every ``Value`` of this attribute."""
+        Value = apps.get_model("nsot", "Value")
+        values = Value.objects.filter(attribute=self).only("id", "value")
+        last_id = 0
+        while True:
+            chunk = list(values.filter(id__gt=last_id).order_by("id")[:500])
+            if not chunk:
+                break
+            for value in chunk:
+                value.attribute = self
+                value.set_typed_columns()
+            Value.objects.bulk_update(chunk, constants.TYPED_VALUE_FIELDS)
+            last_id = chunk[-1].id
+
     def validate_value(self, value):
         if self.multi:
             if not isinstance(value, list):
@@ -373,13 +476,54 @@ class Attribute(models.Model):
                     f"the following attributes depend on it: {names}"
                 }
             )
-        return super().delete(*args, **kwargs)
+
+        # Without Value rows to protect us, check the resources themselves.
+        from .attribute_backend import AttributeMatch, uses_value_rows
+
+        if not uses_value_rows():
+            model = apps.get_model("nsot", self.resource_name)
+            in_use = model.objects.filter(
+                AttributeMatch(self.name, None), site_id=self.site_id
+            )
+            if in_use.exists():
+                raise exc.ProtectedError(
+                    "Cannot delete attribute '%s' because it is set on "
+                    "%s objects." % (self.name, self.resource_name),
+                    set(in_use),
+                )
+
+        result = super().delete(*args, **kwargs)
+        self.bump_generation()
+        return result
+
+    def bump_generation(self):
+        """Invalidate cached results that depend on this attribute."""
+        util.bump_generation(
+            util.generation_key(self.site_id, self.resource_name, self.name)
+        )
 
     def save(self, *args, **kwargs):
         """Always enforce constraints."""
         self.full_clean()
+        toggled = (
+            self.id is not None
+            and self.inheritable != self._original_inheritable
+        )
+        retyped = self.id is not None and self.type != self._original_type
         super().save(*args, **kwargs)
 
+        # Existing values are indexed for the new type.
+        if retyped:
+            self.refresh_typed_values()
+            self.bump_generation()
+            self._original_type = self.type
+
+        # Existing values start or stop propagating down the hierarchy.
+        if toggled:
+            EffectiveValue = apps.get_model("nsot", "EffectiveValue")
+            EffectiveValue.objects.rebuild_attribute(self)
+            self._original_inheritable = self.inheritable
+
     def to_dict(self):
         return {
             "id": self.id,
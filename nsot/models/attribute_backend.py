@@ -0,0 +1,190 @@
+"""
+Pluggable storage for querying attribute values of Resource objects.
+
+With the default ``"value"`` backend, every attribute value is stored as a
+``Value`` row and lookups are performed against that table. With the
+``"json"`` backend, lookups query each resource's ``_attributes_cache`` JSON
+directly and ``Value`` rows are not maintained. This is selected using the
+``NSOT_ATTRIBUTE_BACKEND`` setting.
+"""
+
+import json
+
+from django.conf import settings
+from django.db import NotSupportedError
+from django.db.models import BooleanField, Expression, F, Q
+
+from .. import exc, util
+from .attribute import typed_columns
+from .value import Value
+
+__all__ = ("AttributeMatch", "attribute_q", "typed_q", "uses_value_rows")
+
+# Lookups on typed ``Value`` fields for each set query comparison operator.
+COMPARISON_LOOKUPS = {">": "gt", ">=": "gte", "<": "lt", "<=": "lte"}
+
+
+def uses_value_rows():
+    """Return whether attribute values are maintained as ``Value`` rows."""
+    return getattr(settings, "NSOT_ATTRIBUTE_BACKEND", "value") != "json"
+
+
+class AttributeMatch(Expression):
+    """
+    Boolean expression that is true when a resource's JSON attributes cache
+    has ``value`` (or a value matching the regex pattern ``value``) for the
+    attribute ``name``. Works for single and multi-valued attributes. If
+    ``value`` is ``None``, it is true when the attribute is set at all.
+
+    Supported on SQLite (JSON1) and PostgreSQL (jsonb).
+    """
+
+    output_field = BooleanField()
+
+    def __init__(self, name, value, regex=False, column="_attributes_cache"):
+        super().__init__()
+        self.name = name
+        self.value = value
+        self.regex = regex
+        self.column = F(column)
+
+    def get_source_expressions(self):
+        return [self.column]
+
+    def set_source_expressions(self, exprs):
+        (self.column,) = exprs
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError(
+            "The json attribute backend is not supported on %s."
+            % connection.vendor
+        )
+
+    def as_sqlite(self, compiler, connection):
+        column, params = compiler.compile(self.column)
+        path = '$."%s"' % self.name
+        if self.value is None:
+            return "json_type(%s, %%s) IS NOT NULL" % column, (*params, path)
+
+        op = "REGEXP" if self.regex else "="
+        # Only the compiled column is interpolated; values are parameters.
+        sql = (
+            "EXISTS (SELECT 1 FROM json_each(%s, %%s) AS attr "  # noqa: S608
+            "WHERE attr.value %s %%s)" % (column, op)
+        )
+        return sql, (*params, path, self.value)
+
+    def as_postgresql(self, compiler, connection):
+        column, params = compiler.compile(self.column)
+        doc = "(%s)::jsonb" % column
+        if self.value is None:
+            return "%s ? %%s" % doc, (*params, self.name)
+
+        if self.regex:
+            element = "%s -> %%s" % doc
+            sql = (
+                "EXISTS (SELECT 1 FROM jsonb_array_elements_text(CASE WHEN "  # noqa: S608
+                "jsonb_typeof(%(e)s) = 'array' THEN %(e)s ELSE "
+                "jsonb_build_array(%(e)s) END) AS attr(value) "
+                "WHERE attr.value ~ %%s)" % {"e": element}
+            )
+            return sql, (*params, self.name) * 3 + (self.value,)
+
+        # Containment can use a GIN index on the cast column.
+        sql = "(%s @> %%s::jsonb OR %s @> %%s::jsonb)" % (doc, doc)
+        return sql, (
+            *params,
+            json.dumps({self.name: self.value}),
+            *params,
+            json.dumps({self.name: [self.value]}),
+        )
+
+
+def typed_q(model, attribute, op, value):
+    """
+    Return a ``Q`` object matching ``model`` objects whose value for the typed
+    ``attribute`` compares to ``value`` using the set query operator ``op``.
+
+    These use the indexed typed fields of ``Value``, so they are only
+    supported by the ``"value"`` backend.
+    """
+    attr_type = attribute.type
+    if op in COMPARISON_LOOKUPS and attr_type in ("int", "float"):
+        field = "value_" + attr_type
+        operand = attribute.typed_columns(value)[field]
+        lookups = {"%s__%s" % (field, COMPARISON_LOOKUPS[op]): operand}
+    elif op == "<<" and attr_type in ("ip", "cidr"):
+        # The value's range of addresses must be within the network's.
+        try:
+            network = typed_columns("cidr", value)
+        except ValueError:
+            msg = f"Invalid network for {attribute.name}: {value!r}"
+            raise exc.ValidationError({"query": msg})
+        lookups = {
+            "value_ip_low__gte": network["value_ip_low"],
+            "value_ip_high__lte": network["value_ip_high"],
+        }
+    else:
+        msg = "Operator %r is not supported for %s attribute %r" % (
+            op,
+            attr_type or "untyped",
+            attribute.name,
+        )
+        raise exc.ValidationError({"query": msg})
+
+    if not uses_value_rows():
+        raise exc.ValidationError(
+            {"query": "Operator %r requires the value attribute backend" % op}
+        )
+
+    values = Value.objects.filter(
+        attribute=attribute, resource_name=model.__name__, **lookups
+    )
+    return Q(id__in=values.values_list("resource_id", flat=True))
+
+
+def attribute_q(model, name, value, regex=False, attribute=None):
+    """
+    Return a ``Q`` object matching ``model`` objects that have ``value`` for
+    the attribute ``name``.
+
+    :param model:
+        Resource model class
+
+    :param name:
+        Attribute name
+
+    :param value:
+        Attribute value, or a regex pattern if ``regex`` is set
+
+    :param regex:
+        Whether ``value`` is a regex pattern
+
+    :param attribute:
+        Optional Attribute object used to narrow down ``Value`` rows
+    """
+    if not uses_value_rows():
+        return Q(AttributeMatch(name, value, regex=regex))
+
+    resource_name = model.__name__
+
+    # If it's a regex query, only scan this attribute's values, and only
+    # evaluate the regex against values containing its literal substrings.
+    if regex:
+        if attribute is not None:
+            values = Value.objects.filter(
+                attribute=attribute, resource_name=resource_name
+            )
+        else:
+            values = Value.objects.filter(
+                name=name, resource_name=resource_name
+            )
+        for literal in util.regex_literals(value):
+            values = values.filter(value__icontains=literal)
+        values = values.filter(value__regex=value)
+    else:
+        values = Value.objects.filter(
+            name=name, value=value, resource_name=resource_name
+        )
+
+    return Q(id__in=values.values_list("resource_id", flat=True))
@@ -0,0 +1,350 @@
+"""
+Attribute-wide operations that touch every resource using an Attribute.
+
+These rewrite ``Value`` rows and ``_attributes_cache`` columns in chunks of
+resource IDs using set-based queries, without loading model instances, so they
+are suitable for attributes with millions of values. Each chunk is committed
+in its own transaction and every operation may safely be re-run with the same
+arguments if it is interrupted.
+"""
+
+import logging
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, F
+
+from .. import exc, signals, util
+from .attribute_backend import AttributeMatch, uses_value_rows
+from .effective_value import EffectiveValue
+from .value import Value
+
+__all__ = ("backfill_default", "convert_attribute", "rename_attribute")
+
+log = logging.getLogger(__name__)
+
+# Default number of resources updated in each transaction.
+CHUNK_SIZE = 500
+
+
+def _iter_chunks(queryset, chunk_size):
+    """Yield lists of ``(id, _attributes_cache)`` from ``queryset`` by ID."""
+    last_id = 0
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "_attributes_cache")[:chunk_size]
+        )
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _write_caches(model, caches):
+    """Store ``caches``, a list of ``(id, attributes)``, in bulk."""
+    model.objects.bulk_update(
+        [
+            model(id=rid, _attributes_cache=cache, version=F("version") + 1)
+            for rid, cache in caches
+        ],
+        ["_attributes_cache", "version"],
+        batch_size=len(caches) or 1,
+    )
+
+
+def _run(
+    attribute, queryset, update, names, chunk_size, progress, notify=True
+):
+    """
+    Apply ``update(rows)`` to each chunk of ``queryset``, notifying receivers
+    of ``attributes_changed`` and reporting progress after each one.
+
+    If ``notify`` is false, receivers aren't notified, and only the cached
+    results that depend on ``names`` are invalidated.
+
+    Returns the number of resources updated.
+    """
+    model = queryset.model
+    total = queryset.count()
+    done = 0
+    for rows in _iter_chunks(queryset, chunk_size):
+        with transaction.atomic():
+            update(rows)
+            if notify:
+                signals.attributes_changed.send(
+                    sender=model,
+                    site_id=attribute.site_id,
+                    resource_ids=[rid for rid, _ in rows],
+                    names=names,
+                )
+            else:
+                for name in names:
+                    util.bump_generation(
+                        util.generation_key(
+                            attribute.site_id, attribute.resource_name, name
+                        )
+                    )
+        done += len(rows)
+        log.debug("%s: updated %d of %d", attribute, done, total)
+        if progress is not None:
+            progress(done, total)
+
+    return done
+
+
+def _resources_with(attribute, present=True):
+    """Return a queryset of resources that have (or lack) ``attribute``."""
+    model = apps.get_model("nsot", attribute.resource_name)
+    objects = model.objects.filter(site_id=attribute.site_id)
+    if uses_value_rows():
+        lookup = {
+            "id__in": Value.objects.filter(attribute=attribute).values(
+                "resource_id"
+            )
+        }
+        return (
+            objects.filter(**lookup) if present else objects.exclude(**lookup)
+        )
+
+    match = AttributeMatch(attribute.name, None)
+    return objects.filter(match) if present else objects.exclude(match)
+
+
+def backfill_default(attribute, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Set the default value of ``attribute`` on every resource that lacks it.
+
+    :param attribute:
+        Attribute object with a ``default``
+
+    :param chunk_size:
+        Number of resources updated in each transaction
+
+    :param progress:
+        Optional callable passed ``(done, total)`` after each chunk
+    """
+    default = attribute.default
+    if default is None:
+        raise exc.ValidationError(
+            {"default": f"Attribute '{attribute.name}' has no default."}
+        )
+
+    values = [
+        (value, attribute.typed_columns(value))
+        for value in (default if attribute.multi else [default])
+    ]
+    queryset = _resources_with(attribute, present=False)
+    model = queryset.model
+
+    def update(rows):
+        if uses_value_rows():
+            Value.objects.bulk_create(
+                [
+                    Value(
+                        attribute=attribute,
+                        name=attribute.name,
+                        value=value,
+                        resource_name=attribute.resource_name,
+                        resource_id=rid,
+                        site_id=attribute.site_id,
+                        **typed,
+                    )
+                    for rid, _ in rows
+                    for value, typed in values
+                ],
+                batch_size=chunk_size,
+            )
+        caches = []
+        for rid, cache in rows:
+            cache = dict(cache or {})
+            cache[attribute.name] = default
+            caches.append((rid, cache))
+        _write_caches(model, caches)
+
+    return _run(
+        attribute, queryset, update, {attribute.name}, chunk_size, progress
+    )
+
+
+def rename_attribute(attribute, name, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Rename ``attribute``, the values stored under it on every resource, and
+    the set queries of SavedQuery objects that use it.
+
+    The values are renamed before the Attribute itself, so that an
+    interrupted rename is resumed by running it again with the same name.
+    Receivers of ``attributes_changed`` aren't notified of each chunk, since
+    inherited values and SavedQuery members would be recomputed for the old
+    name. The effective values of every resource, including inherited ones,
+    are renamed along with the Attribute instead.
+
+    :param attribute:
+        Attribute object
+
+    :param name:
+        New name for the attribute
+
+    :param chunk_size:
+        Number of resources updated in each transaction
+
+    :param progress:
+        Optional callable passed ``(done, total)`` after each chunk
+    """
+    old_name = attribute.name
+    model = apps.get_model("nsot", attribute.resource_name)
+
+    # Validate the new name before anything is renamed.
+    attribute.name = name
+    try:
+        attribute.full_clean()
+    finally:
+        attribute.name = old_name
+
+    def update(rows):
+        ids = [rid for rid, _ in rows]
+        if uses_value_rows():
+            Value.objects.filter(
+                attribute=attribute, resource_id__in=ids
+            ).update(name=name)
+
+        caches = []
+        for rid, cache in rows:
+            cache = dict(cache or {})
+            if old_name in cache:
+                cache[name] = cache.pop(old_name)
+            caches.append((rid, cache))
+        _write_caches(model, caches)
+
+    # Only visit resources whose values don't have the new name yet.
+    queryset = model.objects.filter(site_id=attribute.site_id)
+    if uses_value_rows():
+        queryset = queryset.filter(
+            id__in=Value.objects.filter(attribute=attribute)
+            .exclude(name=name)
+            .values("resource_id")
+        )
+    elif name != old_name:
+        queryset = queryset.filter(AttributeMatch(old_name, None))
+    else:
+        return 0
+
+    updated = _run(
+        attribute,
+        queryset,
+        update,
+        {old_name, name},
+        chunk_size,
+        progress,
+        notify=False,
+    )
+
+    if name != old_name:
+        with transaction.atomic():
+            attribute.name = name
+            attribute.save()
+            EffectiveValue.objects.filter(attribute=attribute).update(
+                name=name
+            )
+            _rename_saved_queries(attribute, old_name)
+            util.bump_generation(
+                util.generation_key(
+                    attribute.site_id, attribute.resource_name, old_name
+                )
+            )
+            attribute.bump_generation()
+
+    return updated
+
+
+def _rename_saved_queries(attribute, old_name):
+    """Rewrite SavedQuery objects using ``old_name`` to use ``attribute``."""
+    SavedQuery = apps.get_model("nsot", "SavedQuery")
+    saved_queries = SavedQuery.objects.filter(
+        site_id=attribute.site_id, resource_name=attribute.resource_name
+    )
+    for saved_query in saved_queries:
+        if old_name in saved_query.attribute_names:
+            saved_query.query = util.rename_set_query(
+                saved_query.query, old_name, attribute.name
+            )
+            saved_query.save()
+
+
+def convert_attribute(attribute, multi, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Convert ``attribute`` between single and multi-valued, rewriting the
+    values stored on every resource.
+
+    Converting to single-valued fails if any resource has more than one value.
+    The Attribute itself is converted after all of its values, so that an
+    interrupted conversion is resumed by running it again.
+
+    :param attribute:
+        Attribute object
+
+    :param multi:
+        Whether the attribute should become multi-valued
+
+    :param chunk_size:
+        Number of resources updated in each transaction
+
+    :param progress:
+        Optional callable passed ``(done, total)`` after each chunk
+    """
+    if multi == attribute.multi:
+        return 0
+
+    queryset = _resources_with(attribute)
+    model = queryset.model
+
+    if not multi:
+        if uses_value_rows():
+            conflicts = (
+                Value.objects.filter(attribute=attribute)
+                .values("resource_id")
+                .annotate(count=Count("id"))
+                .filter(count__gt=1)
+                .count()
+            )
+        else:
+            conflicts = sum(
+                1
+                for rows in _iter_chunks(queryset, chunk_size)
+                for _, cache in rows
+                if isinstance(cache.get(attribute.name), list)
+                and len(cache[attribute.name]) > 1
+            )
+        if conflicts:
+            raise exc.ValidationError(
+                {
+                    "multi": f"Attribute '{attribute.name}' has more than one "
+                    f"value on {conflicts} {attribute.resource_name} objects."
+                }
+            )
+
+    def update(rows):
+        caches = []
+        for rid, cache in rows:
+            cache = dict(cache or {})
+            value = cache.get(attribute.name)
+            if multi and not isinstance(value, list):
+                cache[attribute.name] = [value]
+            elif not multi and isinstance(value, list):
+                cache[attribute.name] = value[0]
+            caches.append((rid, cache))
+        _write_caches(model, caches)
+
+    # ``Value`` rows are stored one per value either way.
+    updated = _run(
+        attribute, queryset, update, {attribute.name}, chunk_size, progress
+    )
+
+    # Convert the default, if any, along with the attribute.
+    default = attribute.default
+    if default is not None:
+        attribute.default = [default] if multi else (default or [None])[0]
+    attribute.multi = multi
+    attribute.save()
+    return updated
@@ -0,0 +1,84 @@
+"""
+Assembly of Devices together with everything configured on them.
+
+Generating the configuration of a Device needs its Interfaces (and their
+addresses and networks), Circuits, Protocols and attributes. Fetching each of
+those separately, and then each related object of a Protocol one by one, takes
+a number of queries that grows with the size of the Device. Instead, Devices
+are bundled in chunks, with a constant number of queries per chunk.
+"""
+
+import logging
+from collections import defaultdict
+
+from .. import util
+from .circuit import Circuit
+from .interface import Interface
+from .protocol import Protocol
+
+__all__ = ("bundle", "bundles")
+
+log = logging.getLogger(__name__)
+
+# Maximum number of Devices bundled with a single set of queries.
+CHUNK_SIZE = 500
+
+
+def _by_device(queryset, devices):
+    """Return a dict of Device ID to the list of objects of ``queryset``."""
+    grouped = defaultdict(list)
+    for obj in queryset.filter(device__in=devices).order_by("id"):
+        grouped[obj.device_id].append(obj)
+    return grouped
+
+
+def bundles(devices, chunk_size=CHUNK_SIZE):
+    """
+    Yield a bundle for each of the ``devices``, in the order given.
+
+    A bundle is a dict with the ``device`` itself, and lists of its
+    ``interfaces``, ``circuits`` and ``protocols``. The objects they are
+    related to are fetched along with them, and Interfaces have their
+    ``addresses`` and ``networks`` cached, so using any of them doesn't issue
+    further queries.
+
+    Devices are bundled ``chunk_size`` at a time using 3 queries per chunk,
+    besides those fetching the Devices, so bundles may be streamed without
+    holding all of them in memory.
+
+    :param devices:
+        Iterable of Devices, such as a queryset
+
+    :param chunk_size:
+        Number of Devices bundled at once
+    """
+    if hasattr(devices, "iterator"):
+        devices = devices.iterator(chunk_size=chunk_size)
+
+    interfaces = Interface.objects.select_related("device", "parent")
+    protocols = Protocol.objects.select_related(
+        "type", "device", "interface", "circuit"
+    )
+
+    for chunk in util.chunked(devices, chunk_size):
+        log.debug("bundles() bundling %d devices", len(chunk))
+        by_device = {
+            "interfaces": _by_device(interfaces, chunk),
+            "circuits": Circuit.objects.by_device(chunk),
+            "protocols": _by_device(protocols, chunk),
+        }
+        for device in chunk:
+            bundled = {"device": device}
+            for key, grouped in by_device.items():
+                bundled[key] = grouped.get(device.id, [])
+            yield bundled
+
+
+def bundle(device):
+    """
+    Return the bundle of a single ``device``. See ``bundles()``.
+
+    :param device:
+        Device instance
+    """
+    return next(bundles([device]))
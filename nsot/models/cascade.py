@@ -0,0 +1,241 @@
+"""
+Set-based deletion of resources and everything that cascades from them.
+
+Deleting a Device through the ORM collects each of its Interfaces, Protocols
+and Assignments, then deletes them one at a time, running every signal
+handler for each of them along the way. Instead, the IDs of everything that
+would be deleted are computed up front and the rows are deleted with a few
+set-based queries per model. Network states are recomputed with one
+``UPDATE``, and receivers of ``attributes_changed`` are notified once per
+model and Site.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .. import exc, signals, util
+from .assignment import Assignment
+from .change import Change
+from .circuit import Circuit
+from .device import Device
+from .effective_value import EffectiveValue
+from .interface import Interface, change_api_updated_at
+from .network import Network
+from .protocol import Protocol
+from .value import Value
+
+__all__ = ("CASCADE_MODELS", "collect", "delete_cascade", "delete_rows")
+
+log = logging.getLogger(__name__)
+
+# Maximum number of IDs passed to a single ``__in`` lookup.
+CHUNK_SIZE = 500
+
+# Objects are deleted in this order, so dependents are deleted first.
+DELETE_ORDER = (Protocol, Circuit, Interface, Device, Network)
+
+# Resources that may be deleted using delete_cascade(). Networks have their
+# own rules for deletion (see Network.delete()).
+CASCADE_MODELS = (Protocol, Circuit, Interface, Device)
+
+
+def _ids(model, lookup, ids):
+    """Return the IDs of ``model`` objects whose ``lookup`` is in ``ids``."""
+    found = set()
+    for chunk in util.chunked(ids, CHUNK_SIZE):
+        found.update(
+            model.objects.filter(**{lookup + "__in": chunk}).values_list(
+                "id", flat=True
+            )
+        )
+    return found
+
+
+def collect(model, ids):
+    """
+    Return a dict mapping each model in ``DELETE_ORDER`` to the set of IDs of
+    its objects that deleting the ``model`` objects with ``ids`` would
+    delete.
+
+    :param model:
+        Resource model class
+
+    :param ids:
+        Iterable of IDs
+    """
+    collected = {m: set() for m in DELETE_ORDER}
+    collected[model].update(ids)
+
+    collected[Interface] |= _ids(Interface, "device_id", collected[Device])
+    for related, lookup in (
+        (Device, "device_id"),
+        (Interface, "interface_id"),
+        (Circuit, "circuit_id"),
+    ):
+        collected[Protocol] |= _ids(Protocol, lookup, collected[related])
+
+    return collected
+
+
+def check_protected(collected):
+    """
+    Raise ``ProtectedError`` if any of the ``collected`` objects are
+    protected by objects that would not be deleted along with them, such as
+    a Circuit using one of the Interfaces.
+
+    :param collected:
+        Dict as returned by ``collect()``
+    """
+    interface_ids = collected[Interface]
+    circuits, children = set(), set()
+    for chunk in util.chunked(interface_ids, CHUNK_SIZE):
+        circuits.update(
+            Circuit.objects.filter(
+                Q(endpoint_a_id__in=chunk) | Q(endpoint_z_id__in=chunk)
+            ).values_list("id", flat=True)
+        )
+        children.update(
+            Interface.objects.filter(parent_id__in=chunk).values_list(
+                "id", flat=True
+            )
+        )
+
+    protected = [
+        *Circuit.objects.filter(id__in=circuits - collected[Circuit]),
+        *Interface.objects.filter(id__in=children - interface_ids),
+    ]
+    if protected:
+        raise exc.ProtectedError(
+            "Cannot delete some instances of model 'Interface' because they "
+            "are referenced through protected foreign keys: %s."
+            % ", ".join(sorted(str(obj) for obj in protected)),
+            set(protected),
+        )
+
+
+def delete_rows(collected):
+    """
+    Delete the ``collected`` objects without running per-object signal
+    handlers, and notify receivers of ``attributes_changed`` of the deleted
+    resources.
+
+    This must be called in a transaction. Protected objects aren't checked
+    for, see ``check_protected()``.
+
+    Returns a dict of resource name to the number of objects deleted.
+
+    :param collected:
+        Dict as returned by ``collect()``
+    """
+    counts = {}
+    for model in DELETE_ORDER:
+        ids = collected.get(model)
+        if not ids:
+            continue
+
+        resource_name = model.__name__
+        if model is Interface:
+            # Parents may be deleted before their children, which databases
+            # that check foreign keys immediately (e.g. MySQL) refuse.
+            for chunk in util.chunked(sorted(ids), CHUNK_SIZE):
+                Interface.objects.filter(
+                    id__in=chunk, parent_id__isnull=False
+                ).update(parent=None)
+
+        by_site = defaultdict(list)
+        for chunk in util.chunked(sorted(ids), CHUNK_SIZE):
+            objects = model.objects.filter(id__in=chunk)
+            for object_id, site_id in objects.values_list("id", "site_id"):
+                by_site[site_id].append(object_id)
+
+            if model is Interface:
+                assignments = Assignment.objects.filter(interface_id__in=chunk)
+                address_ids = list(
+                    assignments.values_list("address_id", flat=True)
+                )
+                assignments._raw_delete(assignments.db)
+
+                # Addresses that are no longer assigned anywhere go back to
+                # being allocated.
+                for addresses in util.chunked(address_ids, CHUNK_SIZE):
+                    Network.objects.filter(id__in=addresses).exclude(
+                        id__in=Assignment.objects.filter(
+                            address_id__in=addresses
+                        ).values("address_id")
+                    ).update(state=Network.ALLOCATED, version=F("version") + 1)
+
+            Value.objects.filter(
+                resource_name=resource_name, resource_id__in=chunk
+            ).delete()
+            EffectiveValue.objects.filter(
+                resource_name=resource_name, resource_id__in=chunk
+            ).delete()
+
+            # Everything that depends on these objects is gone, so delete
+            # them directly instead of collecting each one to send its
+            # signals.
+            objects._raw_delete(objects.db)
+
+        for site_id, resource_ids in by_site.items():
+            signals.attributes_changed.send(
+                sender=model,
+                site_id=site_id,
+                resource_ids=resource_ids,
+                names=None,
+            )
+        counts[resource_name] = sum(map(len, by_site.values()))
+
+    if collected.get(Device) or collected.get(Interface):
+        transaction.on_commit(change_api_updated_at)
+
+    return counts
+
+
+def delete_cascade(model, ids, user=None):
+    """
+    Delete the ``model`` objects with ``ids`` and everything that cascades
+    from them, such as the Interfaces and Protocols of a Device, all in one
+    transaction.
+
+    If ``user`` is given, a ``Delete`` Change is recorded for each of the
+    ``model`` objects.
+
+    Returns a dict of resource name to the number of objects deleted.
+
+    Raises ``ProtectedError`` if any object that would be deleted is still
+    in use, in which case nothing is deleted.
+
+    :param model:
+        One of ``CASCADE_MODELS``
+
+    :param ids:
+        Iterable of IDs
+
+    :param user:
+        Optional User the ``Change`` records are attributed to
+    """
+    if model not in CASCADE_MODELS:
+        raise exc.ValidationError(
+            "Cascading deletion is not supported for %s." % model.__name__
+        )
+
+    ids = set(ids)
+    with transaction.atomic():
+        collected = collect(model, ids)
+        check_protected(collected)
+
+        if user is not None:
+            for chunk in util.chunked(sorted(ids), CHUNK_SIZE):
+                Change.bulk_record(
+                    model.objects.filter(id__in=chunk).order_by("id"),
+                    user=user,
+                    event="Delete",
+                )
+
+        counts = delete_rows(collected)
+
+    log.debug("delete_cascade() deleted %r", counts)
+    return counts
@@ -90,6 +90,41 @@ class Change(models.Model):
         serializer_class = resource_name + "Serializer"
         return getattr(serializers, serializer_class)
 
+    @classmethod
+    def bulk_record(cls, objects, user, event):
+        """
+        Record the same ``event`` for many ``objects`` at once.
+
+        All objects must be of the same Resource type. The objects are
+        serialized together, so related data may be prefetched by the caller.
+        Returns the list of created Change objects.
+        """
+        objects = list(objects)
+        if not objects:
+            return []
+
+        change = cls()
+        event = change.clean_event(event)
+        resource_name = change.clean_resource_name(
+            objects[0].__class__.__name__
+        )
+        serializer_class = cls.get_serializer_for_resource(resource_name)
+        data = serializer_class(objects, many=True).data
+
+        return cls.objects.bulk_create(
+            [
+                cls(
+                    site=change.clean_site(obj),
+                    user=user,
+                    event=event,
+                    resource_name=resource_name,
+                    resource_id=obj.id,
+                    _resource=resource,
+                )
+                for obj, resource in zip(objects, data, strict=True)
+            ]
+        )
+
     def clean_event(self, value):
         if value not in constants.CHANGE_EVENTS:
             raise exc.ValidationError("Invalid change event: %r." % value)
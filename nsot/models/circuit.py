@@ -1,7 +1,70 @@
 from django.db import models
 
 from .. import exc, util
-from .resource import Resource
+from .assignment import Assignment
+from .network import Network
+from .resource import Resource, ResourceManager
+
+
+class CircuitManager(ResourceManager):
+    """Manager for Circuit objects."""
+
+    def for_devices(self, devices):
+        """
+        Return the Circuits with an endpoint on any of ``devices``, with both
+        endpoints selected along with them.
+
+        :param devices:
+            Iterable of Device objects or IDs, or a queryset of Devices
+        """
+        if not isinstance(devices, models.QuerySet):
+            devices = [getattr(d, "pk", d) for d in devices]
+
+        return self.filter(
+            models.Q(endpoint_a__device__in=devices)
+            | models.Q(endpoint_z__device__in=devices)
+        ).select_related("endpoint_a", "endpoint_z")
+
+    def addresses_for(self, circuits):
+        """
+        Return the addresses assigned to the endpoints of ``circuits`` or to
+        any of their descendant Interfaces, ordered by ID.
+
+        :param circuits:
+            Iterable of Circuit objects or IDs, or a queryset of Circuits
+        """
+        from .interface import Interface
+
+        if not isinstance(circuits, models.QuerySet):
+            circuits = [getattr(c, "pk", c) for c in circuits]
+
+        endpoints = Interface.objects.filter(
+            models.Q(circuit_a__in=circuits) | models.Q(circuit_z__in=circuits)
+        )
+        interfaces = Interface.objects.descendants_of(
+            endpoints, include_self=True
+        )
+        return Network.objects.filter(
+            id__in=Assignment.objects.filter(interface__in=interfaces).values(
+                "address_id"
+            )
+        ).order_by("id")
+
+    def by_device(self, devices):
+        """
+        Return a dict mapping the ID of each of ``devices`` to the list of
+        its Circuits, ordered by ID, using a single query.
+
+        :param devices:
+            Iterable of Device objects or IDs
+        """
+        circuits = {getattr(d, "pk", d): [] for d in devices}
+        for circuit in self.for_devices(circuits).order_by("id"):
+            endpoints = (circuit.endpoint_a, circuit.endpoint_z)
+            device_ids = {e.device_id for e in endpoints if e is not None}
+            for device_id in device_ids & circuits.keys():
+                circuits[device_id].append(circuit)
+        return circuits
 
 
 class Circuit(Resource):
@@ -65,6 +128,9 @@ class Circuit(Resource):
         ),
     )
 
+    # Implements .objects.for_devices(), .by_device() and .addresses_for()
+    objects = CircuitManager()
+
     def __str__(self):
         return "%s" % self.name
 
@@ -92,16 +158,7 @@ class Circuit(Resource):
 
         This includes addresses associated with all descendant interfaces.
         """
-        addresses = []
-        for interface in self.interfaces:
-            addresses.extend(interface.addresses.all())
-
-            # For each interface, get addresses of all descendant interfaces
-            # (children, grandchildren, etc.) and extend the list.
-            for descendant in interface.get_descendants():
-                addresses.extend(descendant.addresses.all())
-
-        return addresses
+        return Circuit.objects.addresses_for([self])
 
     @property
     def devices(self):
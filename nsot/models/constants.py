@@ -17,6 +17,7 @@ RESOURCE_BY_IDX = (
     "Circuit",
     "Protocol",
     "ProtocolType",
+    "SavedQuery",
 )
 RESOURCE_BY_NAME = OrderedDict(
     (obj_type, idx) for idx, obj_type in enumerate(RESOURCE_BY_IDX)
@@ -44,6 +45,18 @@ EVENT_CHOICES = [(c, c) for c in CHANGE_EVENTS]
 IP_VERSION_CHOICES = [(c, c) for c in settings.IP_VERSIONS]
 RESOURCE_CHOICES = [(c, c) for c in VALID_ATTRIBUTE_RESOURCES]
 
+# Types that Attribute values may be constrained to, which enable comparison
+# operators in set queries.
+ATTRIBUTE_TYPES = ("int", "float", "ip", "cidr")
+
+# Value fields that hold typed copies of the value for indexed lookups.
+TYPED_VALUE_FIELDS = (
+    "value_int",
+    "value_float",
+    "value_ip_low",
+    "value_ip_high",
+)
+
 # Resource types that support parent-child hierarchy (inheritable attributes)
 INHERITABLE_RESOURCES = ("Network", "Interface")
 
@@ -33,14 +33,7 @@ class Device(Resource):
     @property
     def circuits(self):
         """All circuits related to this Device."""
-        interfaces = self.interfaces.all()
-        circuits = []
-        for intf in interfaces:
-            try:
-                circuits.append(intf.circuit)
-            except Circuit.DoesNotExist:
-                continue
-        return circuits
+        return Circuit.objects.for_devices([self]).order_by("id")
 
     def clean_hostname(self, value):
         if not value:
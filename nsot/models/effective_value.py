@@ -0,0 +1,343 @@
+import logging
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import models, transaction
+
+from .. import util
+from . import constants
+from .attribute import Attribute
+from .attribute_backend import uses_value_rows
+from .value import Value
+
+log = logging.getLogger(__name__)
+
+# Maximum number of IDs passed to a single ``__in`` lookup.
+CHUNK_SIZE = 500
+
+
+class EffectiveValueManager(models.Manager):
+    """
+    Manager for EffectiveValue objects that maintains the materialized
+    inheritance of attribute values down resource hierarchies.
+    """
+
+    def refresh(self, model, site_id, root_ids, names=None):
+        """
+        Recompute effective values for the subtrees rooted at ``root_ids``.
+
+        Effective values of a node's parent that is outside of the subtrees
+        are read from the table, so only the affected subtrees are visited.
+
+        :param model:
+            Resource model class (``Network`` or ``Interface``)
+
+        :param site_id:
+            ID of the Site the resources are under
+
+        :param root_ids:
+            Iterable of IDs of the subtree roots
+
+        :param names:
+            Set of attribute names to recompute, or ``None`` for all
+            inheritable attributes
+        """
+        resource_name = model.__name__
+        if resource_name not in constants.INHERITABLE_RESOURCES:
+            return
+
+        attributes = Attribute.objects.filter(
+            site_id=site_id, resource_name=resource_name, inheritable=True
+        )
+        if names is not None:
+            attributes = attributes.filter(name__in=names)
+        attributes = {a.name: a for a in attributes}
+        if not attributes:
+            return
+
+        # Map of node ID => parent ID for every node in the subtrees.
+        roots = model.objects.filter(id__in=list(root_ids))
+        if resource_name == "Interface":
+            # Interfaces can fetch every subtree in one query.
+            nodes = dict(
+                model.objects.descendants_of(
+                    roots, include_self=True
+                ).values_list("id", "parent_id")
+            )
+        else:
+            nodes = {}
+            for root in roots:
+                nodes[root.id] = root.parent_id
+                nodes.update(
+                    root.get_descendants().values_list("id", "parent_id")
+                )
+        if not nodes:
+            return
+
+        # (resource_id, name) => (source_id, [values])
+        effective = {}
+        explicit = defaultdict(list)
+        for ids in util.chunked(nodes, CHUNK_SIZE):
+            if uses_value_rows():
+                values = Value.objects.filter(
+                    resource_name=resource_name,
+                    resource_id__in=ids,
+                    name__in=attributes,
+                ).order_by("id")
+                for rid, name, value in values.values_list(
+                    "resource_id", "name", "value"
+                ):
+                    explicit[rid, name].append(value)
+                continue
+
+            objects = model.objects.filter(id__in=ids)
+            for rid, cache in objects.values_list("id", "_attributes_cache"):
+                for name in attributes:
+                    value = (cache or {}).get(name)
+                    if value in (None, []):
+                        continue
+                    explicit[rid, name].extend(
+                        value if isinstance(value, list) else [value]
+                    )
+
+        outside = {p for p in nodes.values() if p is not None} - set(nodes)
+        for ids in util.chunked(outside, CHUNK_SIZE):
+            rows = self.filter(
+                resource_name=resource_name,
+                resource_id__in=ids,
+                name__in=attributes,
+            ).order_by("id")
+            for rid, name, value, source_id in rows.values_list(
+                "resource_id", "name", "value", "source_id"
+            ):
+                effective.setdefault((rid, name), (source_id, []))[1].append(
+                    value
+                )
+
+        # Resolve each node by walking up until an explicit value, a resolved
+        # node or the edge of the subtree is found.
+        for name in attributes:
+            for node in nodes:
+                chain = []
+                current = node
+                while True:
+                    if (current, name) in effective:
+                        resolved = effective[current, name]
+                        break
+                    if current is None or current not in nodes:
+                        resolved = None
+                        break
+                    if (current, name) in explicit:
+                        resolved = (current, explicit[current, name])
+                        break
+                    chain.append(current)
+                    current = nodes[current]
+                for item in chain:
+                    effective[item, name] = resolved
+                effective[current, name] = resolved
+
+        inserts = []
+        for node in nodes:
+            for name, attribute in attributes.items():
+                resolved = effective.get((node, name))
+                if resolved is None:
+                    continue
+                source_id, values = resolved
+                inserts.extend(
+                    self.model(
+                        attribute=attribute,
+                        name=name,
+                        value=value,
+                        resource_name=resource_name,
+                        resource_id=node,
+                        source_id=source_id,
+                        site_id=site_id,
+                    )
+                    for value in values
+                )
+
+        with transaction.atomic():
+            for ids in util.chunked(nodes, CHUNK_SIZE):
+                self.filter(
+                    resource_name=resource_name,
+                    resource_id__in=ids,
+                    name__in=attributes,
+                ).delete()
+            self.bulk_create(inserts, batch_size=CHUNK_SIZE)
+
+        log.debug(
+            "Refreshed %d effective values for %d %s objects",
+            len(inserts),
+            len(nodes),
+            resource_name,
+        )
+
+    def rebuild_attribute(self, attribute):
+        """
+        Rebuild all effective values for a single ``attribute``, such as when
+        its ``inheritable`` flag is toggled.
+        """
+        self.filter(attribute=attribute).delete()
+        if not attribute.inheritable:
+            return
+
+        model = apps.get_model("nsot", attribute.resource_name)
+        roots = model.objects.filter(
+            site_id=attribute.site_id, parent__isnull=True
+        ).values_list("id", flat=True)
+        self.refresh(model, attribute.site_id, roots, names={attribute.name})
+
+    def get_inherited(self, model, resource_ids):
+        """
+        Return inherited attribute values for many resources at once.
+
+        Returns a dict keyed by resource ID of dicts in the same format as
+        ``Resource.get_merged_attributes()``, containing only the values
+        inherited from an ancestor.
+
+        :param model:
+            Resource model class
+
+        :param resource_ids:
+            Iterable of resource IDs
+        """
+        resource_name = model.__name__
+        rows = []
+        for ids in util.chunked(resource_ids, CHUNK_SIZE):
+            query = (
+                self.filter(resource_name=resource_name, resource_id__in=ids)
+                .exclude(source_id=models.F("resource_id"))
+                .order_by("id")
+            )
+            rows.extend(
+                query.values_list(
+                    "resource_id",
+                    "name",
+                    "value",
+                    "source_id",
+                    "attribute__multi",
+                )
+            )
+
+        sources = {}
+        source_ids = {row[3] for row in rows}
+        for ids in util.chunked(source_ids, CHUNK_SIZE):
+            sources.update(
+                (obj.id, str(obj)) for obj in model.objects.filter(id__in=ids)
+            )
+
+        result = defaultdict(dict)
+        for rid, name, value, source_id, multi in rows:
+            attrs = result[rid]
+            if multi:
+                attrs.setdefault(
+                    name,
+                    {
+                        "value": [],
+                        "source": sources[source_id],
+                        "inherited": True,
+                    },
+                )["value"].append(value)
+            else:
+                attrs[name] = {
+                    "value": value,
+                    "source": sources[source_id],
+                    "inherited": True,
+                }
+
+        return result
+
+
+class EffectiveValue(models.Model):
+    """
+    The resolved value of an inheritable Attribute for a Resource.
+
+    There is one row per value for every resource that either has an explicit
+    value or inherits one from its nearest ancestor. ``source_id`` is the ID
+    of the resource the value came from, which is the resource itself for
+    explicit values. These are derived from ``Value`` and are maintained
+    automatically.
+    """
+
+    attribute = models.ForeignKey(
+        "Attribute",
+        related_name="effective_values",
+        db_index=True,
+        on_delete=models.CASCADE,
+        help_text="The Attribute to which this EffectiveValue is assigned.",
+    )
+    name = models.CharField(
+        "Name",
+        max_length=64,
+        null=False,
+        help_text="The name of the Attribute. (Internal use only)",
+    )
+    value = models.CharField(
+        max_length=255,
+        null=False,
+        blank=True,
+        help_text="The resolved Attribute value.",
+    )
+    resource_id = models.IntegerField(
+        "Resource ID",
+        null=False,
+        help_text="The unique ID of the Resource the value applies to.",
+    )
+    resource_name = models.CharField(
+        "Resource Type",
+        max_length=20,
+        null=False,
+        choices=constants.RESOURCE_CHOICES,
+        help_text="The name of the Resource type the value applies to.",
+    )
+    source_id = models.IntegerField(
+        "Source ID",
+        null=False,
+        help_text="The unique ID of the Resource the value is set on.",
+    )
+    site = models.ForeignKey(
+        "Site",
+        db_index=True,
+        related_name="effective_values",
+        on_delete=models.CASCADE,
+        verbose_name="Site",
+        help_text="Unique ID of the Site this EffectiveValue is under.",
+    )
+
+    objects = EffectiveValueManager()
+
+    def __str__(self):
+        return "%s:%s %s=%s (source: %s)" % (
+            self.resource_name,
+            self.resource_id,
+            self.name,
+            self.value,
+            self.source_id,
+        )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["name", "value", "resource_name"]),
+            models.Index(fields=["resource_name", "resource_id"]),
+        ]
+
+    @property
+    def inherited(self):
+        return self.source_id != self.resource_id
+
+
+# Signals
+def refresh_effective_values(
+    sender, site_id, resource_ids, names=None, **kwargs
+):
+    """
+    Recompute effective values below resources whose inheritable attribute
+    values changed.
+
+    Creation and deletion (``names`` is ``None``) are handled by the
+    hierarchy itself, since those also move nodes around.
+    """
+    if names is None or sender.__name__ not in constants.INHERITABLE_RESOURCES:
+        return
+
+    EffectiveValue.objects.refresh(sender, site_id, resource_ids, names=names)
@@ -1,20 +1,480 @@
+import ipaddress
 import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
 
 from django.conf import settings
 from django.core.cache import cache as djcache
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import BigIntegerField, ExpressionWrapper, F
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Concat
 from django.utils import timezone
 
-from .. import exc, fields, util, validators
+from .. import exc, fields, signals, util, validators
 from . import constants
 from .assignment import Assignment
 from .circuit import Circuit
 from .device import Device
+from .effective_value import EffectiveValue
 from .network import Network
-from .resource import Resource
+from .resource import Resource, ResourceManager
 
 log = logging.getLogger(__name__)
 
+# Maximum number of IDs passed to a single ``__in`` lookup.
+CHUNK_SIZE = 500
+
+# IDs of Interfaces whose address caches are waiting to be refreshed within
+# deferred_address_refresh().
+_deferred = threading.local()
+
+
+class InterfaceManager(ResourceManager):
+    """
+    Manager for Interface objects that traverses the Interface hierarchy
+    using recursive common table expressions, so that each traversal is a
+    single query no matter how deep the tree is.
+    """
+
+    def _tree_sql(self, interfaces, ascending, select, select_params=()):
+        """
+        Return ``(sql, params)`` for a recursive query over the hierarchy.
+
+        The ``tree`` it selects from has a row of ``(origin, id, parent_id,
+        depth)`` for every Interface in ``interfaces`` (at depth 0) and each
+        of their ancestors if ``ascending``, or descendants otherwise.
+
+        :param interfaces:
+            Iterable of Interface objects or IDs, or a queryset of Interfaces
+
+        :param ascending:
+            Whether to walk up (ancestors) or down (descendants)
+
+        :param select:
+            SQL query selecting from ``tree``
+
+        :param select_params:
+            Parameters for ``select``
+        """
+        if isinstance(interfaces, models.QuerySet):
+            seed, params = interfaces.values("id").query.sql_with_params()
+        else:
+            params = [getattr(i, "pk", i) for i in interfaces] or [None]
+            seed = ", ".join(["%s"] * len(params))
+
+        # Only the table name, the seed query and the join condition are
+        # interpolated; values are parameters.
+        sql = (
+            "WITH RECURSIVE tree(origin, id, parent_id, depth) AS ("  # noqa: S608
+            "SELECT id, id, parent_id, 0 FROM %(table)s WHERE id IN (%(seed)s) "
+            "UNION ALL "
+            "SELECT tree.origin, t.id, t.parent_id, tree.depth + 1 "
+            "FROM %(table)s t INNER JOIN tree ON %(join)s) %(select)s"
+            % {
+                "table": connection.ops.quote_name(self.model._meta.db_table),
+                "seed": seed,
+                "join": (
+                    "t.id = tree.parent_id"
+                    if ascending
+                    else "t.parent_id = tree.id"
+                ),
+                "select": select,
+            }
+        )
+        return sql, (*params, *select_params)
+
+    def _tree(self, interfaces, ascending, include_self):
+        """Return Interfaces in the trees of ``interfaces``."""
+        sql, params = self._tree_sql(
+            interfaces,
+            ascending,
+            "SELECT id FROM tree WHERE depth >= %s",
+            (0 if include_self else 1,),
+        )
+        return self.filter(id__in=RawSQL(sql, params))  # noqa: S611
+
+    def ancestors_of(self, interfaces, include_self=False):
+        """
+        Return the ancestors of many Interfaces at once.
+
+        :param interfaces:
+            Iterable of Interface objects or IDs, or a queryset of Interfaces
+
+        :param include_self:
+            Whether to include ``interfaces`` themselves
+        """
+        return self._tree(interfaces, True, include_self)
+
+    def descendants_of(self, interfaces, include_self=False):
+        """
+        Return the descendants of many Interfaces at once.
+
+        :param interfaces:
+            Iterable of Interface objects or IDs, or a queryset of Interfaces
+
+        :param include_self:
+            Whether to include ``interfaces`` themselves
+        """
+        return self._tree(interfaces, False, include_self)
+
+    def refresh_address_caches(self, interface_ids):
+        """
+        Recompute the cached addresses and networks of many Interfaces at
+        once, such as after the Network hierarchy above their addresses
+        changed, and store the ones that changed in bulk.
+
+        Returns the IDs of the Interfaces that were updated.
+
+        :param interface_ids:
+            Iterable of Interface IDs
+        """
+        updated = []
+        for ids in util.chunked(set(interface_ids), CHUNK_SIZE):
+            addresses = defaultdict(list)
+            networks = defaultdict(dict)
+            assignments = (
+                Assignment.objects.filter(interface_id__in=ids)
+                .order_by("id")
+                .values_list(
+                    "interface_id",
+                    "address__network_address",
+                    "address__prefix_length",
+                    "address__parent_id",
+                    "address__parent__network_address",
+                    "address__parent__prefix_length",
+                )
+            )
+            for row in assignments:
+                interface_id, address, prefix_length, parent_id = row[:4]
+                addresses[interface_id].append(f"{address}/{prefix_length}")
+                if parent_id is not None:
+                    networks[interface_id][parent_id] = "%s/%s" % row[4:]
+
+            objects = []
+            caches = self.filter(id__in=ids).values_list(
+                "id", "_addresses_cache", "_networks_cache"
+            )
+            for interface_id, old_addresses, old_networks in caches:
+                new_addresses = addresses[interface_id]
+                new_networks = [
+                    cidr for _, cidr in sorted(networks[interface_id].items())
+                ]
+                if (new_addresses, new_networks) == (
+                    old_addresses,
+                    old_networks,
+                ):
+                    continue
+                objects.append(
+                    self.model(
+                        id=interface_id,
+                        _addresses_cache=new_addresses,
+                        _networks_cache=new_networks,
+                        version=F("version") + 1,
+                    )
+                )
+
+            self.bulk_update(
+                objects,
+                ["_addresses_cache", "_networks_cache", "version"],
+                batch_size=CHUNK_SIZE,
+            )
+            updated.extend(obj.id for obj in objects)
+
+        if updated:
+            change_api_updated_at()
+        return updated
+
+    def _host_addresses(self, site_id, addresses):
+        """
+        Return a dict mapping each of ``addresses`` that exists as a host
+        Network in the Site to that Network's ID.
+
+        :param site_id:
+            ID of the Site
+
+        :param addresses:
+            Iterable of ``ipaddress`` host networks
+        """
+        addresses = set(addresses)
+        found = {}
+        for chunk in util.chunked(addresses, CHUNK_SIZE):
+            rows = Network.objects.filter(
+                site_id=site_id,
+                network_address__in={str(a.network_address) for a in chunk},
+                prefix_length__in={a.prefixlen for a in chunk},
+            ).values_list("id", "network_address", "prefix_length")
+            for network_id, network_address, prefix_length in rows:
+                address = ipaddress.ip_network(
+                    f"{network_address}/{prefix_length}"
+                )
+                if address in addresses:
+                    found[address] = network_id
+        return found
+
+    def _create_host_addresses(self, site_id, addresses):
+        """
+        Create host Networks for ``addresses`` in bulk, each beneath its
+        closest parent Network, and return their IDs the way
+        ``_host_addresses()`` does.
+
+        :param site_id:
+            ID of the Site
+
+        :param addresses:
+            Iterable of ``ipaddress`` host networks that don't exist yet
+        """
+        addresses = sorted(set(addresses), key=lambda a: (a.version, a))
+        new = []
+        for chunk in util.chunked(addresses, CHUNK_SIZE):
+            # Every Network that contains any address of the chunk.
+            query = models.Q()
+            for address in chunk:
+                query |= models.Q(
+                    ip_version=str(address.version),
+                    prefix_length__lt=address.prefixlen,
+                    network_address__lte=str(address.network_address),
+                    broadcast_address__gte=str(address.broadcast_address),
+                )
+            rows = Network.objects.filter(
+                query, site_id=site_id, is_ip=False
+            ).values_list("id", "network_address", "prefix_length")
+            supernets = sorted(
+                (
+                    (
+                        ipaddress.ip_network(
+                            f"{network_address}/{prefix_length}"
+                        ),
+                        network_id,
+                    )
+                    for network_id, network_address, prefix_length in rows
+                ),
+                key=lambda s: s[0].prefixlen,
+                reverse=True,
+            )
+
+            for address in chunk:
+                parent_id = next(
+                    (
+                        network_id
+                        for supernet, network_id in supernets
+                        if supernet.version == address.version
+                        and address.subnet_of(supernet)
+                    ),
+                    None,
+                )
+                if parent_id is None:
+                    raise exc.ValidationError("IP Address needs base network.")
+
+                # Fields are derived as Network.save() does. Like any new
+                # Network, these are allocated until they are assigned.
+                network = Network(
+                    site_id=site_id, parent_id=parent_id, cidr=str(address)
+                )
+                network.clean_fields()
+                new.append(network)
+
+        Network.objects.bulk_create(new, batch_size=CHUNK_SIZE)
+
+        # Not every database returns the IDs of bulk-created rows.
+        created = self._host_addresses(site_id, addresses)
+        EffectiveValue.objects.refresh(Network, site_id, created.values())
+        signals.attributes_changed.send(
+            sender=Network,
+            site_id=site_id,
+            resource_ids=list(created.values()),
+            names=None,
+        )
+        return created
+
+    def assign_addresses(self, addresses):
+        """
+        Assign host addresses to many Interfaces at once.
+
+        Existing addresses are looked up together, missing ones are created
+        in bulk, every Assignment is created with one insert, and the state
+        of the addresses and the address caches of the Interfaces are then
+        updated in bulk. Addresses already assigned to an Interface are
+        skipped.
+
+        This is all or nothing: if any address is invalid or already assigned
+        to another Interface on the same Device, nothing is assigned.
+
+        Returns the number of Assignments created.
+
+        :param addresses:
+            Dict mapping Interface objects to lists of host CIDRs
+        """
+        interfaces = {}
+        wanted = defaultdict(dict)  # (site_id, address) -> {interface_id}
+        for interface, cidrs in addresses.items():
+            if not isinstance(cidrs, list):
+                raise exc.ValidationError(
+                    {"addresses": f"Expected list but received {type(cidrs)}"}
+                )
+            interfaces[interface.id] = interface
+            for cidr in cidrs:
+                validators.validate_host_address(cidr)
+                address = ipaddress.ip_network(str(cidr))
+                wanted[interface.site_id, address][interface.id] = interface
+
+        if not interfaces:
+            return 0
+
+        with transaction.atomic():
+            by_site = defaultdict(set)
+            for site_id, address in wanted:
+                by_site[site_id].add(address)
+
+            network_ids = {}
+            for site_id, site_addresses in by_site.items():
+                found = self._host_addresses(site_id, site_addresses)
+                network_ids.update(
+                    ((site_id, address), network_id)
+                    for address, network_id in found.items()
+                )
+
+            # An address may only be assigned once per Device.
+            taken = {}
+            device_ids = {i.device_id for i in interfaces.values()}
+            for ids in util.chunked(set(network_ids.values()), CHUNK_SIZE):
+                existing = Assignment.objects.filter(
+                    address_id__in=ids, interface__device_id__in=device_ids
+                ).values_list(
+                    "address_id", "interface__device_id", "interface_id"
+                )
+                for address_id, device_id, interface_id in existing:
+                    taken[address_id, device_id] = interface_id
+
+            for key, targets in wanted.items():
+                devices = {}
+                for interface in targets.values():
+                    other = devices.setdefault(interface.device_id, interface)
+                    assigned = taken.get(
+                        (network_ids.get(key), interface.device_id)
+                    )
+                    if other is not interface or assigned not in (
+                        None,
+                        interface.id,
+                    ):
+                        raise exc.ValidationError(
+                            {
+                                "address": (
+                                    "Address already assigned to this Device."
+                                )
+                            }
+                        )
+
+            for site_id, site_addresses in by_site.items():
+                missing = [
+                    a
+                    for a in site_addresses
+                    if (site_id, a) not in network_ids
+                ]
+                if missing:
+                    created = self._create_host_addresses(site_id, missing)
+                    network_ids.update(
+                        ((site_id, address), network_id)
+                        for address, network_id in created.items()
+                    )
+
+            assignments = []
+            for key, targets in wanted.items():
+                address_id = network_ids[key]
+                for interface in targets.values():
+                    if taken.get((address_id, interface.device_id)) is None:
+                        assignments.append(
+                            Assignment(
+                                interface_id=interface.id,
+                                address_id=address_id,
+                            )
+                        )
+            Assignment.objects.bulk_create(assignments, batch_size=CHUNK_SIZE)
+
+            address_ids = {a.address_id for a in assignments}
+            for ids in util.chunked(address_ids, CHUNK_SIZE):
+                Network.objects.filter(id__in=ids).exclude(
+                    state=Network.ASSIGNED
+                ).update(state=Network.ASSIGNED, version=F("version") + 1)
+
+            self.refresh_address_caches(interfaces)
+
+        # Bring the Interfaces we were given up to date.
+        fields = ("_addresses_cache", "_networks_cache", "version")
+        for ids in util.chunked(interfaces, CHUNK_SIZE):
+            rows = self.filter(id__in=ids).values_list("id", *fields)
+            for interface_id, *values in rows:
+                interface = interfaces[interface_id]
+                for field, value in zip(fields, values, strict=True):
+                    setattr(interface, field, value)
+                interface._record_loaded_values(set(fields))
+
+        return len(assignments)
+
+    def get_root_ids(self, interfaces):
+        """
+        Return a dict mapping the ID of each of many Interfaces to the ID of
+        the root of its tree, which is itself if it has no parent.
+
+        :param interfaces:
+            Iterable of Interface objects or IDs, or a queryset of Interfaces
+        """
+        sql, params = self._tree_sql(
+            interfaces,
+            True,
+            "SELECT origin, id FROM tree WHERE parent_id IS NULL",
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return dict(cursor.fetchall())
+
+    def by_mac_address(self, mac_addresses, site_id=None):
+        """
+        Return a dict mapping each of many MAC addresses, as integers, to the
+        list of Interfaces that have it. Each Interface is a dict of its
+        ``id``, ``name_slug``, ``device``, ``device_hostname`` and
+        ``addresses``, ordered by ID.
+
+        MAC addresses are matched against the indexed integer column
+        directly, so no ``EUI`` objects are constructed.
+
+        :param mac_addresses:
+            Iterable of MAC addresses as integers (see ``util.mac_to_int()``)
+
+        :param site_id:
+            (Optional) ID of the Site to limit Interfaces to
+        """
+        objects = self.annotate(
+            mac=ExpressionWrapper(
+                F("mac_address"), output_field=BigIntegerField()
+            )
+        ).order_by("id")
+        if site_id is not None:
+            objects = objects.filter(site=site_id)
+
+        found = {mac: [] for mac in mac_addresses}
+        for macs in util.chunked(found, CHUNK_SIZE):
+            rows = objects.filter(mac__in=macs).values_list(
+                "mac",
+                "id",
+                "name_slug",
+                "device_id",
+                "device_hostname",
+                "_addresses_cache",
+            )
+            for mac, pk, name_slug, device, hostname, addresses in rows:
+                found[mac].append(
+                    {
+                        "id": pk,
+                        "name_slug": name_slug,
+                        "device": device,
+                        "device_hostname": hostname,
+                        "addresses": addresses,
+                    }
+                )
+        return found
+
 
 class Interface(Resource):
     """A network interface."""
@@ -171,9 +631,13 @@ class Interface(Resource):
     # Where list of attached networks is cached.
     _networks_cache = fields.JSONField(null=False, blank=True, default=[])
 
+    # Implements .objects.ancestors_of() and .descendants_of()
+    objects = InterfaceManager()
+
     def __init__(self, *args, **kwargs):
         self._set_addresses = kwargs.pop("addresses", None)
         super().__init__(*args, **kwargs)
+        self._original_parent_id = self.__dict__.get("parent_id")
 
     ##########################################
     # THESE WILL BE IMPLEMENTED AS ATTRIBUTES
@@ -282,42 +746,47 @@ class Interface(Resource):
             )
 
         if overwrite:
-            self._purge_assignments()
-
-        # Keep track of addresses that are already assigned so we don't try to
-        # assign them again (which would result in an error).
-        existing_addresses = self.get_addresses()
-
-        inserts = []
-        for cidr in addresses:
-            # Don't assign an address that already exists.
-            if cidr in existing_addresses:
-                continue
-
-            address = validators.validate_cidr(cidr)
-            inserts.append(str(address))
-
-        for insert in inserts:
-            self.assign_address(insert)
-
-        self.clean_addresses()
+            # Only unassign the addresses that aren't being kept, so that the
+            # state of the others doesn't change.
+            keep = set()
+            for cidr in addresses:
+                validators.validate_host_address(cidr)
+                keep.add(ipaddress.ip_network(str(cidr)))
+            stale = [
+                assignment.id
+                for assignment in self.assignments.select_related("address")
+                if ipaddress.ip_network(assignment.address.cidr) not in keep
+            ]
+            if stale:
+                Assignment.objects.filter(id__in=stale).delete()
+                self.clean_addresses()
+
+        # Addresses that are already assigned are skipped.
+        if addresses:
+            Interface.objects.assign_addresses({self: addresses})
 
     def get_ancestors(self):
-        """Return all ancestors of an Interface."""
-        p = self.parent
-        ancestors = []
-        while p is not None:
-            ancestors.append(p.id)
-            p = p.parent
-        if not ancestors:
+        """Return all ancestors of an Interface, nearest first."""
+        if self.parent_id is None:
             return Interface.objects.none()
-        # Preserve nearest-first ordering using the collected id list.
-        from django.db.models import Case, When
 
-        ordering = Case(
-            *[When(id=pk, then=pos) for pos, pk in enumerate(ancestors)]
+        # The depth of each ancestor comes from the same recursive query that
+        # finds them, rather than being computed again for each one.
+        sql, params = Interface.objects._tree_sql(
+            [self.id], True, "SELECT id, depth FROM tree WHERE depth >= 1"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            depths = dict(cursor.fetchall())
+
+        return Interface.objects.filter(id__in=depths).order_by(
+            models.Case(
+                *(
+                    models.When(id=ancestor_id, then=models.Value(depth))
+                    for ancestor_id, depth in depths.items()
+                )
+            )
         )
-        return Interface.objects.filter(id__in=ancestors).order_by(ordering)
 
     def get_children(self):
         """Return the immediate children of an Interface."""
@@ -325,21 +794,16 @@ class Interface(Resource):
 
     def get_descendants(self):
         """Return all the descendants of an Interface."""
-        s = list(self.get_children())
-        descendants = []
-        while len(s) > 0:
-            top = s.pop()
-            descendants.append(top.id)
-            for c in top.get_children():
-                s.append(c)
-        return Interface.objects.filter(id__in=descendants)
+        return Interface.objects.descendants_of([self.id])
 
     def get_root(self):
         """Return the parent of all ancestors of an Interface."""
-        root = self
-        while root.parent is not None:
-            root = root.parent
-        return root
+        if self.parent_id is None:
+            return self
+
+        return Interface.objects.ancestors_of([self.id]).get(
+            parent__isnull=True
+        )
 
     def get_siblings(self):
         """
@@ -457,6 +921,18 @@ class Interface(Resource):
                     )
                 }
             )
+
+        # Don't allow cycles, which would make the tree endless.
+        reparented = (
+            self.id is not None and parent.id != self._original_parent_id
+        )
+        if reparented and (
+            parent.id == self.id
+            or self.get_descendants().filter(id=parent.id).exists()
+        ):
+            raise exc.ValidationError(
+                {"parent": "An Interface cannot be its own ancestor."}
+            )
         return parent
 
     def clean_fields(self, exclude=None):
@@ -487,6 +963,11 @@ class Interface(Resource):
                     self.delete()
                 raise
 
+        # Our position in the tree changed, so recompute inherited values.
+        if self._is_new or self.parent_id != self._original_parent_id:
+            EffectiveValue.objects.refresh(Interface, self.site_id, [self.id])
+            self._original_parent_id = self.parent_id
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -514,13 +995,130 @@ def change_api_updated_at(sender=None, instance=None, *args, **kwargs):
     djcache.set("api_updated_at_timestamp", timezone.now())
 
 
-def update_device_interfaces(sender, instance, **kwargs):
-    """Anytime a device is saved, update device_hostname on its interfaces"""
-    interfaces = Interface.objects.filter(device=instance)
-    for interface in interfaces.iterator():
-        interface.device_hostname = instance.hostname
-        interface.name_slug = None  # null so model validation resets name_slug
-        interface.save()
+def update_device_interfaces(sender, instance, created=False, **kwargs):
+    """
+    Anytime a device's hostname changes, update device_hostname and name_slug
+    on its interfaces, and the default names of any circuits between them.
+    """
+    # A new Device has no interfaces, and only the hostname is denormalized.
+    if created or "hostname" not in instance.get_dirty_fields():
+        return
+
+    hostname = instance.hostname
+
+    # Circuits named after their endpoints (the default) are renamed to
+    # match. Their old default names are computed before interfaces change.
+    circuits = []
+    rows = (
+        Circuit.objects.filter(
+            models.Q(endpoint_a__device=instance)
+            | models.Q(endpoint_z__device=instance)
+        )
+        .order_by("id")
+        .values_list(
+            "id",
+            "name",
+            "endpoint_a__device_id",
+            "endpoint_a__device_hostname",
+            "endpoint_a__name",
+            "endpoint_z__device_id",
+            "endpoint_z__device_hostname",
+            "endpoint_z__name",
+        )
+    )
+    for circuit_id, name, *endpoints in rows:
+        old_slugs, new_slugs = [], []
+        for device_id, device_hostname, intf_name in util.chunked(
+            endpoints, 3
+        ):
+            if device_id is None:  # No endpoint_z
+                old_slugs.append(str(None))
+                new_slugs.append(str(None))
+                continue
+            old_slugs.append(
+                util.slugify_interface(
+                    device_hostname=device_hostname, name=intf_name
+                )
+            )
+            if device_id == instance.id:
+                device_hostname = hostname
+            new_slugs.append(
+                util.slugify_interface(
+                    device_hostname=device_hostname, name=intf_name
+                )
+            )
+        if name != "_".join(old_slugs):
+            continue
+        name = "_".join(new_slugs)
+        circuits.append(
+            Circuit(
+                id=circuit_id,
+                name=name,
+                name_slug=util.slugify(name),
+                version=F("version") + 1,
+            )
+        )
+
+    updated = Interface.objects.filter(device=instance).update(
+        device_hostname=hostname,
+        name_slug=Concat(models.Value(hostname + ":"), F("name")),
+        version=F("version") + 1,
+    )
+
+    Circuit.objects.bulk_update(
+        circuits, ["name", "name_slug", "version"], batch_size=CHUNK_SIZE
+    )
+
+    if updated:
+        change_api_updated_at()
+
+
+@contextmanager
+def deferred_address_refresh():
+    """
+    Defer refreshing the address caches of Interfaces affected by changes to
+    Networks made within the block until the end of the current transaction,
+    so that each affected Interface is only refreshed once.
+    """
+    if getattr(_deferred, "ids", None) is not None:
+        yield  # Already deferred by an outer block.
+        return
+
+    _deferred.ids = ids = set()
+    try:
+        yield
+    finally:
+        _deferred.ids = None
+
+    if ids:
+        transaction.on_commit(
+            lambda: Interface.objects.refresh_address_caches(ids)
+        )
+
+
+def refresh_assignment_interface_networks(sender, instance, **kwargs):
+    """
+    Refresh the cached addresses and networks of Interfaces whose addresses
+    are direct children of a Network once it is saved and its subnets are
+    reparented, since the networks of those addresses may have changed.
+    """
+    # Assigned addresses only change when the tree does.
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and not (
+        {instance._meta.get_field(f).attname for f in update_fields}
+        & Network.HIERARCHY_FIELDS
+    ):
+        return
+
+    interface_ids = Assignment.objects.filter(
+        address__parent_id=instance.id
+    ).values_list("interface_id", flat=True)
+
+    pending = getattr(_deferred, "ids", None)
+    if pending is not None:
+        pending.update(interface_ids)
+    else:
+        Interface.objects.refresh_address_caches(interface_ids)
 
 
 models.signals.post_save.connect(
@@ -538,3 +1136,8 @@ models.signals.post_save.connect(
     sender=Device,
     dispatch_uid="update_interface_post_save_device",
 )
+signals.network_reparented.connect(
+    refresh_assignment_interface_networks,
+    sender=Network,
+    dispatch_uid="refresh_interface_assignment_networks_reparented_network",
+)
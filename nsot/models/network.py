@@ -7,8 +7,9 @@ import netaddr
 from django.conf import settings
 from django.db import models
 
-from .. import exc, fields, util, validators
+from .. import exc, fields, signals, util, validators
 from . import constants
+from .effective_value import EffectiveValue
 from .resource import Resource, ResourceManager
 
 log = logging.getLogger(__name__)
@@ -183,9 +184,29 @@ class Network(Resource):
     # Implements .objects.get_by_address() and .get_closest_parent()
     objects = NetworkManager()
 
+    # Changes to any of these fields require the tree to be recomputed.
+    HIERARCHY_FIELDS = frozenset(
+        [
+            "network_address",
+            "broadcast_address",
+            "prefix_length",
+            "ip_version",
+            "is_ip",
+            "site_id",
+            "parent_id",
+        ]
+    )
+
+    # Fields that may be saved on their own, without validating the CIDR or
+    # recomputing the tree. Only the state is validated, by clean_state().
+    INDEPENDENT_FIELDS = frozenset(
+        ["state", "expires_at", "_attributes_cache", "version"]
+    )
+
     def __init__(self, *args, **kwargs):
         self._cidr = kwargs.pop("cidr", None)
         super().__init__(*args, **kwargs)
+        self._original_parent_id = self.__dict__.get("parent_id")
 
     def __str__(self):
         return self.cidr
@@ -197,6 +218,10 @@ class Network(Resource):
             "network_address",
             "prefix_length",
         )
+        indexes = [
+            # Range queries for the Networks inside a CIDR.
+            models.Index(fields=["ip_version", "network_address"]),
+        ]
 
     def supernets(self, direct=False, discover_mode=False, for_update=False):
         query = Network.objects.all()
@@ -617,11 +642,63 @@ class Network(Resource):
                     parent=new_parent
                 )
                 super().delete(**kwargs)
+                EffectiveValue.objects.refresh(
+                    Network, self.site_id, protected_ids
+                )
+                if new_parent is not None:
+                    signals.network_reparented.send(
+                        sender=Network, instance=new_parent, update_fields=None
+                    )
             else:
                 raise
 
+    def _save_changed_fields(self):
+        """
+        Save only the changed fields if they are all ``INDEPENDENT_FIELDS``,
+        skipping validation of the CIDR and the recompute of supernets,
+        subnets and inherited values. Receivers of ``pre_save`` and
+        ``post_save`` are notified as for any other save, even if nothing
+        changed.
+
+        Returns ``False`` if a full save is required.
+        """
+        if self.id is None or self._state.adding:
+            return False
+        if self._cidr is not None or self._set_attributes is not None:
+            return False
+
+        dirty = self.get_dirty_fields()
+        if not dirty <= self.INDEPENDENT_FIELDS:
+            return False
+
+        if "state" in dirty:
+            self.state = self.clean_state(self.state)
+        if dirty:
+            super().save(update_fields=sorted(dirty), _skip_full_clean=True)
+            return True
+
+        # There's nothing to write, so Django wouldn't send these.
+        for signal, extra in (
+            (models.signals.pre_save, {}),
+            (models.signals.post_save, {"created": False}),
+        ):
+            signal.send(
+                sender=self.__class__,
+                instance=self,
+                raw=False,
+                using=self._state.db,
+                update_fields=frozenset(),
+                **extra,
+            )
+        return True
+
     def save(self, *args, **kwargs):
         """This is stuff we want to happen upon save."""
+        # Fields like the state or attributes don't move us in the tree, so
+        # if they're all that changed, just write them.
+        if not args and not kwargs and self._save_changed_fields():
+            return
+
         self.full_clean()  # First validate fields are correct
 
         for_update = kwargs.pop("for_update", False)
@@ -642,6 +719,16 @@ class Network(Resource):
         # If we're not an IP, determine our subnets and reparent them.
         if not self.is_ip:
             self.reparent_subnets()
+        signals.network_reparented.send(
+            sender=Network,
+            instance=self,
+            update_fields=kwargs.get("update_fields"),
+        )
+
+        # Our position in the tree changed, so recompute inherited values.
+        if self._is_new or self.parent_id != self._original_parent_id:
+            EffectiveValue.objects.refresh(Network, self.site_id, [self.id])
+            self._original_parent_id = self.parent_id
 
     def to_dict(self):
         return {
@@ -657,27 +744,3 @@ class Network(Resource):
             "state": self.state,
             "attributes": self.get_attributes(),
         }
-
-
-# Signals
-def refresh_assignment_interface_networks(sender, instance, **kwargs):
-    """This signal fires each time a Network object is saved. Upon save,
-    the signal iterates through all the child networks of the network
-    being saved and cleans the addresses and networks assigned to the
-    interfaces (if any) to which these child networks have been assigned.
-
-    We need to clean the addresses on an Interface upon a call to save()
-    on Network due to the Interface model caching _addresses & _networks
-    which causes the update on the Network object to not cascade onto the
-    corresponding Interface object."""
-    for child in instance.children.all():
-        for assignment in child.assignments.all():
-            assignment.interface.clean_addresses()
-            assignment.interface.save()
-
-
-models.signals.post_save.connect(
-    refresh_assignment_interface_networks,
-    sender=Network,
-    dispatch_uid="refresh_interface_assignment_networks_post_save_network",
-)
@@ -0,0 +1,162 @@
+"""
+Deletion of expired resources.
+
+Expired resources (those whose ``expires_at`` has passed) are deleted in
+chunks of IDs using the set-based queries of ``nsot.models.cascade``, each
+chunk in its own transaction, so that the database is never locked for long.
+``Change`` records are written in bulk for each chunk.
+
+Resources that other objects still depend on are left alone: Networks and
+Interfaces are deleted leaves first, so a parent is only deleted once all of
+its children are gone, and objects that can't be deleted through the API
+(e.g. a Network with assigned addresses) are skipped.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .assignment import Assignment
+from .cascade import collect, delete_rows
+from .change import Change
+from .circuit import Circuit
+from .device import Device
+from .interface import Interface
+from .network import Network
+from .protocol import Protocol
+
+__all__ = ("reap_expired",)
+
+log = logging.getLogger(__name__)
+
+# Default number of resources deleted in each transaction.
+CHUNK_SIZE = 500
+
+# Resources are reaped in this order, so dependents are deleted first.
+REAP_ORDER = (Protocol, Circuit, Interface, Device, Network)
+
+
+def _deletable(model, ids):
+    """Return the subset of ``ids`` that may be deleted right now."""
+    objects = model.objects.filter(id__in=ids)
+
+    if model is Network:
+        objects = objects.exclude(
+            id__in=Network.objects.filter(parent_id__in=ids).values(
+                "parent_id"
+            )
+        ).exclude(
+            id__in=Assignment.objects.filter(address_id__in=ids).values(
+                "address_id"
+            )
+        )
+    elif model is Interface:
+        objects = objects.exclude(
+            id__in=Interface.objects.filter(parent_id__in=ids).values(
+                "parent_id"
+            )
+        ).exclude(Q(circuit_a__isnull=False) | Q(circuit_z__isnull=False))
+    elif model is Device:
+        endpoints = Interface.objects.filter(device_id__in=ids).filter(
+            Q(circuit_a__isnull=False) | Q(circuit_z__isnull=False)
+        )
+        objects = objects.exclude(id__in=endpoints.values("device_id"))
+
+    return list(objects.values_list("id", flat=True))
+
+
+def _reap_chunk(model, ids, user):
+    """Delete the ``model`` objects with ``ids``, recording the changes."""
+    with transaction.atomic():
+        objects = list(model.objects.filter(id__in=ids))
+        if not objects:
+            return 0
+
+        Change.bulk_record(objects, user=user, event="Delete")
+        delete_rows(collect(model, ids))
+
+    return len(objects)
+
+
+def _reap_model(model, user, chunk_size, now, progress):
+    """
+    Delete expired ``model`` objects in chunks.
+
+    Expired objects are visited repeatedly for as long as each pass deletes
+    something, so parents are deleted after their children.
+
+    Returns a tuple of ``(deleted, skipped)``.
+    """
+    deleted = 0
+    while True:
+        deleted_in_pass = skipped = 0
+        last_id = 0
+        expired = model.objects.filter(expires_at__lte=now)
+        while True:
+            ids = list(
+                expired.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            deletable = _deletable(model, ids)
+            skipped += len(ids) - len(deletable)
+            count = _reap_chunk(model, deletable, user) if deletable else 0
+            deleted_in_pass += count
+            if count and progress is not None:
+                progress(model.__name__, deleted + deleted_in_pass)
+
+        deleted += deleted_in_pass
+        if not (deleted_in_pass and skipped):
+            break
+
+    if skipped:
+        log.info(
+            "Skipped %d expired %s objects that are still in use.",
+            skipped,
+            model.__name__,
+        )
+    return deleted, skipped
+
+
+def reap_expired(
+    user, resource_names=None, chunk_size=CHUNK_SIZE, now=None, progress=None
+):
+    """
+    Delete every expired resource.
+
+    Returns a dict of resource name to a tuple of ``(deleted, skipped)``.
+
+    :param user:
+        User the ``Change`` records are attributed to
+
+    :param resource_names:
+        Optional list of resource names to reap (default: all of them)
+
+    :param chunk_size:
+        Number of resources deleted in each transaction
+
+    :param now:
+        Resources that expire at or before this time are deleted (default:
+        the current time)
+
+    :param progress:
+        Optional callable passed ``(resource_name, deleted)`` after each chunk
+    """
+    if now is None:
+        now = timezone.now()
+
+    results = {}
+    for model in REAP_ORDER:
+        if resource_names and model.__name__ not in resource_names:
+            continue
+        results[model.__name__] = _reap_model(
+            model, user, chunk_size, now, progress
+        )
+
+    return results
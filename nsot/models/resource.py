@@ -1,17 +1,58 @@
+import json
 import logging
+from collections import Counter
 from datetime import timedelta
 
-from django.db import models
+from django.core.cache import cache as djcache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Count, F
 from django.db.models.query_utils import Q
 from django.utils import timezone
 
-from .. import exc, fields, util
+from .. import exc, fields, signals, util
+from . import constants
 from .attribute import Attribute
+from .attribute_backend import attribute_q, typed_q, uses_value_rows
+from .effective_value import EffectiveValue
 from .value import Value
 
 log = logging.getLogger(__name__)
 
 
+def _query_generation_keys(model, site_id, query_terms, names=()):
+    """
+    Return the generation keys that results of a set query depend on: the
+    resource type in the Site, and every attribute in ``names`` or referenced
+    by ``query_terms``.
+    """
+    resource_name = model.__name__
+    depends_on = set(names)
+    for query in query_terms:
+        name = query.name
+        if query.op == "=" and name.endswith("_regex"):
+            name = name[: -len("_regex")]
+        depends_on.add(name)
+
+    keys = [util.generation_key(site_id, resource_name)]
+    keys.extend(
+        util.generation_key(site_id, resource_name, name)
+        for name in sorted(depends_on)
+    )
+    return keys
+
+
+def _snapshot(value):
+    """
+    Return ``value`` as it is compared to detect changes to a field.
+    Containers, such as the attributes cache, are serialized, so that changes
+    made to them in-place are detected without copying them.
+    """
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, cls=DjangoJSONEncoder)
+    return value
+
+
 class ResourceSetTheoryQuerySet(models.query.QuerySet):
     """
     Set theory QuerySet for Resource objects to add ``.set_query()`` method.
@@ -60,10 +101,12 @@ class ResourceSetTheoryQuerySet(models.query.QuerySet):
         # Iterate a/v pairs and combine query results using MySQL-compatible
         # set operations w/ the ORM
         log.debug("QUERY [start]: objects = %r", objects)
-        for action, name, value in attributes:
+        for query in attributes:
+            action, name, value = query
+
             # Is this a regex pattern?
             regex_query = False
-            if name.endswith("_regex"):
+            if name.endswith("_regex") and query.op == "=":
                 name = name.replace("_regex", "")  # Keep attribute name
                 regex_query = True
                 log.debug("Regex enabled for %r" % name)
@@ -83,22 +126,16 @@ class ResourceSetTheoryQuerySet(models.query.QuerySet):
                     {"query": "%s: %r" % (str(err).rstrip("."), name)}
                 )
 
-            # Set lookup params
-            next_set_params = {
-                "name": attr.name,
-                "value": value,
-                "resource_name": resource_name,
-            }
-
-            # If it's a regex query, swap ``value`` with ``value__regex``.
-            if regex_query:
-                next_set_params["value__regex"] = next_set_params.pop("value")
-
-            next_set = Q(
-                id__in=Value.objects.filter(**next_set_params).values_list(
-                    "resource_id", flat=True
+            if query.op == "=":
+                next_set = attribute_q(
+                    self.model,
+                    attr.name,
+                    value,
+                    regex=regex_query,
+                    attribute=attr,
                 )
-            )
+            else:
+                next_set = typed_q(self.model, attr, query.op, value)
 
             # This is the MySQL-compatible manual implementation of set theory,
             # baby!
@@ -115,14 +152,62 @@ class ResourceSetTheoryQuerySet(models.query.QuerySet):
                 raise exc.BadRequest("BAD SET QUERY: %r" % (action,))
             log.debug("QUERY [iter]: objects = %r", objects)
 
-        count = objects.count()
-        if unique and count != 1:
-            # There can be only one
-            msg = "Query returned %r results, but exactly 1 expected" % count
-            raise exc.ValidationError({"query": msg})
+        if unique:
+            count = objects.count()
+            if count != 1:
+                # There can be only one
+                msg = (
+                    "Query returned %r results, but exactly 1 expected" % count
+                )
+                raise exc.ValidationError({"query": msg})
         # Gotta call .distinct() or we might get dupes.
         return objects.distinct()
 
+    def cached_set_query(self, query, site_id=None, unique=False):
+        """
+        Like ``set_query()``, but the IDs of the matching objects are cached.
+
+        Cached results are only invalidated when an attribute referenced by
+        the query changes, or objects of this type are created or deleted.
+        Results are only cached when ``site_id`` is set.
+        """
+        try:
+            terms = util.parse_set_query(query)
+        except (ValueError, TypeError):
+            terms = None
+
+        # Let .set_query() handle (and report) anything we can't cache.
+        if site_id is None or not terms:
+            return self.set_query(query, site_id=site_id, unique=unique)
+
+        normalized = [(q.action, q.name, q.value, q.op) for q in terms]
+        keys = _query_generation_keys(self.model, site_id, terms)
+        cache_key = util.result_cache_key(
+            "query",
+            str(site_id),
+            self.model.__name__,
+            normalized,
+            util.get_generations(keys),
+        )
+
+        # Results are cached for the whole Site, regardless of this queryset.
+        ids = djcache.get(cache_key)
+        if ids is None:
+            objects = self.model.objects.set_query(query, site_id=site_id)
+            ids = list(objects.order_by("id").values_list("id", flat=True))
+            djcache.set(cache_key, ids)
+
+        objects = self.filter(id__in=ids)
+        if unique:
+            count = objects.count()
+            if count != 1:
+                msg = (
+                    "Query returned %r results, but exactly 1 expected" % count
+                )
+                raise exc.ValidationError({"query": msg})
+
+        return objects
+
     def expired(self, expired=True):
         """Filter by expiration status.
 
@@ -150,18 +235,266 @@ class ResourceSetTheoryQuerySet(models.query.QuerySet):
         """
         Lookup objects by Attribute ``name`` and ``value``.
         """
-        resource_name = self.model._meta.model_name.title()
-        query = self.filter(
-            id__in=Value.objects.filter(
-                name=name, value=value, resource_name=resource_name
-            ).values_list("resource_id", flat=True)
-        )
+        query = self.filter(attribute_q(self.model, name, value))
 
         if site_id is not None:
             query = query.filter(site=site_id)
 
         return query
 
+    def bulk_update_attributes(
+        self, set_values=None, append=None, delete=None
+    ):
+        """
+        Update attributes of every object in this queryset at once.
+
+        Each attribute is validated once per Site rather than once per object,
+        and ``Value`` rows and attribute caches are written in batches, all in
+        a single transaction. Returns the list of IDs of objects that changed.
+
+        :param set_values:
+            Dict of attribute names to values to set
+
+        :param append:
+            Dict of multi-value attribute names to lists of values to add
+
+        :param delete:
+            List of attribute names to remove
+        """
+        set_values = set_values or {}
+        append = append or {}
+        delete = set(delete or [])
+
+        if not isinstance(set_values, dict) or not isinstance(append, dict):
+            raise exc.ValidationError(
+                {"attributes": "Expected dictionary of attributes."}
+            )
+        overlap = (set(set_values) & set(append)) | (
+            (set(set_values) | set(append)) & delete
+        )
+        if overlap:
+            names = ", ".join(sorted(overlap))
+            raise exc.ValidationError(
+                {
+                    "attributes": f"Attributes used in more than one update: {names}"
+                }
+            )
+
+        objects = list(self.only("id", "site", "_attributes_cache"))
+        by_site = {}
+        for obj in objects:
+            by_site.setdefault(obj.site_id, []).append(obj)
+
+        changed_ids = []
+        with transaction.atomic():
+            for site_id, site_objects in by_site.items():
+                changed_ids.extend(
+                    self._bulk_update_site_attributes(
+                        site_id, site_objects, set_values, append, delete
+                    )
+                )
+
+        return changed_ids
+
+    def _bulk_update_site_attributes(
+        self, site_id, objects, set_values, append, delete
+    ):
+        """Apply ``bulk_update_attributes()`` to ``objects`` in one Site."""
+        resource_name = self.model.__name__
+        valid_attributes = Attribute.all_by_name(resource_name, site_id)
+
+        def get_attribute(name):
+            if name not in valid_attributes:
+                msg = f"Attribute name ({name}) does not exist."
+                raise exc.ValidationError({"attributes": msg})
+            return valid_attributes[name]
+
+        # Validate each attribute once: name => (attribute, [values])
+        updates = {}
+        for name, value in set_values.items():
+            attribute = get_attribute(name)
+            values = [v["value"] for v in attribute.validate_value(value)]
+            updates[name] = (attribute, values)
+
+        appends = {}
+        for name, value in append.items():
+            attribute = get_attribute(name)
+            if not attribute.multi:
+                raise exc.ValidationError(
+                    {"attributes": f"Attribute '{name}' is not multi-valued."}
+                )
+            if not isinstance(value, list):
+                value = [value]
+            values = [v["value"] for v in attribute.validate_value(value)]
+            appends[name] = (attribute, values)
+
+        for name in delete:
+            if get_attribute(name).required:
+                raise exc.ValidationError(
+                    {"attributes": f"Missing required attributes: {name}"}
+                )
+
+        # Transitive dependencies of attributes that might be affected.
+        touched = set(updates) | set(appends)
+        dependencies = {}
+        for attribute in valid_attributes.values():
+            deps = {d.name for d in attribute.get_all_dependencies()}
+            if attribute.name in touched or deps & delete:
+                dependencies[attribute.name] = deps
+
+        # ``Value`` rows are authoritative when they are maintained, since the
+        # cache is only written when an object is saved.
+        current = {obj.id: obj._attributes_cache or {} for obj in objects}
+        if uses_value_rows():
+            current = {obj.id: {} for obj in objects}
+            for ids in util.chunked(current, 500):
+                rows = Value.objects.filter(
+                    resource_name=resource_name, resource_id__in=ids
+                ).order_by("id")
+                for rid, name, value, multi in rows.values_list(
+                    "resource_id", "name", "value", "attribute__multi"
+                ):
+                    if multi:
+                        current[rid].setdefault(name, []).append(value)
+                    else:
+                        current[rid][name] = value
+
+        changed = []
+        changed_names = set()
+        for obj in objects:
+            old = current[obj.id]
+            new = dict(old)
+            for name, (attribute, values) in updates.items():
+                new[name] = values if attribute.multi else values[0]
+            for name, (_, values) in appends.items():
+                existing = list(new.get(name, []))
+                new[name] = existing + [v for v in values if v not in existing]
+            for name in delete:
+                new.pop(name, None)
+
+            for name, deps in dependencies.items():
+                missing = deps - set(new) if name in new else set()
+                if missing:
+                    raise exc.ValidationError(
+                        {
+                            "attributes": f"Attribute '{name}' requires: "
+                            f"{', '.join(sorted(missing))}"
+                        }
+                    )
+
+            if new == old:
+                continue
+            changed_names.update(
+                name
+                for name in set(old) | set(new)
+                if old.get(name) != new.get(name)
+            )
+            obj._attributes_cache = new
+            changed.append((obj, old, new))
+
+        if not changed:
+            return []
+
+        ids = [obj.id for obj, _, _ in changed]
+        if uses_value_rows():
+            replaced = set(updates) | delete
+            for chunk in util.chunked(ids, 500):
+                Value.objects.filter(
+                    resource_name=resource_name,
+                    resource_id__in=chunk,
+                    name__in=replaced,
+                ).delete()
+
+            inserts = []
+            for obj, old, new in changed:
+                for attribute, values in updates.values():
+                    inserts.extend((attribute, obj.id, v) for v in values)
+                for name, (attribute, _) in appends.items():
+                    existing = set(old.get(name, []))
+                    inserts.extend(
+                        (attribute, obj.id, v)
+                        for v in new[name]
+                        if v not in existing
+                    )
+            Value.objects.bulk_create(
+                [
+                    Value(
+                        attribute=attribute,
+                        name=attribute.name,
+                        value=value,
+                        resource_name=resource_name,
+                        resource_id=resource_id,
+                        site_id=site_id,
+                        **attribute.typed_columns(value),
+                    )
+                    for attribute, resource_id, value in inserts
+                ],
+                batch_size=500,
+            )
+
+        for obj, _, _ in changed:
+            obj.version = F("version") + 1
+        self.model.objects.bulk_update(
+            [obj for obj, _, _ in changed],
+            ["_attributes_cache", "version"],
+            batch_size=500,
+        )
+
+        signals.attributes_changed.send(
+            sender=self.model,
+            site_id=site_id,
+            resource_ids=ids,
+            names=changed_names,
+        )
+
+        return ids
+
+    def facets(self, names):
+        """
+        Return counts of each value of the attributes ``names`` among the
+        objects in this queryset.
+
+        Returns a dict keyed by attribute name of lists of ``{"value": ...,
+        "count": ...}`` dicts, most common value first.
+
+        :param names:
+            List of attribute names
+        """
+        resource_name = self.model.__name__
+        counts = {name: Counter() for name in names}
+
+        if uses_value_rows():
+            rows = (
+                Value.objects.filter(
+                    resource_name=resource_name,
+                    name__in=names,
+                    resource_id__in=self.values("id"),
+                )
+                .values_list("name", "value")
+                .annotate(count=Count("id"))
+            )
+            for name, value, count in rows:
+                counts[name][value] += count
+        else:
+            for cache in self.values_list("_attributes_cache", flat=True):
+                for name in names:
+                    value = (cache or {}).get(name)
+                    if value is None:
+                        continue
+                    if not isinstance(value, list):
+                        value = [value]
+                    counts[name].update(value)
+
+        return {
+            name: [
+                {"value": value, "count": count}
+                for value, count in sorted(
+                    counter.items(), key=lambda item: (-item[1], item[0])
+                )
+            ]
+            for name, counter in counts.items()
+        }
+
 
 class ResourceManager(models.Manager):
     """
@@ -204,6 +537,23 @@ class ResourceManager(models.Manager):
         """
         return self.get_queryset().set_query(query, site_id, unique)
 
+    def cached_set_query(self, query, site_id=None, unique=False):
+        """
+        Filter objects by set theory attribute-value string patterns, caching
+        the IDs of the matching objects until an attribute referenced by the
+        query changes, or objects of this type are created or deleted.
+
+        :param query:
+            Set theory query pattern
+
+        :param site_id:
+            ID of Site to filter results. Results are only cached if set
+
+        :param unique:
+            Find exactly one match, error otherwise
+        """
+        return self.get_queryset().cached_set_query(query, site_id, unique)
+
     def by_attribute(self, name, value, site_id=None):
         """
         Filter objects by Attribute ``name`` and ``value``.
@@ -224,6 +574,62 @@ class ResourceManager(models.Manager):
         """
         return self.get_queryset().by_attribute(name, value, site_id)
 
+    def site_facets(self, site_id, names=None, query=None):
+        """
+        Return counts of each value of the attributes ``names`` for objects
+        in a Site, optionally limited to the results of a set ``query``.
+
+        Results are cached until any of the attributes involved change, or
+        objects of this type are created or deleted.
+
+        :param site_id:
+            ID of Site to filter results
+
+        :param names:
+            List of attribute names. Defaults to all attributes for this
+            resource type
+
+        :param query:
+            (Optional) Set theory query pattern
+        """
+        resource_name = self.model.__name__
+        if not names:
+            names = Attribute.objects.filter(resource_name=resource_name)
+            if site_id is not None:
+                names = names.filter(site_id=site_id)
+            names = names.values_list("name", flat=True)
+        names = sorted(set(names))
+
+        if query:
+            objects = self.set_query(query, site_id=site_id)
+        else:
+            objects = self.get_queryset()
+            if site_id is not None:
+                objects = objects.filter(site=site_id)
+
+        # Generations are tracked per Site, so only cache for a single Site.
+        if site_id is None:
+            return objects.facets(names)
+
+        # Depend on the attributes counted and the attributes in the query.
+        terms = util.parse_set_query(query) if query else []
+        keys = _query_generation_keys(self.model, site_id, terms, names)
+        cache_key = util.result_cache_key(
+            "facets",
+            site_id,
+            resource_name,
+            names,
+            query,
+            util.get_generations(keys),
+        )
+
+        result = djcache.get(cache_key)
+        if result is None:
+            result = objects.facets(names)
+            djcache.set(cache_key, result)
+
+        return result
+
     def expired(self, expired=True):
         """Proxy to queryset ``expired()`` method."""
         return self.get_queryset().expired(expired=expired)
@@ -253,6 +659,15 @@ class Resource(models.Model):
         ),
     )
 
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text=(
+            "Incremented each time the object changes. Used for optimistic "
+            "concurrency control. (Internal use only)"
+        ),
+    )
+
     # Subclasses set this to the field name to derive site from (e.g., 'device')
     site_source_field = None
 
@@ -272,12 +687,68 @@ class Resource(models.Model):
     # Implement .objects.set_query()
     objects = ResourceManager()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._record_loaded_values()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._record_loaded_values()
+
+    def _record_loaded_values(self, update_fields=None):
+        """
+        Remember field values as they are stored in the database, either for
+        all loaded fields or only for ``update_fields``.
+        """
+        loaded = {}
+        for f in self._meta.concrete_fields:
+            name = f.attname
+            if name not in self.__dict__:
+                continue
+            if update_fields is not None and name not in update_fields:
+                continue
+            loaded[name] = _snapshot(self.__dict__[name])
+
+        if update_fields is None or not hasattr(self, "_loaded_values"):
+            self._loaded_values = loaded
+        else:
+            self._loaded_values.update(loaded)
+
+    def get_dirty_fields(self):
+        """
+        Return the set of field names that have changed since this object
+        was loaded from or saved to the database. Every field is dirty for
+        objects that haven't been saved.
+        """
+        loaded = getattr(self, "_loaded_values", None)
+        fields = self._meta.concrete_fields
+        if loaded is None or self._state.adding:
+            return {f.attname for f in fields}
+
+        return {
+            f.attname
+            for f in fields
+            if f.attname in self.__dict__
+            and (
+                f.attname not in loaded
+                or _snapshot(self.__dict__[f.attname]) != loaded[f.attname]
+            )
+        }
+
     @property
     def attributes(self):
         return Value.objects.filter(
             resource_name=self._resource_name, resource_id=self.id
         )
 
+    @property
+    def effective_values(self):
+        return EffectiveValue.objects.filter(
+            resource_name=self._resource_name, resource_id=self.id
+        )
+
     @property
     def _resource_name(self):
         return self.__class__.__name__
@@ -285,6 +756,49 @@ class Resource(models.Model):
     def _purge_attribute_index(self):
         self.attributes.all().delete()
 
+    @property
+    def etag(self):
+        """Return the ETag for the current version of this object."""
+        return '"%s-%s-%s"' % (
+            self._resource_name.lower(),
+            self.id,
+            self.version,
+        )
+
+    def _stored_attributes(self, valid_attributes):
+        """
+        Return the attributes currently stored for this object.
+
+        These are read from the database rather than this instance, so that
+        changes made by other writers since it was loaded aren't lost. ``Value``
+        rows are authoritative when they are used, since the cache may not
+        reflect them yet.
+        """
+        if self.id is None:
+            return dict(self.get_attributes() or {})
+
+        if not uses_value_rows():
+            stored = (
+                self.__class__.objects.filter(id=self.id)
+                .values_list("_attributes_cache", flat=True)
+                .first()
+            )
+            return dict(stored or {})
+
+        attrs = {}
+        rows = (
+            self.attributes.order_by("id")
+            .values_list("name", "value")
+            .iterator()
+        )
+        for name, value in rows:
+            attribute = valid_attributes.get(name)
+            if attribute is not None and attribute.multi:
+                attrs.setdefault(name, []).append(value)
+            else:
+                attrs[name] = value
+        return attrs
+
     def get_attributes(self):
         """Return the JSON-encoded attributes as a dict."""
         return self._attributes_cache
@@ -292,8 +806,8 @@ class Resource(models.Model):
     def get_merged_attributes(self):
         """Return attributes merged with inherited values from ancestors.
 
-        Walks the ancestor chain collecting inheritable attribute values.
-        Explicit values on this resource always take precedence over inherited
+        Inheritable attribute values are taken from the nearest ancestor that
+        has them. Explicit values on this resource always take precedence over inherited
         ones.
 
         Returns a dict keyed by attribute name::
@@ -311,62 +825,44 @@ class Resource(models.Model):
                 }
             }
 
-        Only works for resource types with ``get_ancestors()`` (Network,
-        Interface). Returns plain attributes dict wrapped with source metadata
-        for resources without ancestor support.
+        Inherited values are read from the materialized ``EffectiveValue``
+        table. Only resource types with parent-child hierarchies (Network,
+        Interface) inherit values. Returns plain attributes dict wrapped with
+        source metadata for other resources.
         """
-        my_attrs = self.get_attributes() or {}
-        result = {}
+        return self.get_merged_attributes_bulk([self])[self.id]
 
-        # Add explicit (self) attributes first — these always win.
-        for name, value in my_attrs.items():
-            result[name] = {
-                "value": value,
-                "source": "self",
-                "inherited": False,
-            }
-
-        # Only walk ancestors if the model supports it.
-        if not hasattr(self, "get_ancestors"):
-            return result
+    @classmethod
+    def get_merged_attributes_bulk(cls, objects):
+        """
+        Return merged attributes for many ``objects`` at once.
 
-        # Get the set of inheritable attribute names for this resource type.
-        inheritable_names = set(
-            Attribute.objects.filter(
-                resource_name=self._resource_name,
-                site_id=self.site_id,
-                inheritable=True,
-            ).values_list("name", flat=True)
-        )
+        This is the batch form of ``get_merged_attributes()`` used for list
+        responses, which looks up inherited values for all of the ``objects``
+        in a fixed number of queries. Returns a dict keyed by object ID.
 
-        if not inheritable_names:
-            return result
+        :param objects:
+            Iterable of objects of this Resource type
+        """
+        objects = list(objects)
+        inherited = {}
+        if cls.__name__ in constants.INHERITABLE_RESOURCES:
+            inherited = EffectiveValue.objects.get_inherited(
+                cls, [obj.id for obj in objects]
+            )
 
-        # Walk ancestors nearest-first so closer values take precedence.
-        #
-        # Network.get_ancestors(ascending=True) returns nearest parent first.
-        # Interface.get_ancestors() doesn't accept kwargs but already returns
-        # nearest-first by default. We try the kwarg form first and fall back
-        # to the no-arg form if the method doesn't support it (TypeError).
-        try:
-            ancestors = self.get_ancestors(ascending=True)
-        except TypeError:
-            ancestors = self.get_ancestors()
-
-        for ancestor in ancestors:
-            ancestor_attrs = ancestor._attributes_cache or {}
-            for attr_name in inheritable_names:
-                # Skip if we already have a value (explicit or from nearer ancestor).
-                if attr_name in result:
-                    continue
-                if attr_name in ancestor_attrs:
-                    result[attr_name] = {
-                        "value": ancestor_attrs[attr_name],
-                        "source": str(ancestor),
-                        "inherited": True,
-                    }
+        results = {}
+        for obj in objects:
+            # Add explicit (self) attributes first — these always win.
+            result = {
+                name: {"value": value, "source": "self", "inherited": False}
+                for name, value in (obj.get_attributes() or {}).items()
+            }
+            for name, value in inherited.get(obj.id, {}).items():
+                result.setdefault(name, value)
+            results[obj.id] = result
 
-        return result
+        return results
 
     def set_attributes(self, attributes, valid_attributes=None, partial=False):
         """Validate and store the attributes dict as a JSON-encoded string.
@@ -400,13 +896,16 @@ class Resource(models.Model):
             "Resource.set_attributes() valid_attributes = %r", valid_attributes
         )
 
-        # For partial updates, merge incoming attributes with existing ones.
-        # Note: concurrent PATCHes on the same resource could race (read-
-        # merge-write). This is acceptable for SQLite (serialized writes)
-        # and typical single-user IPAM workloads. For high-concurrency
-        # deployments, callers should wrap in select_for_update().
+        # Keep the previous attributes so we can tell what changed.
+        previous = self._stored_attributes(valid_attributes)
+
+        # For partial updates, merge incoming attributes with the ones that
+        # are stored. Only the attributes that change are rewritten below, so
+        # concurrent writers may safely update different attributes. Callers
+        # updating the same attributes concurrently should lock the object
+        # with select_for_update() (the API does so).
         if partial:
-            existing = self.get_attributes() or {}
+            existing = previous
 
             # Separate deletions (value is None) from updates.
             deletions = {k for k, v in attributes.items() if v is None}
@@ -481,6 +980,7 @@ class Resource(models.Model):
         # Run validation each attribute value and prepare them for DB
         # insertion, raising any validation errors immediately.
         inserts = []
+        current = {}
         for name, value in attributes.items():
             if name not in valid_attributes:
                 msg = f"Attribute name ({name}) does not exist."
@@ -492,20 +992,54 @@ class Resource(models.Model):
                 )
 
             attribute = valid_attributes[name]
-            inserts.extend(attribute.validate_value(value))
-
-        # Purge all of our previously existing attribute values and recreate
-        # them anew.
-        # FIXME(jathan): This isn't exactly efficient. How can make gud?
-        self._purge_attribute_index()
-        for insert in inserts:
-            Value.objects.create(
-                obj=self,
-                attribute_id=insert["attribute_id"],
-                value=insert["value"],
-            )
+            validated = attribute.validate_value(value)
+            inserts.extend((name, insert) for insert in validated)
+            values = [insert["value"] for insert in validated]
+            current[name] = values if attribute.multi else values[0]
+
+        # Nothing changed, so there's nothing to rewrite or notify about.
+        if current == previous:
+            self._attributes_cache = current
+            return
 
-        self.clean_attributes()
+        changed = {
+            name
+            for name in set(previous) | set(current)
+            if previous.get(name) != current.get(name)
+        }
+
+        if uses_value_rows():
+            # Replace the values of only the attributes that changed. The
+            # values that are stored are those in ``current``, so there's no
+            # need to read them back.
+            self.attributes.filter(name__in=changed).delete()
+            for name, insert in inserts:
+                if name not in changed:
+                    continue
+                Value.objects.create(
+                    obj=self,
+                    attribute_id=insert["attribute_id"],
+                    value=insert["value"],
+                )
+
+        # Store the cache right away, since objects are saved before their
+        # attributes are set. With the JSON backend, it's the only copy. The
+        # version is bumped as it is when any other field changes.
+        self._attributes_cache = current
+        self.__class__.objects.filter(id=self.id).update(
+            _attributes_cache=current, version=F("version") + 1
+        )
+        self.version += 1
+        self._record_loaded_values({"_attributes_cache", "version"})
+
+        # Notify anyone who cares which attributes actually changed.
+        if changed:
+            signals.attributes_changed.send(
+                sender=self.__class__,
+                site_id=self.site_id,
+                resource_ids=[self.id],
+                names=changed,
+            )
 
     def clean_attributes(self):
         """Make sure that attributes are saved as JSON."""
@@ -579,7 +1113,19 @@ class Resource(models.Model):
         if not skip_full_clean:
             self.full_clean(validate_unique=self._validate_unique_on_save)
 
+        # Bump the version of existing objects if anything changed.
+        if not self._is_new and self.get_dirty_fields() - {"version"}:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = [*kwargs["update_fields"], "version"]
+
         super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = {
+                self._meta.get_field(name).attname for name in update_fields
+            }
+        self._record_loaded_values(update_fields)
 
         # This is so that we can set the attributes on create/update, but if
         # the object is new, make sure that it doesn't persist if attributes
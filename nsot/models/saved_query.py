@@ -0,0 +1,273 @@
+import logging
+
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .. import exc, util, validators
+from . import constants
+
+log = logging.getLogger(__name__)
+
+
+class SavedQuery(models.Model):
+    """
+    A named set query whose results are materialized for fast lookup.
+
+    Members are stored in ``SavedQueryMember`` and are kept current
+    incrementally as attribute values change, so that reading the membership
+    doesn't require re-evaluating the set query.
+    """
+
+    name = models.CharField(
+        max_length=64,
+        null=False,
+        db_index=True,
+        help_text="The name of the SavedQuery.",
+    )
+    description = models.CharField(
+        max_length=255,
+        default="",
+        blank=True,
+        null=False,
+        help_text="A helpful description of the SavedQuery.",
+    )
+    query = models.CharField(
+        max_length=255,
+        null=False,
+        help_text="The set query string (e.g. 'role=spine +role=leaf').",
+    )
+    resource_name = models.CharField(
+        "Resource Name",
+        max_length=20,
+        null=False,
+        db_index=True,
+        choices=constants.RESOURCE_CHOICES,
+        help_text="The name of the Resource type this SavedQuery returns.",
+    )
+    site = models.ForeignKey(
+        "Site",
+        db_index=True,
+        related_name="saved_queries",
+        on_delete=models.PROTECT,
+        verbose_name="Site",
+        help_text="Unique ID of the Site this SavedQuery is under.",
+    )
+    version = models.PositiveIntegerField(
+        default=0,
+        null=False,
+        editable=False,
+        help_text=(
+            "Incremented each time the membership changes. Used as the ETag "
+            "of the membership."
+        ),
+    )
+    refreshed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=None,
+        editable=False,
+        help_text="The timestamp of the last full refresh of the membership.",
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._original_query = self.query
+
+    def __str__(self):
+        return "%s %s (site_id: %s)" % (
+            self.resource_name,
+            self.name,
+            self.site_id,
+        )
+
+    class Meta:
+        unique_together = ("site", "resource_name", "name")
+        verbose_name_plural = "saved queries"
+
+    @property
+    def resource_model(self):
+        """Return the Resource model class for ``resource_name``."""
+        return apps.get_model("nsot", self.resource_name)
+
+    @property
+    def attribute_names(self):
+        """Return the set of attribute names this query depends on."""
+        return {
+            name.removesuffix("_regex")
+            for _, name, _ in util.parse_set_query(self.query)
+        }
+
+    @property
+    def etag(self):
+        """Return the ETag for the current membership."""
+        return '"sq-%s-%s"' % (self.id, self.version)
+
+    def get_member_ids(self):
+        """Return the list of member resource IDs."""
+        return list(
+            self.members.order_by("resource_id").values_list(
+                "resource_id", flat=True
+            )
+        )
+
+    def evaluate(self, resource_ids=None):
+        """
+        Evaluate the set query and return the set of matching resource IDs.
+
+        :param resource_ids:
+            If provided, only evaluate membership for these resource IDs
+        """
+        objects = self.resource_model.objects.set_query(
+            self.query, site_id=self.site_id
+        )
+        if resource_ids is not None:
+            objects = objects.filter(id__in=resource_ids)
+        return set(objects.values_list("id", flat=True))
+
+    def _apply(self, matched, existing):
+        """Add/remove members so that ``existing`` becomes ``matched``."""
+        added = matched - existing
+        removed = existing - matched
+
+        if removed:
+            self.members.filter(resource_id__in=removed).delete()
+        if added:
+            SavedQueryMember.objects.bulk_create(
+                [
+                    SavedQueryMember(saved_query=self, resource_id=pk)
+                    for pk in added
+                ]
+            )
+        if added or removed:
+            SavedQuery.objects.filter(id=self.id).update(
+                version=F("version") + 1
+            )
+            self.version += 1
+
+        return bool(added or removed)
+
+    def refresh(self):
+        """Re-evaluate the query and fully rebuild the membership."""
+        with transaction.atomic():
+            existing = set(self.members.values_list("resource_id", flat=True))
+            changed = self._apply(self.evaluate(), existing)
+
+            self.refreshed_at = timezone.now()
+            SavedQuery.objects.filter(id=self.id).update(
+                refreshed_at=self.refreshed_at
+            )
+
+        return changed
+
+    def refresh_resources(self, resource_ids):
+        """
+        Incrementally update membership for the given resource IDs only.
+
+        :param resource_ids:
+            Iterable of resource IDs whose attributes have changed
+        """
+        resource_ids = set(resource_ids)
+        with transaction.atomic():
+            existing = set(
+                self.members.filter(resource_id__in=resource_ids).values_list(
+                    "resource_id", flat=True
+                )
+            )
+            return self._apply(self.evaluate(resource_ids), existing)
+
+    def clean_name(self, value):
+        return validators.validate_name(value)
+
+    def clean_resource_name(self, value):
+        if value not in constants.VALID_ATTRIBUTE_RESOURCES:
+            raise exc.ValidationError(
+                {"resource_name": "Invalid resource name: %r." % value}
+            )
+        return value
+
+    def clean_query(self, value):
+        """Make sure the query is non-empty and can be evaluated."""
+        if not value:
+            raise exc.ValidationError({"query": "Query must not be empty."})
+
+        # This raises ValidationError for bad syntax or unknown attributes.
+        self.resource_model.objects.set_query(value, site_id=self.site_id)
+        return value
+
+    def clean_fields(self, exclude=None):
+        self.name = self.clean_name(self.name)
+        self.resource_name = self.clean_resource_name(self.resource_name)
+        self.query = self.clean_query(self.query)
+
+    def save(self, *args, **kwargs):
+        self.full_clean()
+        is_new = self.id is None
+        super().save(*args, **kwargs)
+
+        # Materialize the results on creation or when the query changes.
+        if is_new or self.query != self._original_query:
+            self.refresh()
+            self._original_query = self.query
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "site_id": self.site_id,
+            "name": self.name,
+            "description": self.description,
+            "query": self.query,
+            "resource_name": self.resource_name,
+            "version": self.version,
+        }
+
+
+class SavedQueryMember(models.Model):
+    """A resource that is a current member of a SavedQuery."""
+
+    saved_query = models.ForeignKey(
+        "SavedQuery",
+        related_name="members",
+        db_index=True,
+        on_delete=models.CASCADE,
+        help_text="SavedQuery to which this member belongs.",
+    )
+    resource_id = models.IntegerField(
+        "Resource ID",
+        null=False,
+        help_text="The unique ID of the member Resource.",
+    )
+
+    def __str__(self):
+        return "%s:%s" % (self.saved_query_id, self.resource_id)
+
+    class Meta:
+        unique_together = ("saved_query", "resource_id")
+
+
+# Signals
+def refresh_saved_queries(sender, site_id, resource_ids, names=None, **kwargs):
+    """
+    Incrementally refresh SavedQuery membership when attributes change.
+
+    Only queries for the same site and resource type which reference one of
+    the changed attribute ``names`` are refreshed. If ``names`` is ``None``
+    (e.g. a resource was created or deleted), every query for the resource
+    type is refreshed since difference queries can match resources without
+    any attributes.
+    """
+    queries = SavedQuery.objects.filter(
+        site_id=site_id, resource_name=sender.__name__
+    )
+    for saved_query in queries:
+        if names is not None and not (saved_query.attribute_names & names):
+            continue
+
+        try:
+            saved_query.refresh_resources(resource_ids)
+        except exc.ValidationError:
+            # Most likely an Attribute referenced by the query was deleted.
+            log.warning(
+                "Unable to refresh %s; skipping.", saved_query, exc_info=True
+            )
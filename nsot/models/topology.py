@@ -0,0 +1,247 @@
+"""
+Graph of the Devices of a Site connected by Circuits.
+
+Questions such as which Devices neighbor a spine, or what the shortest path
+between two Devices is, would otherwise require fetching every Circuit and
+Interface. Instead, the graph of each Site is built with a single query and
+kept in the cache as compact adjacency arrays, until a Circuit or the Device
+of an Interface changes. Traversals are then done in memory.
+"""
+
+import logging
+from array import array
+from bisect import bisect_left
+from collections import defaultdict, deque
+
+from django.core.cache import cache as djcache
+
+from .. import util
+from .circuit import Circuit
+
+__all__ = ("TopologyGraph", "get_graph", "invalidate")
+
+log = logging.getLogger(__name__)
+
+
+def _generation_keys(site_id):
+    """
+    Return the generation keys of the graph of a Site. Creating or deleting
+    Circuits bumps the generation of the Circuit resource type, and any other
+    changes bump the generation of the topology.
+    """
+    return [
+        util.generation_key(site_id, "Circuit"),
+        util.generation_key(site_id, "Topology"),
+    ]
+
+
+class TopologyGraph:
+    """
+    Undirected graph of Devices, whose edges are Circuits.
+
+    Adjacency is stored in compressed sparse row form. The neighbors of the
+    Device at index ``i`` of ``devices`` are the Devices at the indexes
+    ``targets[offsets[i]:offsets[i + 1]]``, connected by the Circuits with
+    the IDs at the same positions of ``circuits``. Neighbors are sorted by
+    index, then by Circuit ID.
+
+    Devices without any Circuits to other Devices aren't part of the graph.
+    """
+
+    def __init__(self, edges):
+        """
+        :param edges:
+            Iterable of ``(device_id, device_id, circuit_id)`` tuples
+        """
+        adjacent = defaultdict(list)
+        for a, z, circuit_id in edges:
+            adjacent[a].append((z, circuit_id))
+            adjacent[z].append((a, circuit_id))
+
+        self.devices = array("q", sorted(adjacent))
+        index = {device_id: i for i, device_id in enumerate(self.devices)}
+        self.offsets = array("l", [0])
+        self.targets = array("l")
+        self.circuits = array("q")
+        for device_id in self.devices:
+            for neighbor_id, circuit_id in sorted(
+                (index[n], c) for n, c in adjacent[device_id]
+            ):
+                self.targets.append(neighbor_id)
+                self.circuits.append(circuit_id)
+            self.offsets.append(len(self.targets))
+
+    def __repr__(self):
+        return "<TopologyGraph: %d devices, %d circuits>" % (
+            len(self.devices),
+            len(self.targets) // 2,
+        )
+
+    @classmethod
+    def build(cls, site_id):
+        """
+        Return the graph of a Site, built using a single query.
+
+        :param site_id:
+            ID of the Site
+        """
+        edges = (
+            Circuit.objects.filter(site=site_id, endpoint_z__isnull=False)
+            .values_list(
+                "endpoint_a__device_id", "endpoint_z__device_id", "id"
+            )
+            .order_by("id")
+        )
+        return cls((a, z, circuit_id) for a, z, circuit_id in edges if a != z)
+
+    def _index(self, device_id):
+        """Return the index of a Device, or ``None`` if it isn't included."""
+        i = bisect_left(self.devices, device_id)
+        if i < len(self.devices) and self.devices[i] == device_id:
+            return i
+        return None
+
+    def _adjacent(self, i):
+        """Yield ``(index, circuit_id)`` for the neighbors of index ``i``."""
+        for pos in range(self.offsets[i], self.offsets[i + 1]):
+            yield self.targets[pos], self.circuits[pos]
+
+    def neighbors(self, device_id):
+        """
+        Return a dict of the ID of each neighbor of a Device to the list of
+        IDs of the Circuits connecting them, ordered by Device ID.
+
+        :param device_id:
+            ID of the Device
+        """
+        i = self._index(device_id)
+        if i is None:
+            return {}
+
+        neighbors = defaultdict(list)
+        for j, circuit_id in self._adjacent(i):
+            neighbors[self.devices[j]].append(circuit_id)
+        return dict(neighbors)
+
+    def neighborhood(self, device_id, hops=1):
+        """
+        Return a dict of the ID of each Device at most ``hops`` Circuits away
+        from a Device to its distance, not including the Device itself.
+
+        :param device_id:
+            ID of the Device
+
+        :param hops:
+            Maximum distance
+        """
+        i = self._index(device_id)
+        if i is None:
+            return {}
+
+        distances = {i: 0}
+        queue = deque([i])
+        while queue:
+            current = queue.popleft()
+            distance = distances[current] + 1
+            if distance > hops:
+                continue
+            for j, _ in self._adjacent(current):
+                if j not in distances:
+                    distances[j] = distance
+                    queue.append(j)
+
+        del distances[i]
+        return {self.devices[j]: d for j, d in sorted(distances.items())}
+
+    def shortest_path(self, source_id, target_id):
+        """
+        Return the shortest path between two Devices, as a tuple of the list
+        of Device IDs along it, and the list of IDs of the Circuits between
+        them. Returns ``None`` if there is no such path.
+
+        Of parallel Circuits, the one with the lowest ID is used.
+
+        :param source_id:
+            ID of the Device to start from
+
+        :param target_id:
+            ID of the Device to end at
+        """
+        if source_id == target_id:
+            return [source_id], []
+
+        source = self._index(source_id)
+        target = self._index(target_id)
+        if source is None or target is None:
+            return None
+
+        # Breadth-first, remembering how each Device was reached.
+        previous = {source: None}
+        queue = deque([source])
+        while queue and target not in previous:
+            current = queue.popleft()
+            for j, circuit_id in self._adjacent(current):
+                if j not in previous:
+                    previous[j] = (current, circuit_id)
+                    queue.append(j)
+
+        if target not in previous:
+            return None
+
+        devices, circuits = [target], []
+        while previous[devices[-1]] is not None:
+            current, circuit_id = previous[devices[-1]]
+            devices.append(current)
+            circuits.append(circuit_id)
+        devices.reverse()
+        circuits.reverse()
+        return [self.devices[j] for j in devices], circuits
+
+
+def get_graph(site_id):
+    """
+    Return the graph of a Site, from the cache if it hasn't changed since it
+    was last built.
+
+    :param site_id:
+        ID of the Site
+    """
+    cache_key = util.result_cache_key(
+        "topology", site_id, util.get_generations(_generation_keys(site_id))
+    )
+    graph = djcache.get(cache_key)
+    if graph is None:
+        graph = TopologyGraph.build(site_id)
+        log.debug("get_graph() built %r for site %s", graph, site_id)
+        djcache.set(cache_key, graph)
+    return graph
+
+
+def invalidate(site_id):
+    """
+    Invalidate the cached graph of a Site.
+
+    :param site_id:
+        ID of the Site
+    """
+    util.bump_generation(util.generation_key(site_id, "Topology"))
+
+
+# Signals
+def invalidate_circuit_topology(sender, instance, **kwargs):
+    """Anytime a Circuit is saved, its endpoints may have changed."""
+    invalidate(instance.site_id)
+
+
+def invalidate_interface_topology(
+    sender, instance, created=False, raw=False, **kwargs
+):
+    """
+    Anytime an Interface is moved to another Device. This happens after the
+    Interface is saved, so that a graph built in between is never cached
+    under the new generation.
+    """
+    if raw or created:
+        return
+    if "device_id" in instance.get_dirty_fields():
+        invalidate(instance.site_id)
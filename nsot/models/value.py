@@ -46,6 +46,31 @@ class Value(models.Model):
         ),
     )
 
+    # Typed copies of ``value`` for Attributes constrained to a type, used by
+    # comparison operators in set queries.
+    value_int = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="The value as an integer. (Internal use only)",
+    )
+    value_float = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="The value as a float. (Internal use only)",
+    )
+    value_ip_low = models.CharField(
+        max_length=33,
+        null=True,
+        blank=True,
+        help_text="First address covered by the value. (Internal use only)",
+    )
+    value_ip_high = models.CharField(
+        max_length=33,
+        null=True,
+        blank=True,
+        help_text="Last address covered by the value. (Internal use only)",
+    )
+
     # We are currently inferring the site_id from the parent Attribute in
     # .save() method. We don't want to even care about the site_id, but it
     # simplifies managing them this way.
@@ -77,6 +102,11 @@ class Value(models.Model):
         indexes = [
             models.Index(fields=["name", "value", "resource_name"]),
             models.Index(fields=["resource_name", "resource_id"]),
+            models.Index(fields=["attribute", "value_int"]),
+            models.Index(fields=["attribute", "value_float"]),
+            models.Index(
+                fields=["attribute", "value_ip_low", "value_ip_high"]
+            ),
         ]
 
     def clean_resource_name(self, value):
@@ -107,8 +137,20 @@ class Value(models.Model):
         self.resource_id = obj.id
         self.name = self.clean_name(self.attribute)
 
+    def set_typed_columns(self):
+        """Populate the typed copies of the value from its Attribute."""
+        try:
+            columns = self.attribute.typed_columns(self.value)
+        except exc.ValidationError:
+            # Values that predate the type are not matched by comparisons.
+            columns = dict.fromkeys(constants.TYPED_VALUE_FIELDS)
+
+        for field, typed_value in columns.items():
+            setattr(self, field, typed_value)
+
     def save(self, *args, **kwargs):
         self.full_clean()
+        self.set_typed_columns()
         super().save(*args, **kwargs)
 
     def to_dict(self):
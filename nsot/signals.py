@@ -0,0 +1,30 @@
+"""
+Custom signals sent by NSoT models.
+"""
+
+from django.dispatch import Signal
+
+__all__ = ("attributes_changed", "network_reparented")
+
+#: Sent whenever attribute values for Resource objects may have changed. This
+#: includes creation and deletion of the resources themselves.
+#:
+#: Receivers are called with the following keyword arguments:
+#:
+#: + ``sender`` - The Resource model class (e.g. ``Device``)
+#: + ``site_id`` - ID of the Site the resources are under
+#: + ``resource_ids`` - Iterable of affected resource IDs
+#: + ``names`` - Set of affected attribute names, or ``None`` if any attribute
+#:   may have changed (e.g. the resource was created or deleted)
+attributes_changed = Signal()
+
+#: Sent after a Network has been saved through a full save and any subnets
+#: beneath it have been reparented, or after the children of a forcefully
+#: deleted Network have been moved to it, so that receivers see the final tree.
+#:
+#: Receivers are called with the following keyword arguments:
+#:
+#: + ``sender`` - The ``Network`` model class
+#: + ``instance`` - The Network whose children changed
+#: + ``update_fields`` - The fields passed to ``save()``, or ``None``
+network_reparented = Signal()
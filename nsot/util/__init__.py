@@ -2,12 +2,24 @@
 Utilities used across the project.
 """
 
+# Each module's imports are kept under its own heading.
+# isort: off
+
 # Core
-# Stats
-from . import core, stats
+from . import core
 from .core import *  # noqa
+
+# Stats
+from . import stats
 from .stats import *  # noqa
 
+# Cache
+from . import cache
+from .cache import *  # noqa
+
+# isort: on
+
 __all__ = []
 __all__.extend(core.__all__)
 __all__.extend(stats.__all__)
+__all__.extend(cache.__all__)
@@ -0,0 +1,100 @@
+"""
+Generation counters used to invalidate cached results.
+
+Rather than deleting cached results when data changes, results are cached
+under a key that includes the current generation of everything they depend
+on. Bumping a generation makes all results that depend on it unreachable.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+__all__ = (
+    "bump_generation",
+    "generation_key",
+    "get_generations",
+    "result_cache_key",
+)
+
+
+def generation_key(site_id, resource_name, name=None):
+    """
+    Return the cache key for a generation counter.
+
+    >>> generation_key(1, 'Device', 'role')
+    'nsot:gen:1:Device:role'
+
+    :param site_id:
+        ID of a Site
+
+    :param resource_name:
+        Name of a Resource type
+
+    :param name:
+        (Optional) Name of an Attribute. If not set, this is the generation of
+        the Resource type as a whole (e.g. objects created or deleted)
+    """
+    parts = ["nsot", "gen", str(site_id), resource_name]
+    if name is not None:
+        parts.append(name)
+    return ":".join(parts)
+
+
+def get_generations(keys):
+    """
+    Return the current value of each generation counter in ``keys``.
+
+    Missing counters are initialized from the clock rather than zero, so that
+    a counter evicted from the cache can never repeat an earlier value.
+
+    :param keys:
+        List of generation keys
+    """
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            initial = time.time_ns()
+            cache.add(key, initial, timeout=None)
+            found[key] = cache.get(key, initial)
+    return [found[key] for key in keys]
+
+
+def _incr(key):
+    """Increment the generation counter ``key``, creating it if missing."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_generation(key):
+    """
+    Increment the generation counter ``key``.
+
+    The counter is incremented right away, so the writer doesn't read its own
+    stale results, and again once the current transaction commits. Otherwise
+    another reader could compute a result from the data as it was before the
+    commit, and store it under the generation that is current after it.
+
+    :param key:
+        Generation key
+    """
+    _incr(key)
+    transaction.on_commit(lambda: _incr(key))
+
+
+def result_cache_key(prefix, *parts):
+    """
+    Return a fixed-length cache key for a result that depends on ``parts``.
+
+    :param prefix:
+        Key prefix (e.g. 'facets')
+
+    :param parts:
+        Anything with a stable ``repr()``
+    """
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+    return "nsot:%s:%s" % (prefix, digest)
@@ -4,26 +4,34 @@ Project-wide utilities.
 
 import collections
 import logging
+import re
 import shlex
 
 from cryptography.fernet import Fernet
 from django.core.exceptions import FieldDoesNotExist
+from netaddr import AddrFormatError
+from netaddr.strategy import eui48
 
 log = logging.getLogger(__name__)
 
 _TRUTHY = set(["true", "yes", "on", "1", ""])
 
 __all__ = (
+    "SET_QUERY_OPERATORS",
     "SetQuery",
+    "chunked",
     "cidr_to_dict",
     "generate_secret_key",
     "generate_settings",
     "get_field_attr",
     "initialize_app",
+    "mac_to_int",
     "main",
     "normalize_auth_header",
     "parse_set_query",
     "qpbool",
+    "regex_literals",
+    "rename_set_query",
     "slugify",
     "slugify_interface",
 )
@@ -42,6 +50,29 @@ def qpbool(arg):
     return str(arg).lower() in _TRUTHY
 
 
+def chunked(iterable, size):
+    """
+    Yield successive lists of at most ``size`` items from ``iterable``.
+
+    >>> list(chunked(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+
+    :param iterable:
+        Any iterable
+
+    :param size:
+        Maximum number of items per chunk
+    """
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 def normalize_auth_header(header):
     """
     Normalize a header name into WSGI-compatible format.
@@ -115,6 +146,37 @@ def cidr_to_dict(cidr):
     }
 
 
+def mac_to_int(value):
+    """
+    Take a MAC address and return it as an integer, without constructing an
+    ``EUI`` object. Strings are parsed by the same ``netaddr`` EUI-48 formats
+    as ``MACAddressField``, and strings of digits are taken to be integers, as
+    they are by the field.
+
+    >>> mac_to_int('00:00:00:00:01:0a')
+    266
+    >>> mac_to_int('0000.0000.010a')
+    266
+
+    :param value:
+        MAC address string or integer
+    """
+    if isinstance(value, str):
+        if value.isdigit():
+            value = int(value)
+        else:
+            try:
+                value = eui48.str_to_int(value)
+            except AddrFormatError:
+                raise ValueError("Invalid MAC address: %r" % value)
+
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("Invalid MAC address: %r" % (value,))
+    if not 0 <= value < 2**48:
+        raise ValueError("Invalid MAC address: %r" % value)
+    return value
+
+
 def slugify(s):
     """
     Slugify a string.
@@ -171,8 +233,37 @@ def slugify_interface(
     return slug
 
 
-#: Namedtuple for resultant items from ``parse_set_query()``
-SetQuery = collections.namedtuple("SetQuery", "action name value")
+#: Operators that may separate an attribute name from its value in set
+#: queries, longest first.
+SET_QUERY_OPERATORS = ("<<", ">=", "<=", ">", "<", "=")
+
+_SET_QUERY_TERM = re.compile(
+    r"^(?P<name>[^<>=]*)(?P<op>%s)(?P<value>.*)$"
+    % "|".join(re.escape(op) for op in SET_QUERY_OPERATORS),
+    re.DOTALL,
+)
+
+
+class SetQuery(collections.namedtuple("SetQuery", "action name value")):
+    """
+    Resultant item from ``parse_set_query()``.
+
+    This unpacks as ``(action, name, value)``. The operator comparing the
+    attribute to the value is available as ``op``, which is ``"="`` for
+    equality.
+    """
+
+    op = "="
+
+    def __new__(cls, action, name, value, op="="):
+        obj = super().__new__(cls, action, name, value)
+        obj.op = op
+        return obj
+
+    def __repr__(self):
+        if self.op == "=":
+            return super().__repr__()
+        return "%s, op=%r)" % (super().__repr__()[:-1], self.op)
 
 
 def parse_set_query(query):
@@ -187,6 +278,10 @@ def parse_set_query(query):
     + "-" indicates a difference
     + no marker indicates an intersection
 
+    The attribute name and value are separated by an operator, which is one of
+    ``=`` (equality), ``>``, ``>=``, ``<``, ``<=`` (comparison of numeric
+    values) or ``<<`` (an address or network within a network).
+
     For example::
 
         >>> parse_set_query('+owner=team-networking')
@@ -196,6 +291,8 @@ def parse_set_query(query):
         >>> parse_set_query('foo=bar -owner=team-networking')
         [SetQuery(action='intersection', name='foo', value='bar'),
          SetQuery(action='difference', name='owner', value='team-networking')]
+        >>> parse_set_query('rack_unit>=30')
+        [SetQuery(action='intersection', name='rack_unit', value='30', op='>=')]
 
     :param query:
         Set query string
@@ -218,13 +315,143 @@ def parse_set_query(query):
         else:
             action = "intersection"
 
-        name, _, value = q.partition("=")
-        attributes.append(SetQuery(action, name, value))
+        match = _SET_QUERY_TERM.match(q)
+        if match is None:
+            attributes.append(SetQuery(action, q, ""))
+        else:
+            attributes.append(
+                SetQuery(
+                    action, *match.group("name", "value"), op=match.group("op")
+                )
+            )
 
     log.debug("Outgoing attributes = %r" % (attributes,))
     return attributes
 
 
+def rename_set_query(query, old_name, new_name):
+    """
+    Return set ``query`` with the attribute ``old_name`` renamed to
+    ``new_name``, including in regex terms.
+
+    >>> rename_set_query('owner=jathan -owner_regex=ga', 'owner', 'team')
+    'team=jathan -team_regex=ga'
+
+    :param query:
+        Set query string
+
+    :param old_name:
+        Name of the attribute to rename
+
+    :param new_name:
+        New name of the attribute
+    """
+    renames = {old_name: new_name, old_name + "_regex": new_name + "_regex"}
+
+    terms = []
+    for term in shlex.split(query):
+        prefix = term[:1] if term[:1] in ("+", "-") else ""
+        term = term[len(prefix) :]
+        match = _SET_QUERY_TERM.match(term)
+        end = match.end("name") if match else len(term)
+        name = renames.get(term[:end], term[:end])
+        terms.append(shlex.quote(prefix + name + term[end:]))
+    return " ".join(terms)
+
+
+# Number of characters following escapes of character codes.
+_REGEX_ESCAPE_LENGTHS = {"x": 2, "u": 4, "U": 8}
+
+
+def regex_literals(pattern, min_length=2):
+    """
+    Return literal substrings that every match of regex ``pattern`` contains.
+
+    These are used to cheaply pre-filter candidate values before the regex
+    itself is evaluated. This is conservative: patterns with alternation or
+    inline flags, and anything inside groups or character classes, never
+    contribute literals.
+
+    >>> regex_literals('^spine[0-9]+\\.lax')
+    ['spine', '.lax']
+    >>> regex_literals('[bd]r|spine')
+    []
+
+    :param pattern:
+        Regular expression string
+
+    :param min_length:
+        Minimum length of a literal to be returned
+    """
+    if "|" in pattern or "(?" in pattern:
+        return []
+
+    literals = []
+    current = []
+
+    def flush():
+        if len(current) >= min_length:
+            literals.append("".join(current))
+        current.clear()
+
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        i += 1
+
+        if char == "\\":
+            escaped = pattern[i : i + 1]
+            i += 1
+            # Character classes (e.g. \d), backreferences and escapes of
+            # character codes (e.g. \x2d) end a literal, and are skipped.
+            if not escaped or escaped.isalnum():
+                flush()
+                if escaped in _REGEX_ESCAPE_LENGTHS:
+                    i += _REGEX_ESCAPE_LENGTHS[escaped]
+                elif escaped == "N":
+                    end = pattern.find("}", i)
+                    i = len(pattern) if end == -1 else end + 1
+                elif escaped.isdigit():
+                    while i < len(pattern) and pattern[i].isdigit():
+                        i += 1
+                continue
+            char = escaped
+        elif char == "[":
+            flush()
+            # Skip to the end of the character class.
+            if pattern[i : i + 1] == "^":
+                i += 1
+            if pattern[i : i + 1] == "]":
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+            continue
+        elif char in "()":
+            depth += 1 if char == "(" else -1
+            flush()
+            continue
+        elif char in "*?{":
+            # The preceding character is optional.
+            if current:
+                current.pop()
+            flush()
+            if char == "{":
+                end = pattern.find("}", i)
+                i = len(pattern) if end == -1 else end + 1
+            continue
+        elif char in ".^$+":
+            flush()
+            continue
+
+        if not depth:
+            current.append(char)
+
+    flush()
+    return literals
+
+
 #: Configuration template emitted when a user runs ``nsot-server init``.
 CONFIG_TEMPLATE = '''
 """
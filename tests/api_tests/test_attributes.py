@@ -154,3 +154,47 @@ def test_deletion(client, site):
 
     # And safely delete the Attribute
     assert_deleted(client.delete(attr_obj_uri))
+
+
+def test_operations(client, site):
+    """Test attribute-wide backfill, rename and convert operations."""
+
+    attr_uri = site.list_uri("attribute")
+    dev_uri = site.list_uri("device")
+
+    attr = get_result(
+        client.create(attr_uri, resource_name="Device", name="owner")
+    )
+    attr_obj_uri = site.detail_uri("attribute", id=attr["id"])
+    dev = get_result(client.create(dev_uri, hostname="foo-bar1"))
+    dev_obj_uri = site.detail_uri("device", id=dev["id"])
+
+    # Can't backfill without a default.
+    assert_error(
+        client.post(attr_obj_uri + "backfill/"), status.HTTP_400_BAD_REQUEST
+    )
+
+    client.partial_update(attr_obj_uri, default="jathan")
+    resp = client.post(attr_obj_uri + "backfill/")
+    assert get_result(resp)["updated"] == 1
+    assert get_result(client.get(dev_obj_uri))["attributes"] == {
+        "owner": "jathan"
+    }
+
+    resp = client.post(
+        attr_obj_uri + "rename/", data=json.dumps({"name": "team"})
+    )
+    assert get_result(resp)["data"]["name"] == "team"
+
+    resp = client.post(
+        attr_obj_uri + "convert/", data=json.dumps({"multi": True})
+    )
+    assert get_result(resp)["data"]["multi"] is True
+    assert get_result(client.get(dev_obj_uri))["attributes"] == {
+        "team": ["jathan"]
+    }
+
+    assert_error(
+        client.post(attr_obj_uri + "convert/", data=json.dumps({"multi": 1})),
+        status.HTTP_400_BAD_REQUEST,
+    )
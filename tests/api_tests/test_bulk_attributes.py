@@ -0,0 +1,75 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+import json
+import logging
+
+from rest_framework import status
+
+from nsot import models
+
+from .util import assert_error, assert_success, get_result
+
+log = logging.getLogger(__name__)
+
+
+def test_bulk_attributes(client, site):
+    attr_uri = site.list_uri("attribute")
+    dev_uri = site.list_uri("device")
+    bulk_uri = dev_uri + "bulk_attributes/"
+
+    client.create(attr_uri, resource_name="Device", name="owner")
+    client.create(attr_uri, resource_name="Device", name="role", multi=True)
+    spine = get_result(
+        client.create(
+            dev_uri,
+            hostname="spine1",
+            attributes={"owner": "jathan", "role": ["spine"]},
+        )
+    )
+    leaf = get_result(
+        client.create(
+            dev_uri,
+            hostname="leaf1",
+            attributes={"owner": "gary", "role": ["leaf"]},
+        )
+    )
+
+    payload = {
+        "query": "role=spine",
+        "set": {"owner": "netops"},
+        "append": {"role": ["edge"]},
+    }
+    assert_success(
+        client.post(bulk_uri, data=json.dumps(payload)), [spine["id"]]
+    )
+
+    resp = client.get(site.detail_uri("device", id=spine["id"]))
+    assert get_result(resp)["attributes"] == {
+        "owner": "netops",
+        "role": ["spine", "edge"],
+    }
+    resp = client.get(site.detail_uri("device", id=leaf["id"]))
+    assert get_result(resp)["attributes"]["owner"] == "gary"
+
+    # One Change per updated object.
+    change = models.Change.objects.filter(
+        resource_name="Device", event="Update"
+    ).get()
+    assert change.resource_id == spine["id"]
+    assert change.resource["attributes"]["owner"] == "netops"
+
+    # Invalid updates are rejected and change nothing.
+    assert_error(
+        client.post(
+            bulk_uri,
+            data=json.dumps({"query": "owner=gary", "append": {"owner": "x"}}),
+        ),
+        status.HTTP_400_BAD_REQUEST,
+    )
+    assert_error(
+        client.post(bulk_uri, data=json.dumps({"set": {"owner": "x"}})),
+        status.HTTP_400_BAD_REQUEST,
+    )
@@ -44,6 +44,50 @@ def test_bulk_delete_devices(client, site):
     assert remaining[0]["hostname"] == "device3"
 
 
+def test_bulk_delete_devices_cascade(client, site):
+    """Test that deleting Devices deletes their Interfaces and Protocols."""
+    dev_uri = site.list_uri("device")
+    ifc_uri = site.list_uri("interface")
+    cir_uri = site.list_uri("circuit")
+    net_uri = site.list_uri("network")
+
+    client.create(net_uri, cidr="10.0.0.0/8")
+    dev1 = get_result(client.create(dev_uri, hostname="device1"))
+    dev2 = get_result(client.create(dev_uri, hostname="device2"))
+    ifc1 = get_result(
+        client.create(
+            ifc_uri, device=dev1["id"], name="eth0", addresses=["10.0.0.1/32"]
+        )
+    )
+    ifc2 = get_result(client.create(ifc_uri, device=dev2["id"], name="eth0"))
+    cir = get_result(
+        client.create(cir_uri, endpoint_a=ifc1["id"], endpoint_z=ifc2["id"])
+    )
+
+    # Interfaces that are Circuit endpoints can't be deleted.
+    resp = bulk_delete(client, dev_uri, [dev1["id"], dev2["id"]])
+    assert_error(resp, status.HTTP_409_CONFLICT)
+    assert len(get_result(client.get(ifc_uri))) == 2
+
+    assert_deleted(client.delete(site.detail_uri("circuit", id=cir["id"])))
+    resp = bulk_delete(client, dev_uri, [dev1["id"], dev2["id"]])
+    assert_deleted(resp)
+    assert get_result(client.get(ifc_uri)) == []
+
+    # The address is no longer assigned.
+    addresses = get_result(client.get(net_uri, params={"cidr": "10.0.0.1/32"}))
+    assert [a["state"] for a in addresses] == ["allocated"]
+
+    # Each Device deletion is recorded.
+    changes = get_result(
+        client.get(
+            site.list_uri("change"),
+            params={"event": "Delete", "resource_name": "Device"},
+        )
+    )
+    assert len(changes) == 2
+
+
 def test_bulk_delete_empty_list(client, site):
     """Test bulk delete with empty list returns 400."""
     dev_uri = site.list_uri("device")
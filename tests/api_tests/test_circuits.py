@@ -687,6 +687,20 @@ def test_detail_routes(site, client):
     dev_circuits_uri = reverse("device-circuits", args=(site.id, dev_a["id"]))
     expected = [cir]
     assert_success(client.retrieve(dev_circuits_uri), expected)
+    # Addresses of all Circuits of a Device
+    addresses_uri = reverse(
+        "device-circuit-addresses", args=(site.id, dev_a["id"])
+    )
+    circuit_addresses_uri = reverse(
+        "circuit-addresses", args=(site.id, cir["id"])
+    )
+    expected = get_result(client.retrieve(circuit_addresses_uri))
+    assert expected
+    assert_success(client.retrieve(addresses_uri), expected)
+
+    # Circuits of a Device can be filtered
+    assert_success(client.retrieve(dev_circuits_uri, name=cir["name"]), [cir])
+    assert_success(client.retrieve(dev_circuits_uri, name="bogus"), [])
 
     # Verify Interface.circuit
     ifc_circuit_uri = reverse("interface-circuit", args=(site.id, if_a["id"]))
@@ -9,6 +9,10 @@ import logging
 
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from nsot import models
+from nsot.api.views import DeviceViewSet
 
 from .util import (
     assert_created,
@@ -322,6 +326,44 @@ def test_partial_update(site, client):
     )
 
 
+def test_update_if_match(site, client):
+    """Test conditional updates of a Device using ETags."""
+    dev_uri = site.list_uri("device")
+    attr_uri = site.list_uri("attribute")
+
+    client.create(attr_uri, resource_name="Device", name="owner")
+    client.create(attr_uri, resource_name="Device", name="role")
+    device = get_result(client.create(dev_uri, hostname="device1"))
+    dev_pk_uri = site.detail_uri("device", id=device["id"])
+
+    resp = client.get(dev_pk_uri)
+    etag = resp.headers["ETag"]
+
+    # A matching ETag succeeds and returns the new one.
+    resp = client.patch(
+        dev_pk_uri,
+        data=json.dumps({"attributes": {"owner": "jathan"}}),
+        headers={"If-Match": etag},
+    )
+    assert_success(resp)
+    new_etag = resp.headers["ETag"]
+    assert new_etag != etag
+    assert client.get(dev_pk_uri).headers["ETag"] == new_etag
+
+    # A stale ETag is rejected and nothing changes.
+    resp = client.patch(
+        dev_pk_uri,
+        data=json.dumps({"attributes": {"owner": "gary"}}),
+        headers={"If-Match": etag},
+    )
+    assert_error(resp, status.HTTP_412_PRECONDITION_FAILED)
+
+    # Unconditional PATCHes of different attributes are merged.
+    client.partial_update(dev_pk_uri, attributes={"role": "br"})
+    device.update(attributes={"owner": "jathan", "role": "br"})
+    assert_success(client.get(dev_pk_uri), device)
+
+
 def test_deletion(site, client):
     """Test deletion of Devices."""
     dev_uri = site.list_uri("device")
@@ -466,3 +508,204 @@ def test_detail_routes(site, client):
         "device-interfaces", args=(site.id, dev1["hostname"])
     )
     assert_success(client.retrieve(natural_ifaces_uri), expected)
+
+
+def test_bundles(site, client):
+    """Test retrieving Devices with everything configured on them."""
+    attr_uri = site.list_uri("attribute")
+    dev_uri = site.list_uri("device")
+    ifc_uri = site.list_uri("interface")
+
+    client.create(attr_uri, resource_name="Device", name="role")
+    client.create(site.list_uri("network"), cidr="10.1.0.0/16")
+    dev1 = get_result(
+        client.create(dev_uri, hostname="foo-bar1", attributes={"role": "br"})
+    )
+    dev2 = get_result(client.create(dev_uri, hostname="foo-bar2"))
+    eth0 = get_result(
+        client.create(
+            ifc_uri, device=dev1["id"], name="eth0", addresses=["10.1.0.1/32"]
+        )
+    )
+    get_result(client.create(ifc_uri, device=dev2["id"], name="eth0"))
+
+    # A single Device
+    bundle_uri = reverse("device-bundle", args=(site.id, dev1["hostname"]))
+    expected = {
+        "device": dev1,
+        "interfaces": [eth0],
+        "circuits": [],
+        "protocols": [],
+    }
+    assert_success(client.retrieve(bundle_uri), expected)
+
+    # Many Devices, by set query or filters
+    bundles_uri = reverse("device-bundles", args=(site.id,))
+    assert_success(client.retrieve(bundles_uri, query="role=br"), [expected])
+    bundles = get_result(client.retrieve(bundles_uri))
+    assert [b["device"] for b in bundles] == [dev1, dev2]
+    assert_success(
+        client.retrieve(bundles_uri, hostname="foo-bar1"), [expected]
+    )
+
+    # Paginated like the list of Devices
+    page = client.retrieve(bundles_uri, limit=1, offset=1).json()
+    assert page["count"] == 2
+    assert page["results"] == bundles[1:]
+
+    # Streamed as one Device per line
+    resp = client.retrieve(bundles_uri, stream=True)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.headers["Content-Type"] == "application/x-ndjson"
+    lines = resp.text.splitlines()
+    assert [json.loads(line) for line in lines] == bundles
+
+
+def test_interface_tree(site, client):
+    """Test retrieving the Interfaces of a Device nested by parent."""
+    dev_uri = site.list_uri("device")
+    ifc_uri = site.list_uri("interface")
+    net_uri = site.list_uri("network")
+
+    client.create(net_uri, cidr="10.1.0.0/16")
+    dev = get_result(client.create(dev_uri, hostname="foo-bar1"))
+    other = get_result(client.create(dev_uri, hostname="foo-bar2"))
+    client.create(ifc_uri, device=other["id"], name="ae0")
+
+    def create(name, parent=None, **kwargs):
+        return get_result(
+            client.create(
+                ifc_uri,
+                device=dev["id"],
+                name=name,
+                parent_id=parent,
+                **kwargs,
+            )
+        )
+
+    ae1 = create("ae1")
+    ae0 = create("ae0")
+    ae0_0 = create("ae0.0", ae0["id"], addresses=["10.1.0.1/32"])
+    ae0_0_1 = create("ae0.0.1", ae0_0["id"])
+    eth1 = create("eth1", ae0["id"])
+    eth0 = create("eth0", ae0["id"])
+
+    # Siblings are ordered by name.
+    tree_uri = reverse("device-interface-tree", args=(site.id, dev["id"]))
+    expected = [
+        {
+            **ae0,
+            "children": [
+                {
+                    **ae0_0,
+                    "children": [{**ae0_0_1, "children": []}],
+                },
+                {**eth0, "children": []},
+                {**eth1, "children": []},
+            ],
+        },
+        {**ae1, "children": []},
+    ]
+    resp = client.retrieve(tree_uri)
+    assert_success(resp, expected)
+    assert get_result(resp) == expected
+    assert get_result(resp)[0]["children"][0]["addresses"] == ["10.1.0.1/32"]
+
+    # A Device without Interfaces has an empty tree.
+    lonely = get_result(client.create(dev_uri, hostname="foo-bar3"))
+    tree_uri = reverse("device-interface-tree", args=(site.id, lonely["id"]))
+    assert_success(client.retrieve(tree_uri), [])
+
+
+def test_interface_tree_queries(site, user, django_assert_num_queries):
+    """The interface tree takes the same queries, however large it is."""
+    site = models.Site.objects.get(id=site.id)
+    device = models.Device.objects.create(site=site, hostname="foo-bar1")
+    parent = models.Interface.objects.create(device=device, name="ae0")
+    for i in range(50):
+        models.Interface.objects.create(
+            device=device, name=f"ae0.{i}", parent=parent
+        )
+
+    view = DeviceViewSet.as_view({"get": "interface_tree"})
+    request = APIRequestFactory().get("/")
+    force_authenticate(request, user=user)
+    with django_assert_num_queries(2):
+        resp = view(request, pk=device.id, site_pk=site.id)
+
+    assert [i["name"] for i in resp.data] == ["ae0"]
+    assert len(resp.data[0]["children"]) == 50
+
+
+def test_topology(site, client):
+    """Test the neighbors of and paths between Devices."""
+    dev_uri = site.list_uri("device")
+    ifc_uri = site.list_uri("interface")
+    cir_uri = site.list_uri("circuit")
+
+    devices = [
+        get_result(client.create(dev_uri, hostname=f"foo-bar{i}"))
+        for i in range(4)
+    ]
+
+    # foo-bar0 - foo-bar1 - foo-bar2, and foo-bar3 alone.
+    circuits = []
+    for a, z in ((devices[0], devices[1]), (devices[1], devices[2])):
+        ends = [
+            get_result(
+                client.create(
+                    ifc_uri, device=dev["id"], name=f"eth-{other['id']}"
+                )
+            )
+            for dev, other in ((a, z), (z, a))
+        ]
+        circuits.append(
+            get_result(
+                client.create(
+                    cir_uri, endpoint_a=ends[0]["id"], endpoint_z=ends[1]["id"]
+                )
+            )
+        )
+
+    def uri(name, device):
+        return reverse(f"device-{name}", args=(site.id, device["hostname"]))
+
+    assert_success(client.retrieve(uri("neighbors", devices[0])), [devices[1]])
+    assert_success(
+        client.retrieve(uri("neighbors", devices[1])),
+        [devices[0], devices[2]],
+    )
+    assert_success(client.retrieve(uri("neighbors", devices[3])), [])
+
+    assert_success(
+        client.retrieve(uri("neighborhood", devices[0])), [devices[1]]
+    )
+    assert_success(
+        client.retrieve(uri("neighborhood", devices[0]), hops=2),
+        [devices[1], devices[2]],
+    )
+    assert_error(
+        client.retrieve(uri("neighborhood", devices[0]), hops="bogus"),
+        status.HTTP_400_BAD_REQUEST,
+    )
+    assert_error(
+        client.retrieve(uri("neighborhood", devices[0]), hops=0),
+        status.HTTP_400_BAD_REQUEST,
+    )
+
+    path_uri = uri("shortest-path", devices[2])
+    resp = client.retrieve(path_uri, target=devices[0]["hostname"])
+    expected = {
+        "devices": [devices[2], devices[1], devices[0]],
+        "circuits": [circuits[1], circuits[0]],
+    }
+    assert_success(resp, expected)
+    assert get_result(resp) == expected
+    assert_error(
+        client.retrieve(path_uri, target=devices[3]["id"]),
+        status.HTTP_404_NOT_FOUND,
+    )
+    assert_error(
+        client.retrieve(path_uri, target="bogus"), status.HTTP_404_NOT_FOUND
+    )
+    assert_error(client.retrieve(path_uri), status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,61 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+import logging
+
+from rest_framework import status
+
+from .util import assert_error, assert_success
+
+log = logging.getLogger(__name__)
+
+
+def test_device_facets(client, site):
+    attr_uri = site.list_uri("attribute")
+    dev_uri = site.list_uri("device")
+    facets_uri = dev_uri + "facets/"
+
+    client.create(attr_uri, resource_name="Device", name="role")
+    client.create(attr_uri, resource_name="Device", name="vendor")
+    client.create(
+        dev_uri,
+        hostname="spine1",
+        attributes={"role": "spine", "vendor": "juniper"},
+    )
+    client.create(
+        dev_uri,
+        hostname="spine2",
+        attributes={"role": "spine", "vendor": "arista"},
+    )
+    client.create(
+        dev_uri,
+        hostname="leaf1",
+        attributes={"role": "leaf", "vendor": "arista"},
+    )
+
+    assert_success(
+        client.retrieve(facets_uri, attribute="role"),
+        {
+            "role": [
+                {"value": "spine", "count": 2},
+                {"value": "leaf", "count": 1},
+            ]
+        },
+    )
+
+    assert_success(
+        client.retrieve(facets_uri, attribute="vendor", query="role=spine"),
+        {
+            "vendor": [
+                {"value": "arista", "count": 1},
+                {"value": "juniper", "count": 1},
+            ]
+        },
+    )
+
+    assert_error(
+        client.retrieve(facets_uri, query="bogus=1"),
+        status.HTTP_400_BAD_REQUEST,
+    )
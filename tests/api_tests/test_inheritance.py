@@ -7,6 +7,11 @@ pytestmark = pytest.mark.django_db
 import logging
 
 from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from nsot import models
+from nsot.api.serializers import NetworkSerializer
 
 from .util import Client, get_result
 
@@ -251,3 +256,38 @@ def test_without_include_inherited(live_server, site):
     resp = client.retrieve(site.detail_uri("network", id=net["id"]))
     result = get_result(resp)
     assert result["merged_attributes"] is None
+
+
+def test_list_merged_attributes_batched(site, django_assert_max_num_queries):
+    """Merged attributes for a list are resolved in a fixed number of queries."""
+    site = models.Site.objects.get(id=site.id)
+    models.Attribute.objects.create(
+        site=site, resource_name="Network", name="region", inheritable=True
+    )
+    root = models.Network.objects.create(site=site, cidr="10.0.0.0/8")
+    root.set_attributes({"region": "us-west"})
+    for i in range(20):
+        models.Network.objects.create(site=site, cidr="10.%d.0.0/16" % i)
+
+    request = Request(
+        APIRequestFactory().get("/", {"include_inherited": "true"})
+    )
+    networks = list(
+        models.Network.objects.select_related("parent").exclude(id=root.id)
+    )
+    serializer = NetworkSerializer(
+        networks, many=True, context={"request": request}
+    )
+
+    with django_assert_max_num_queries(2):
+        data = serializer.data
+
+    assert len(data) == 20
+    for item in data:
+        assert item["merged_attributes"] == {
+            "region": {
+                "value": "us-west",
+                "source": "10.0.0.0/8",
+                "inherited": True,
+            }
+        }
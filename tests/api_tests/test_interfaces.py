@@ -397,6 +397,50 @@ def test_bulk_operations(site, client):
     assert updated == expected
 
 
+def test_bulk_addresses(site, client):
+    """Test assigning addresses when creating/updating many Interfaces."""
+    dev_uri = site.list_uri("device")
+    ifc_uri = site.list_uri("interface")
+    net_uri = site.list_uri("network")
+
+    client.create(net_uri, cidr="10.1.1.0/24")
+    dev = get_result(client.create(dev_uri, hostname="foo-bar1"))
+
+    collection = [
+        {"device": dev["id"], "name": "eth1", "addresses": ["10.1.1.1/32"]},
+        {"device": dev["id"], "name": "eth2", "addresses": ["10.1.1.2/32"]},
+    ]
+    resp = client.post(ifc_uri, data=json.dumps(collection))
+    assert_created(resp, None)
+    created = get_result(resp.json())
+    assert [i["addresses"] for i in created] == [
+        ["10.1.1.1/32"],
+        ["10.1.1.2/32"],
+    ]
+    assert [i["networks"] for i in created] == [["10.1.1.0/24"]] * 2
+
+    # Swap the addresses around.
+    updated = [
+        {"id": created[0]["id"], "addresses": ["10.1.1.2/32"]},
+        {"id": created[1]["id"], "addresses": ["10.1.1.1/32"]},
+    ]
+    resp = client.patch(ifc_uri, data=json.dumps(updated))
+    assert resp.status_code == 200
+    result = {i["id"]: i["addresses"] for i in get_result(resp.json())}
+    assert result == {
+        created[0]["id"]: ["10.1.1.2/32"],
+        created[1]["id"]: ["10.1.1.1/32"],
+    }
+
+    # An address can only be assigned once per Device.
+    collection = [
+        {"device": dev["id"], "name": "eth3", "addresses": ["10.1.1.3/32"]},
+        {"device": dev["id"], "name": "eth4", "addresses": ["10.1.1.3/32"]},
+    ]
+    assert_error(client.post(ifc_uri, data=json.dumps(collection)), 400)
+    assert len(get_result(client.get(ifc_uri))) == 2
+
+
 def test_update(site, client):
     """Test update of an existing interface w/ an address."""
     ifc_uri = site.list_uri("interface")
@@ -979,3 +1023,93 @@ def test_update_addresses_reverts_old_network_state(site, client):
     new_net = get_result(client.retrieve(net_uri, cidr="10.9.9.2/32"))[0]
     assert old_net["state"] == "allocated"
     assert new_net["state"] == "assigned"
+
+
+def test_mac_lookup(site, client, device):
+    """Test resolving many MAC addresses to Interfaces at once."""
+    ifc_uri = site.list_uri("interface")
+    lookup_uri = reverse("interface-mac-lookup", args=(site.id,))
+    client.create(site.list_uri("network"), cidr="10.0.0.0/8")
+
+    eth0 = get_result(
+        client.create(
+            ifc_uri,
+            device=device["id"],
+            name="eth0",
+            mac_address="00:1c:73:2a:60:62",
+            addresses=["10.0.0.1/32"],
+        )
+    )
+    eth1 = get_result(
+        client.create(ifc_uri, device=device["id"], name="eth1", mac_address=1)
+    )
+
+    def summary(ifc):
+        return {
+            key: ifc[key]
+            for key in ("id", "name_slug", "device_hostname", "addresses")
+        } | {"device": device["id"]}
+
+    resp = client.post(
+        lookup_uri,
+        data=json.dumps(
+            {"mac_addresses": ["00-1C-73-2A-60-62", 1, "001c.732a.6063"]}
+        ),
+    )
+    expected = {
+        "00-1C-73-2A-60-62": [summary(eth0)],
+        "1": [summary(eth1)],
+        "001c.732a.6063": [],
+    }
+    assert_success(resp, expected)
+
+    # Bad inputs
+    assert_error(
+        client.post(
+            lookup_uri, data=json.dumps({"mac_addresses": ["bogus", 1]})
+        ),
+        status.HTTP_400_BAD_REQUEST,
+    )
+    assert_error(
+        client.post(lookup_uri, data=json.dumps({"mac_addresses": "1"})),
+        status.HTTP_400_BAD_REQUEST,
+    )
+
+
+def test_address_within(site, client, device):
+    """Test filtering Interfaces by addresses inside a network."""
+    ifc_uri = site.list_uri("interface")
+    net_uri = site.list_uri("network")
+    client.create(net_uri, cidr="10.0.0.0/8")
+    client.create(net_uri, cidr="2001:db8::/32")
+
+    def create(name, addresses):
+        return get_result(
+            client.create(
+                ifc_uri, device=device["id"], name=name, addresses=addresses
+            )
+        )
+
+    eth0 = create("eth0", ["10.20.0.1/32", "10.20.255.255/32"])
+    eth1 = create("eth1", ["10.20.1.1/32", "2001:db8::1/128"])
+    eth2 = create("eth2", ["10.21.0.1/32", "10.19.255.255/32"])
+    create("eth3", [])
+
+    def within(cidr, **params):
+        return client.retrieve(ifc_uri, address_within=cidr, **params)
+
+    # Interfaces are only listed once, however many addresses match.
+    assert_success(within("10.20.0.0/16"), [eth0, eth1])
+    assert_success(within("10.20.0.1/32"), [eth0])
+    assert_success(within("10.0.0.0/8"), [eth0, eth1, eth2])
+    assert_success(within("2001:db8::/32"), [eth1])
+    assert_success(within("10.22.0.0/16"), [])
+
+    # Combines with pagination.
+    resp = within("10.0.0.0/8", limit=2, offset=1)
+    assert resp.status_code == status.HTTP_200_OK
+    payload = resp.json()
+    assert payload["count"] == 3
+    assert payload["results"] == [eth1, eth2]
+
+    assert_error(within("bogus"), status.HTTP_400_BAD_REQUEST)
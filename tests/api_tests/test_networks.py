@@ -10,6 +10,8 @@ import logging
 from django.urls import reverse
 from rest_framework import status
 
+from nsot import models
+
 from .util import (
     Client,
     assert_created,
@@ -515,6 +517,35 @@ def test_deletion_blocked_by_interface_assignment(site, client):
     assert_deleted(client.destroy(addr_obj_uri))
 
 
+def test_bulk_interface_refresh(site, client, monkeypatch):
+    """Networks created in bulk refresh each affected Interface at once."""
+    net_uri = site.list_uri("network")
+    dev_uri = site.list_uri("device")
+    iface_uri = site.list_uri("interface")
+
+    client.create(net_uri, cidr="10.1.0.0/16")
+    dev = get_result(client.create(dev_uri, hostname="test-dev1"))
+    iface = get_result(
+        client.create(
+            iface_uri, device=dev["id"], name="eth0", addresses=["10.1.1.1/32"]
+        )
+    )
+    iface_obj_uri = site.detail_uri("interface", id=iface["id"])
+
+    refreshes = []
+    refresh = models.Interface.objects.refresh_address_caches
+    monkeypatch.setattr(
+        models.Interface.objects,
+        "refresh_address_caches",
+        lambda ids: refreshes.append(set(ids)) or refresh(ids),
+    )
+
+    collection = [{"cidr": "10.1.1.0/24"}, {"cidr": "10.1.1.0/25"}]
+    assert_created(client.post(net_uri, data=json.dumps(collection)), None)
+    assert refreshes == [{iface["id"]}]
+    assert get_result(client.get(iface_obj_uri))["networks"] == ["10.1.1.0/25"]
+
+
 def test_mptt_detail_routes(site, client):
     """Test detail routes for ancestor/children/descendants/root methods."""
     net_uri = site.list_uri("network")
@@ -0,0 +1,57 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+import logging
+
+from rest_framework import status
+
+from .util import assert_error, assert_success, get_result
+
+log = logging.getLogger(__name__)
+
+
+def test_members_etag(client, site):
+    attr_uri = site.list_uri("attribute")
+    dev_uri = site.list_uri("device")
+    sq_uri = site.list_uri("savedquery")
+
+    client.create(attr_uri, resource_name="Device", name="role")
+    spine = get_result(
+        client.create(dev_uri, hostname="spine1", attributes={"role": "spine"})
+    )
+    client.create(dev_uri, hostname="leaf1", attributes={"role": "leaf"})
+
+    resp = client.create(
+        sq_uri, resource_name="Device", name="spines", query="role=spine"
+    )
+    assert resp.status_code == status.HTTP_201_CREATED, resp.json()
+    saved = get_result(resp)
+
+    members_uri = site.detail_uri("savedquery", id=saved["id"]) + "members/"
+    resp = client.get(members_uri)
+    assert_success(resp, [spine["id"]])
+    etag = resp.headers["ETag"]
+
+    # Unchanged membership is a 304.
+    resp = client.get(members_uri, headers={"If-None-Match": etag})
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # New matching device changes the ETag.
+    spine2 = get_result(
+        client.create(dev_uri, hostname="spine2", attributes={"role": "spine"})
+    )
+    resp = client.get(members_uri, headers={"If-None-Match": etag})
+    assert_success(resp, [spine["id"], spine2["id"]])
+    assert resp.headers["ETag"] != etag
+
+
+def test_bad_query(client, site):
+    sq_uri = site.list_uri("savedquery")
+    assert_error(
+        client.create(
+            sq_uri, resource_name="Device", name="bad", query="bogus=1"
+        ),
+        status.HTTP_400_BAD_REQUEST,
+    )
@@ -123,6 +123,7 @@ class Client:
         headers = {
             "X-NSoT-Email": self.user,
         }
+        headers.update(kwargs.pop("headers", {}))
 
         # If api_version is set, let's use that.
         api_version = kwargs.get("api_version", self.api_version)
@@ -24,6 +24,16 @@ def admin_user(django_user_model):
     return user
 
 
+@pytest.fixture
+def cache(settings):
+    """Use a local memory cache, so that cached results are stored."""
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 @pytest.fixture
 def site():
     """Create and return a Site object."""
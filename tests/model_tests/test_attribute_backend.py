@@ -0,0 +1,85 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from django.db.models import ProtectedError
+
+from nsot import models
+
+
+@pytest.fixture
+def json_backend(settings):
+    settings.NSOT_ATTRIBUTE_BACKEND = "json"
+
+
+@pytest.fixture
+def devices(site):
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="owner"
+    )
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="role", multi=True
+    )
+    return [
+        models.Device.objects.create(
+            site=site, hostname=hostname, attributes=attributes
+        )
+        for hostname, attributes in [
+            ("foo-bar1", {"owner": "jathan", "role": ["br", "spine"]}),
+            ("foo-bar2", {"owner": "gary", "role": ["dr"]}),
+            ("foo-bar3", {"owner": "jathan", "role": ["leaf"]}),
+        ]
+    ]
+
+
+def test_json_queries(site, json_backend, devices):
+    device1, device2, device3 = devices
+
+    # No Value rows are maintained, but the cache is stored right away.
+    assert not models.Value.objects.exists()
+    device1.refresh_from_db()
+    assert device1.get_attributes() == {
+        "owner": "jathan",
+        "role": ["br", "spine"],
+    }
+
+    def query(q):
+        return list(models.Device.objects.set_query(q).order_by("id"))
+
+    assert query("owner=jathan") == [device1, device3]
+    assert query("role=spine") == [device1]
+    assert query("owner=jathan -role=leaf") == [device1]
+    assert query("role=leaf +owner=gary") == [device2, device3]
+    assert query("role_regex=^[bd]r$") == [device1, device2]
+    assert query("owner_regex=ary") == [device2]
+
+    assert list(models.Device.objects.by_attribute("role", "dr")) == [device2]
+
+    # Changing attributes is reflected in queries.
+    device3.set_attributes({"role": ["spine"]}, partial=True)
+    assert query("role=spine") == [device1, device3]
+
+
+def test_json_deletion_protected(site, json_backend, devices):
+    attribute = models.Attribute.objects.get(name="owner")
+    with pytest.raises(ProtectedError):
+        attribute.delete()
+
+    for device in devices:
+        device.delete()
+    attribute.delete()
+
+
+def test_json_inheritance(site, json_backend):
+    models.Attribute.objects.create(
+        site=site, resource_name="Network", name="region", inheritable=True
+    )
+    root = models.Network.objects.create(
+        site=site, cidr="10.0.0.0/8", attributes={"region": "us-west"}
+    )
+    child = models.Network.objects.create(site=site, cidr="10.1.0.0/16")
+
+    merged = child.get_merged_attributes()
+    assert merged["region"]["value"] == "us-west"
+    assert merged["region"]["source"] == str(root)
@@ -0,0 +1,207 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from io import StringIO
+
+from django.core.management import call_command
+
+from nsot import exc, models
+from nsot.models import attribute_operations
+
+
+def make_device(site, hostname, **attributes):
+    device = models.Device.objects.create(site=site, hostname=hostname)
+    if attributes:
+        device.set_attributes(attributes)
+        device.save()
+    return device
+
+
+@pytest.fixture
+def owner(site):
+    return models.Attribute.objects.create(
+        site=site, resource_name="Device", name="owner"
+    )
+
+
+def test_backfill_default(site, owner):
+    devices = [make_device(site, "foo-bar%d" % i) for i in range(5)]
+    make_device(site, "foo-bar9", owner="gary")
+
+    owner.default = "jathan"
+    owner.save()
+
+    progress = []
+    updated = attribute_operations.backfill_default(
+        owner, chunk_size=2, progress=lambda *a: progress.append(a)
+    )
+    assert updated == 5
+    assert progress == [(2, 5), (4, 5), (5, 5)]
+
+    for device in devices:
+        device.refresh_from_db()
+        assert device.get_attributes() == {"owner": "jathan"}
+    assert models.Device.objects.set_query("owner=jathan").count() == 5
+    assert models.Device.objects.set_query("owner=gary").count() == 1
+
+    # Running it again is a no-op.
+    assert attribute_operations.backfill_default(owner) == 0
+
+
+def test_rename(site, owner):
+    device = make_device(site, "foo-bar1", owner="jathan")
+
+    updated = attribute_operations.rename_attribute(owner, "team")
+    assert updated == 1
+
+    device.refresh_from_db()
+    assert device.get_attributes() == {"team": "jathan"}
+    assert list(models.Device.objects.set_query("team=jathan")) == [device]
+    assert not models.Value.objects.filter(name="owner").exists()
+
+    # Names are validated and must be unique.
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="role"
+    )
+    with pytest.raises(exc.DjangoValidationError):
+        attribute_operations.rename_attribute(owner, "role")
+
+
+@pytest.fixture(params=["values", "json"])
+def backend(request, settings):
+    settings.NSOT_ATTRIBUTE_BACKEND = request.param
+
+
+def test_rename_resumed(site, owner, backend):
+    devices = [
+        make_device(site, "foo-bar%d" % i, owner="jathan") for i in range(3)
+    ]
+    saved_query = models.SavedQuery.objects.create(
+        site=site, resource_name="Device", name="mine", query="owner=jathan"
+    )
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt(done, total):
+        raise Interrupted
+
+    # The first chunk is committed before the rename is interrupted.
+    with pytest.raises(Interrupted):
+        attribute_operations.rename_attribute(
+            owner, "team", chunk_size=1, progress=interrupt
+        )
+    owner.refresh_from_db()
+    assert owner.name == "owner"
+
+    updated = attribute_operations.rename_attribute(owner, "team")
+    assert updated == 2
+
+    owner.refresh_from_db()
+    assert owner.name == "team"
+    for device in devices:
+        device.refresh_from_db()
+        assert device.get_attributes() == {"team": "jathan"}
+    assert (
+        list(models.Device.objects.set_query("team=jathan").order_by("id"))
+        == devices
+    )
+
+    saved_query.refresh_from_db()
+    assert saved_query.query == "team=jathan"
+    assert saved_query.get_member_ids() == [d.id for d in devices]
+
+    # Running it again is a no-op.
+    assert attribute_operations.rename_attribute(owner, "team") == 0
+
+
+def test_rename_inherited(site, backend):
+    region = models.Attribute.objects.create(
+        site=site, resource_name="Network", name="region", inheritable=True
+    )
+    parent = models.Network.objects.create(site=site, cidr="10.0.0.0/8")
+    parent.set_attributes({"region": "us-west"}, partial=True)
+    child = models.Network.objects.create(site=site, cidr="10.1.0.0/16")
+
+    assert attribute_operations.rename_attribute(region, "zone") == 1
+
+    # The inherited value is renamed too, rather than being dropped.
+    assert child.get_merged_attributes() == {
+        "zone": {
+            "value": "us-west",
+            "source": "10.0.0.0/8",
+            "inherited": True,
+        }
+    }
+    assert not models.EffectiveValue.objects.filter(name="region").exists()
+    assert models.EffectiveValue.objects.filter(name="zone").count() == 2
+
+
+def test_convert(site, owner):
+    device1 = make_device(site, "foo-bar1", owner="jathan")
+
+    attribute_operations.convert_attribute(owner, multi=True)
+    device1.refresh_from_db()
+    assert device1.get_attributes() == {"owner": ["jathan"]}
+
+    device1.set_attributes({"owner": ["jathan", "gary"]})
+    device1.save()
+    with pytest.raises(exc.ValidationError):
+        attribute_operations.convert_attribute(owner, multi=False)
+
+    device1.set_attributes({"owner": ["gary"]})
+    device1.save()
+    attribute_operations.convert_attribute(owner, multi=False)
+    device1.refresh_from_db()
+    assert device1.get_attributes() == {"owner": "gary"}
+    assert not models.Attribute.objects.get(id=owner.id).multi
+
+
+def test_command(site, owner):
+    make_device(site, "foo-bar1", owner="jathan")
+    out = StringIO()
+    call_command(
+        "attribute",
+        "rename",
+        str(site.id),
+        "Device",
+        "owner",
+        "--new-name=team",
+        stdout=out,
+    )
+    assert "Done: 1 resources updated." in out.getvalue()
+    assert models.Attribute.objects.filter(name="team").exists()
+
+
+def test_convert_resumed(site, owner, backend):
+    devices = [
+        make_device(site, "foo-bar%d" % i, owner="jathan") for i in range(3)
+    ]
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt(done, total):
+        raise Interrupted
+
+    # The first chunk is committed before the conversion is interrupted.
+    with pytest.raises(Interrupted):
+        attribute_operations.convert_attribute(
+            owner, multi=True, chunk_size=1, progress=interrupt
+        )
+    owner.refresh_from_db()
+    assert not owner.multi
+
+    assert attribute_operations.convert_attribute(owner, multi=True) == 3
+    owner.refresh_from_db()
+    assert owner.multi
+    for device in devices:
+        device.refresh_from_db()
+        assert device.get_attributes() == {"owner": ["jathan"]}
+
+    # Converting back works the same way.
+    assert attribute_operations.convert_attribute(owner, multi=False) == 3
+    devices[0].refresh_from_db()
+    assert devices[0].get_attributes() == {"owner": "jathan"}
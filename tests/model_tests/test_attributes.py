@@ -258,6 +258,17 @@ def test_set_query(site):
     regex = models.Device.objects.set_query("role_regex=[bd]r").order_by("id")
     assert list(union) == list(regex)
 
+    # Regex with literal substrings is pre-filtered on them, and values of
+    # other attributes don't match.
+    regex = models.Device.objects.set_query("role_regex=^b.$")
+    assert list(regex) == [device1]
+    regex = models.Device.objects.set_query(
+        "owner_regex=^ga.y", site_id=site.id
+    )
+    assert list(regex) == [device2]
+    regex = models.Device.objects.set_query("role_regex=ary", site_id=site.id)
+    assert list(regex) == []
+
     # Test unique set queries
     # Bad query, too many results
     with pytest.raises(exc.ValidationError):
@@ -0,0 +1,89 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from nsot import exc, models
+
+
+@pytest.fixture
+def devices(site):
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="owner"
+    )
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="role", multi=True
+    )
+    devices = []
+    for hostname, attributes in [
+        ("foo-bar1", {"owner": "jathan", "role": ["br"]}),
+        ("foo-bar2", {"owner": "gary", "role": ["dr"]}),
+        ("foo-bar3", {"owner": "jathan"}),
+    ]:
+        device = models.Device.objects.create(site=site, hostname=hostname)
+        device.set_attributes(attributes)
+        device.save()
+        devices.append(device)
+    return devices
+
+
+def test_bulk_update(site, devices):
+    device1, device2, device3 = devices
+    qs = models.Device.objects.set_query("owner=jathan")
+
+    changed = qs.bulk_update_attributes(
+        set_values={"owner": "ops"}, append={"role": ["edge", "br"]}
+    )
+    assert sorted(changed) == [device1.id, device3.id]
+
+    for device in devices:
+        device.refresh_from_db()
+    assert device1.get_attributes() == {"owner": "ops", "role": ["br", "edge"]}
+    assert device3.get_attributes() == {"owner": "ops", "role": ["edge", "br"]}
+    assert device2.get_attributes() == {"owner": "gary", "role": ["dr"]}
+
+    # Value rows and the cache agree, so set queries still work.
+    assert device3.clean_attributes() == device3.get_attributes()
+    assert list(
+        models.Device.objects.set_query("role=edge").order_by("id")
+    ) == [device1, device3]
+
+    # Deleting and re-running is a no-op for unchanged objects.
+    assert qs.bulk_update_attributes(set_values={"owner": "gary"}) == []
+    changed = models.Device.objects.all().bulk_update_attributes(
+        delete=["role"]
+    )
+    assert sorted(changed) == [device1.id, device2.id, device3.id]
+    assert not models.Value.objects.filter(name="role").exists()
+
+
+def test_bulk_update_validation(site, devices):
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="metro"
+    )
+    qs = models.Device.objects.all()
+
+    with pytest.raises(exc.ValidationError):
+        qs.bulk_update_attributes(set_values={"bogus": "1"})
+    with pytest.raises(exc.ValidationError):
+        qs.bulk_update_attributes(append={"owner": "ops"})
+    with pytest.raises(exc.ValidationError):
+        qs.bulk_update_attributes(
+            set_values={"owner": "ops"}, delete=["owner"]
+        )
+
+    # A dependency failure on any object leaves every object untouched.
+    models.Attribute.objects.get(name="metro").depends_on.add(
+        models.Attribute.objects.get(name="role")
+    )
+    with pytest.raises(exc.ValidationError):
+        qs.bulk_update_attributes(set_values={"metro": "lax"})
+    assert not models.Value.objects.filter(name="metro").exists()
+
+
+def test_bulk_record_changes(site, devices, user):
+    changes = models.Change.bulk_record(devices, user=user, event="Update")
+    assert [c.resource_id for c in changes] == [d.id for d in devices]
+    change = models.Change.objects.get(resource_id=devices[0].id)
+    assert change.resource["hostname"] == "foo-bar1"
+    assert change.site_id == site.id
@@ -0,0 +1,96 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from nsot import models
+from nsot.models import bundle
+
+
+def _to_dict(value):
+    if isinstance(value, list):
+        return [obj.to_dict() for obj in value]
+    return value.to_dict()
+
+
+def test_bundles(site, django_assert_num_queries):
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="role"
+    )
+    models.Network.objects.create(site=site, cidr="10.1.0.0/16")
+    bgp = models.ProtocolType.objects.create(site=site, name="bgp")
+
+    devices = []
+    for i in range(5):
+        device = models.Device.objects.create(
+            site=site, hostname=f"foo{i}", attributes={"role": "br"}
+        )
+        devices.append(device)
+        parent = models.Interface.objects.create(device=device, name="ae0")
+        for j in range(i + 1):
+            models.Interface.objects.create(
+                device=device,
+                name=f"ae0.{j}",
+                parent=parent,
+                addresses=[f"10.1.{i}.{j + 1}/32"],
+            )
+        models.Protocol.objects.create(
+            device=device, type=bgp, interface=parent
+        )
+    circuit = models.Circuit.objects.create(
+        endpoint_a=devices[0].interfaces.get(name="ae0"),
+        endpoint_z=devices[1].interfaces.get(name="ae0"),
+    )
+    models.Protocol.objects.create(
+        device=devices[0], type=bgp, circuit=circuit
+    )
+    lonely = models.Device.objects.create(site=site, hostname="lonely")
+
+    # The number of queries doesn't depend on the number of objects.
+    queryset = models.Device.objects.order_by("id")
+    with django_assert_num_queries(4):
+        result = [
+            {key: _to_dict(value) for key, value in b.items()}
+            for b in bundle.bundles(queryset)
+        ]
+    assert [b["device"] for b in result] == [
+        d.to_dict() for d in [*devices, lonely]
+    ]
+
+    first = result[0]
+    assert first["device"]["attributes"] == {"role": "br"}
+    assert [i["name_slug"] for i in first["interfaces"]] == [
+        "foo0:ae0",
+        "foo0:ae0.0",
+    ]
+    assert first["interfaces"][1]["parent"] == "foo0:ae0"
+    assert first["interfaces"][1]["addresses"] == ["10.1.0.1/32"]
+    assert first["interfaces"][1]["networks"] == ["10.1.0.0/16"]
+    assert first["circuits"] == [circuit.to_dict()]
+    assert [p["interface"] for p in first["protocols"]] == ["foo0:ae0", None]
+    assert [p["circuit"] for p in first["protocols"]] == [
+        None,
+        circuit.name_slug,
+    ]
+
+    assert len(result[4]["interfaces"]) == 6
+    assert result[1]["circuits"] == [circuit.to_dict()]
+    assert result[-1] == {
+        "device": lonely.to_dict(),
+        "interfaces": [],
+        "circuits": [],
+        "protocols": [],
+    }
+
+    # Devices are bundled in chunks.
+    with django_assert_num_queries(10):
+        chunked = list(bundle.bundles(queryset, chunk_size=2))
+    assert [b["device"] for b in chunked] == [*devices, lonely]
+    assert [b["interfaces"] for b in chunked] == [
+        list(d.interfaces.order_by("id")) for d in [*devices, lonely]
+    ]
+
+    single = bundle.bundle(devices[2])
+    assert {key: _to_dict(value) for key, value in single.items()} == (
+        result[2]
+    )
@@ -0,0 +1,118 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from django.db import connection
+
+from nsot import exc, models
+from nsot.models import cascade
+
+
+def test_delete_devices(site, user, django_assert_max_num_queries):
+    models.Attribute.objects.create(
+        site=site, resource_name="Interface", name="vlan"
+    )
+    models.Network.objects.create(site=site, cidr="10.1.0.0/16")
+    devices = []
+    for i in range(5):
+        device = models.Device.objects.create(site=site, hostname=f"foo{i}")
+        devices.append(device)
+        parent = models.Interface.objects.create(device=device, name="ae0")
+        for j in range(10):
+            models.Interface.objects.create(
+                device=device,
+                name=f"ae0.{j}",
+                parent=parent,
+                addresses=[f"10.1.{i}.{j + 1}/32"],
+                attributes={"vlan": str(j)},
+            )
+    keep = models.Device.objects.create(site=site, hostname="keep")
+    shared = models.Interface.objects.create(
+        device=keep, name="eth0", addresses=["10.1.0.1/32"]
+    )
+
+    # The number of queries doesn't depend on the number of objects.
+    with django_assert_max_num_queries(30):
+        counts = cascade.delete_cascade(
+            models.Device, [d.id for d in devices], user=user
+        )
+    assert counts == {"Interface": 55, "Device": 5}
+
+    assert list(models.Device.objects.all()) == [keep]
+    assert list(models.Interface.objects.all()) == [shared]
+    assert not models.Value.objects.exists()
+    assert models.Assignment.objects.count() == 1
+
+    # Addresses that are still assigned elsewhere stay assigned.
+    states = dict(
+        models.Network.objects.filter(is_ip=True).values_list(
+            "network_address", "state"
+        )
+    )
+    assert states.pop("10.1.0.1") == models.Network.ASSIGNED
+    assert set(states.values()) == {models.Network.ALLOCATED}
+
+    # Only the Devices themselves are recorded.
+    changes = models.Change.objects.filter(event="Delete")
+    assert changes.count() == 5
+    assert {c.resource_name for c in changes} == {"Device"}
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="Uses SQLite foreign key checks"
+)
+def test_delete_interfaces_checked_immediately(site, monkeypatch):
+    """Test that no row is left referencing a deleted Interface."""
+    device = models.Device.objects.create(site=site, hostname="foo")
+    parent = models.Interface.objects.create(device=device, name="ae0")
+    for i in range(3):
+        child = models.Interface.objects.create(
+            device=device, name=f"ae0.{i}", parent=parent
+        )
+        models.Interface.objects.create(
+            device=device, name=f"ae0.{i}.0", parent=child
+        )
+
+    # Stands in for databases that check foreign keys after each statement.
+    def check_foreign_keys(execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if sql.startswith("DELETE"):
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA foreign_key_check(nsot_interface)")
+                assert cursor.fetchall() == []
+        return result
+
+    monkeypatch.setattr(cascade, "CHUNK_SIZE", 2)
+    with connection.execute_wrapper(check_foreign_keys):
+        counts = cascade.delete_cascade(models.Device, [device.id])
+    assert counts == {"Interface": 7, "Device": 1}
+
+
+def test_delete_protected(site, user):
+    device = models.Device.objects.create(site=site, hostname="foo-bar1")
+    other = models.Device.objects.create(site=site, hostname="foo-bar2")
+    eth0 = models.Interface.objects.create(device=device, name="eth0")
+    models.Interface.objects.create(device=device, name="eth0.0", parent=eth0)
+    models.Circuit.objects.create(
+        endpoint_a=models.Interface.objects.create(device=device, name="eth1"),
+        endpoint_z=models.Interface.objects.create(device=other, name="eth1"),
+    )
+
+    # Circuits must be deleted first.
+    with pytest.raises(exc.ProtectedError):
+        cascade.delete_cascade(models.Device, [device.id], user=user)
+    assert models.Interface.objects.filter(device=device).count() == 3
+
+    # And so must child Interfaces, unless they're deleted too.
+    with pytest.raises(exc.ProtectedError):
+        cascade.delete_cascade(models.Interface, [eth0.id])
+    models.Circuit.objects.all().delete()
+    cascade.delete_cascade(models.Device, [device.id])
+    assert list(models.Device.objects.all()) == [other]
+    assert not models.Change.objects.filter(event="Delete").exists()
+
+    # Networks have their own rules.
+    network = models.Network.objects.create(site=site, cidr="10.0.0.0/8")
+    with pytest.raises(exc.ValidationError):
+        cascade.delete_cascade(models.Network, [network.id])
@@ -149,6 +149,103 @@ def test_addresses_include_descendants(device):
     assert address_strs == expected
 
 
+def test_addresses_for(device, django_assert_num_queries):
+    """Test looking up the addresses of many Circuits at once."""
+    site = device.site
+    models.Network.objects.create(cidr="10.99.0.0/24", site=site)
+    other = models.Device.objects.create(site=site, hostname="foo-bar2")
+
+    circuits = []
+    for i in range(3):
+        ends = []
+        for dev, offset in ((device, 0), (other, 100)):
+            iface = models.Interface.objects.create(
+                device=dev,
+                name=f"ae{i}",
+                addresses=[f"10.99.0.{offset + i * 10 + 1}/32"],
+            )
+            models.Interface.objects.create(
+                device=dev,
+                name=f"ae{i}.0",
+                addresses=[f"10.99.0.{offset + i * 10 + 2}/32"],
+                parent=iface,
+            )
+            ends.append(iface)
+        circuits.append(
+            models.Circuit.objects.create(
+                endpoint_a=ends[0], endpoint_z=ends[1]
+            )
+        )
+
+    # Unrelated addresses aren't included.
+    models.Interface.objects.create(
+        device=device, name="eth0", addresses=["10.99.0.99/32"]
+    )
+
+    with django_assert_num_queries(1):
+        addresses = [
+            str(a) for a in models.Circuit.objects.addresses_for(circuits[:2])
+        ]
+    assert sorted(addresses) == [
+        "10.99.0.1/32",
+        "10.99.0.101/32",
+        "10.99.0.102/32",
+        "10.99.0.11/32",
+        "10.99.0.111/32",
+        "10.99.0.112/32",
+        "10.99.0.12/32",
+        "10.99.0.2/32",
+    ]
+
+    # All of the Circuits of a Device.
+    with django_assert_num_queries(1):
+        addresses = models.Circuit.objects.addresses_for(device.circuits)
+        assert addresses.count() == 12
+
+
+def test_device_circuits(device, django_assert_num_queries):
+    """Test looking up the Circuits of Devices."""
+    site = device.site
+    other = models.Device.objects.create(site=site, hostname="foo-bar2")
+    lonely = models.Device.objects.create(site=site, hostname="foo-bar3")
+    circuits = []
+    for i in range(5):
+        circuits.append(
+            models.Circuit.objects.create(
+                endpoint_a=models.Interface.objects.create(
+                    device=device, name=f"eth{i}"
+                ),
+                endpoint_z=models.Interface.objects.create(
+                    device=other, name=f"eth{i}"
+                ),
+            )
+        )
+    loopback = models.Circuit.objects.create(
+        endpoint_a=models.Interface.objects.create(device=device, name="lo0"),
+        endpoint_z=models.Interface.objects.create(device=device, name="lo1"),
+    )
+    models.Interface.objects.create(device=device, name="eth9")
+
+    # One query, no matter how many interfaces, including the endpoints.
+    with django_assert_num_queries(1):
+        result = list(device.circuits)
+        assert [c.endpoint_a.name for c in result] == [
+            *(f"eth{i}" for i in range(5)),
+            "lo0",
+        ]
+    assert list(other.circuits) == circuits
+    assert list(lonely.circuits) == []
+
+    # Many devices at once.
+    with django_assert_num_queries(1):
+        by_device = models.Circuit.objects.by_device([device, other, lonely])
+    assert by_device == {
+        device.id: [*circuits, loopback],
+        other.id: circuits,
+        lonely.id: [],
+    }
+
+
 def test_attributes(circuit):
     """Test that attributes work as expected."""
     models.Attribute.objects.create(
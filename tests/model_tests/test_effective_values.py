@@ -0,0 +1,113 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from nsot import models
+
+
+def effective(obj, name):
+    """Return (source_id, sorted values) of ``obj``'s effective ``name``."""
+    rows = obj.effective_values.filter(name=name)
+    values = sorted(rows.values_list("value", flat=True))
+    if not values:
+        return None
+    return rows.first().source_id, values
+
+
+def make_network(site, cidr, **attributes):
+    network = models.Network.objects.create(site=site, cidr=cidr)
+    if attributes:
+        network.set_attributes(attributes, partial=True)
+    return network
+
+
+@pytest.fixture
+def region(site):
+    return models.Attribute.objects.create(
+        site=site, resource_name="Network", name="region", inheritable=True
+    )
+
+
+def test_inherited_down_tree(site, region):
+    root = make_network(site, "10.0.0.0/8", region="us-west")
+    child = make_network(site, "10.1.0.0/16")
+    ip = make_network(site, "10.1.0.1/32")
+
+    assert effective(root, "region") == (root.id, ["us-west"])
+    assert effective(child, "region") == (root.id, ["us-west"])
+    assert effective(ip, "region") == (root.id, ["us-west"])
+
+    # An override applies to its own subtree only.
+    child.set_attributes({"region": "us-east"}, partial=True)
+    assert effective(child, "region") == (child.id, ["us-east"])
+    assert effective(ip, "region") == (child.id, ["us-east"])
+    assert effective(root, "region") == (root.id, ["us-west"])
+
+    # Removing the override inherits again.
+    child.set_attributes({"region": None}, partial=True)
+    assert effective(ip, "region") == (root.id, ["us-west"])
+
+    assert child.get_merged_attributes() == {
+        "region": {
+            "value": "us-west",
+            "source": "10.0.0.0/8",
+            "inherited": True,
+        }
+    }
+
+
+def test_hierarchy_changes(site, region):
+    root = make_network(site, "10.0.0.0/8", region="us-west")
+    ip = make_network(site, "10.1.0.1/32")
+    assert effective(ip, "region") == (root.id, ["us-west"])
+
+    # Inserting a new supernet with its own value reparents the IP.
+    middle = make_network(site, "10.1.0.0/16", region="us-east")
+    assert effective(ip, "region") == (middle.id, ["us-east"])
+
+    # Deleting it moves the IP back under the root.
+    middle.delete(force_delete=True)
+    assert effective(ip, "region") == (root.id, ["us-west"])
+
+    # Deleting a resource removes its rows.
+    ip_id = ip.id
+    ip.delete()
+    assert not models.EffectiveValue.objects.filter(resource_id=ip_id).exists()
+
+
+def test_inheritable_toggle(site):
+    attr = models.Attribute.objects.create(
+        site=site, resource_name="Network", name="owner"
+    )
+    root = make_network(site, "10.0.0.0/8", owner="jathan")
+    child = make_network(site, "10.1.0.0/16")
+    assert effective(child, "owner") is None
+
+    attr.inheritable = True
+    attr.save()
+    assert effective(child, "owner") == (root.id, ["jathan"])
+
+    attr.inheritable = False
+    attr.save()
+    assert effective(child, "owner") is None
+    assert effective(root, "owner") is None
+
+
+def test_interface_reparent(site):
+    models.Attribute.objects.create(
+        site=site, resource_name="Interface", name="vlan", inheritable=True
+    )
+    device = models.Device.objects.create(site=site, hostname="foo-bar1")
+    ae0 = models.Interface.objects.create(device=device, name="ae0")
+    ae0.set_attributes({"vlan": "100"})
+    ae1 = models.Interface.objects.create(device=device, name="ae1")
+    ae1.set_attributes({"vlan": "200"})
+    eth0 = models.Interface.objects.create(
+        device=device, name="eth0", parent=ae0
+    )
+    assert effective(eth0, "vlan") == (ae0.id, ["100"])
+
+    eth0.parent = ae1
+    eth0.save()
+    assert effective(eth0, "vlan") == (ae1.id, ["200"])
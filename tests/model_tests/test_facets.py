@@ -0,0 +1,74 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from nsot import models
+
+
+@pytest.fixture
+def devices(site):
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="role"
+    )
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="tags", multi=True
+    )
+    return [
+        models.Device.objects.create(
+            site=site, hostname=hostname, attributes=attributes
+        )
+        for hostname, attributes in [
+            ("spine1", {"role": "spine", "tags": ["a", "b"]}),
+            ("spine2", {"role": "spine", "tags": ["a"]}),
+            ("leaf1", {"role": "leaf"}),
+        ]
+    ]
+
+
+def test_facets(site, devices):
+    facets = models.Device.objects.site_facets(site.id)
+    assert facets == {
+        "role": [
+            {"value": "spine", "count": 2},
+            {"value": "leaf", "count": 1},
+        ],
+        "tags": [
+            {"value": "a", "count": 2},
+            {"value": "b", "count": 1},
+        ],
+    }
+
+    facets = models.Device.objects.site_facets(
+        site.id, names=["tags"], query="role=spine -tags=b"
+    )
+    assert facets == {"tags": [{"value": "a", "count": 1}]}
+
+
+def test_facets_cached(site, devices, cache, django_assert_num_queries):
+    spine1, spine2, leaf1 = devices
+
+    def role_counts():
+        facets = models.Device.objects.site_facets(site.id, names=["role"])
+        return {f["value"]: f["count"] for f in facets["role"]}
+
+    assert role_counts() == {"spine": 2, "leaf": 1}
+    with django_assert_num_queries(0):
+        assert role_counts() == {"spine": 2, "leaf": 1}
+
+    # Unrelated attribute changes don't invalidate the cached result.
+    spine1.set_attributes({"tags": ["c"]}, partial=True)
+    with django_assert_num_queries(0):
+        assert role_counts() == {"spine": 2, "leaf": 1}
+
+    # Related changes, creation and deletion do.
+    leaf1.set_attributes({"role": "spine"}, partial=True)
+    assert role_counts() == {"spine": 3}
+
+    models.Device.objects.create(
+        site=site, hostname="leaf2", attributes={"role": "leaf"}
+    )
+    assert role_counts() == {"spine": 3, "leaf": 1}
+
+    spine2.delete()
+    assert role_counts() == {"spine": 2, "leaf": 1}
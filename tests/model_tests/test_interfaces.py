@@ -6,6 +6,7 @@ pytestmark = pytest.mark.django_db
 from django.conf import settings
 
 from nsot import exc, models
+from nsot.models import interface as interface_module
 
 
 def test_creation(device):
@@ -63,6 +64,50 @@ def test_tree_methods(device):
     assert siblings == expected
 
 
+def test_tree_queries(device, django_assert_num_queries):
+    iface = models.Interface.objects.create(device=device, name="eth0")
+    iface1 = models.Interface.objects.create(
+        device=device, name="eth0.0", parent=iface
+    )
+    iface2 = models.Interface.objects.create(
+        device=device, name="eth0.1", parent=iface1
+    )
+    iface3 = models.Interface.objects.create(
+        device=device, name="eth0.2", parent=iface2
+    )
+    other = models.Interface.objects.create(device=device, name="eth1")
+
+    # Traversals don't take more queries for deeper trees. Ancestors are
+    # nearest first, ordered by the depth found walking up the tree.
+    with django_assert_num_queries(2):
+        assert list(iface3.get_ancestors()) == [iface2, iface1, iface]
+    with django_assert_num_queries(1):
+        assert iface3.get_root() == iface
+    with django_assert_num_queries(1):
+        assert set(iface.get_descendants()) == {iface1, iface2, iface3}
+
+    # Batch variants.
+    objects = models.Interface.objects
+    assert set(objects.ancestors_of([iface2, other])) == {iface, iface1}
+    assert set(
+        objects.descendants_of(objects.filter(id__in=[iface2.id, other.id]))
+    ) == {iface3}
+    assert set(objects.descendants_of([iface2], include_self=True)) == {
+        iface2,
+        iface3,
+    }
+    assert objects.get_root_ids([iface3, iface1, other]) == {
+        iface3.id: iface.id,
+        iface1.id: iface.id,
+        other.id: other.id,
+    }
+
+    # An Interface can't become its own ancestor.
+    iface.parent = iface3
+    with pytest.raises(exc.ValidationError):
+        iface.save()
+
+
 def test_speed(device):
     """Test interface speed."""
     iface = models.Interface.objects.create(device=device, name="eth0")
@@ -156,6 +201,48 @@ def test_mac_address(device):
     assert iface.mac_address == "00:1c:73:2a:60:62"
 
 
+def test_by_mac_address(device, django_assert_num_queries):
+    """Test resolving many MAC addresses at once."""
+    models.Network.objects.create(site=device.site, cidr="10.0.0.0/8")
+    eth0 = models.Interface.objects.create(
+        device=device,
+        name="eth0",
+        mac_address="00:1c:73:2a:60:62",
+        addresses=["10.0.0.1/32"],
+    )
+    eth1 = models.Interface.objects.create(device=device, name="eth1")
+    eth2 = models.Interface.objects.create(device=device, name="eth2")
+
+    macs = [0x001C732A6062, 0, 1]
+    with django_assert_num_queries(1):
+        found = models.Interface.objects.by_mac_address(macs)
+    assert found == {
+        0x001C732A6062: [
+            {
+                "id": eth0.id,
+                "name_slug": "foo-bar1:eth0",
+                "device": device.id,
+                "device_hostname": "foo-bar1",
+                "addresses": ["10.0.0.1/32"],
+            }
+        ],
+        0: [
+            {
+                "id": iface.id,
+                "name_slug": iface.name_slug,
+                "device": device.id,
+                "device_hostname": "foo-bar1",
+                "addresses": [],
+            }
+            for iface in (eth1, eth2)
+        ],
+        1: [],
+    }
+
+    # Limited to a Site
+    assert models.Interface.objects.by_mac_address([0], site_id=0) == {0: []}
+
+
 def test_type(device):
     """Test types."""
     iface = models.Interface.objects.create(device=device, name="eth0")
@@ -327,6 +414,82 @@ def test_assign_address(device):
     assert list(iface.assignments.all()) == []
 
 
+def test_assign_addresses(device, django_assert_max_num_queries):
+    """Test assigning addresses to many interfaces at once."""
+    site = device.site
+    models.Network.objects.create(cidr="10.0.0.0/8", site=site)
+    models.Network.objects.create(cidr="10.1.1.0/24", site=site)
+    existing = models.Network.objects.create(cidr="10.1.1.1/32", site=site)
+    interfaces = [
+        models.Interface.objects.create(device=device, name=f"eth{i}")
+        for i in range(10)
+    ]
+    addresses = {
+        iface: [f"10.1.1.{i + 1}/32", f"10.2.0.{i + 1}/32"]
+        for i, iface in enumerate(interfaces)
+    }
+
+    # The number of queries doesn't depend on the number of addresses.
+    with django_assert_max_num_queries(20):
+        assert models.Interface.objects.assign_addresses(addresses) == 20
+
+    # Missing addresses are created beneath their closest parent, and end up
+    # just like addresses created one at a time and then assigned.
+    address = models.Network.objects.get_by_address("10.2.0.1/32", site=site)
+    assert address.parent.cidr == "10.0.0.0/8"
+    assert address.state == models.Network.ASSIGNED
+    other = models.Interface.objects.create(device=device, name="eth99")
+    other.assign_address("10.2.1.1/32")
+    single = models.Network.objects.get_by_address("10.2.1.1/32", site=site)
+    fields = ("parent_id", "is_ip", "ip_version", "state", "version")
+    assert [getattr(address, f) for f in fields] == [
+        getattr(single, f) for f in fields
+    ]
+    existing.refresh_from_db()
+    assert existing.state == models.Network.ASSIGNED
+
+    # Caches are stored, and the interfaces are kept up to date.
+    eth0 = interfaces[0]
+    assert eth0.get_addresses() == ["10.1.1.1/32", "10.2.0.1/32"]
+    assert eth0.get_networks() == ["10.0.0.0/8", "10.1.1.0/24"]
+    assert eth0.get_dirty_fields() == set()
+    eth0.refresh_from_db()
+    assert eth0.get_addresses() == ["10.1.1.1/32", "10.2.0.1/32"]
+
+    # Addresses already assigned to the interface are skipped.
+    assert models.Interface.objects.assign_addresses(addresses) == 0
+
+    # But addresses may only be assigned once per device, and if one can't
+    # be assigned, none of them are.
+    with pytest.raises(exc.ValidationError):
+        models.Interface.objects.assign_addresses(
+            {interfaces[0]: ["10.3.0.1/32"], interfaces[1]: ["10.1.1.1/32"]}
+        )
+    assert not models.Network.objects.filter(
+        network_address="10.3.0.1"
+    ).exists()
+
+    # Addresses need a parent.
+    with pytest.raises(exc.ValidationError):
+        models.Interface.objects.assign_addresses(
+            {interfaces[0]: ["192.168.0.1/32"]}
+        )
+
+
+def test_assign_mixed_addresses(device):
+    """Test assigning IPv4 and IPv6 addresses together."""
+    site = device.site
+    models.Network.objects.create(cidr="10.0.0.0/8", site=site)
+    models.Network.objects.create(cidr="2001:db8::/32", site=site)
+    iface = models.Interface.objects.create(
+        device=device,
+        name="eth0",
+        addresses=["10.0.0.1/32", "2001:db8::1/128"],
+    )
+    assert sorted(iface.get_addresses()) == ["10.0.0.1/32", "2001:db8::1/128"]
+    assert sorted(iface.get_networks()) == ["10.0.0.0/8", "2001:db8::/32"]
+
+
 def test_device_hostname(device):
     """Test the device_hostname convenience field"""
     intf = models.Interface.objects.create(device=device, name="eth0")
@@ -345,6 +508,48 @@ def test_device_hostname(device):
     )
 
 
+def test_device_rename(device, django_assert_max_num_queries):
+    """Renaming a Device updates its Interfaces and Circuits in bulk."""
+    for i in range(20):
+        models.Interface.objects.create(device=device, name=f"eth{i}")
+    other = models.Device.objects.create(site=device.site, hostname="other")
+    remote = models.Interface.objects.create(device=other, name="eth0")
+    local = device.interfaces.get(name="eth0")
+    circuit = models.Circuit.objects.create(
+        endpoint_a=local, endpoint_z=remote
+    )
+    named = models.Circuit.objects.create(
+        endpoint_a=device.interfaces.get(name="eth1"), name="uplink"
+    )
+
+    # Saving without renaming leaves the Interfaces alone.
+    version = local.version
+    device.save()
+    local.refresh_from_db()
+    assert local.version == version
+
+    # The number of queries doesn't depend on the number of Interfaces.
+    device.hostname = "foo-renamed"
+    with django_assert_max_num_queries(8):
+        device.save()
+
+    local.refresh_from_db()
+    assert local.device_hostname == "foo-renamed"
+    assert local.name_slug == "foo-renamed:eth0"
+    assert local.version == version + 1
+    assert (
+        models.Interface.objects.filter(device_hostname="foo-renamed").count()
+        == 20
+    )
+
+    # Default Circuit names follow the endpoints; explicit ones don't.
+    circuit.refresh_from_db()
+    assert circuit.name == "foo-renamed:eth0_other:eth0"
+    assert circuit.name_slug == circuit.name
+    named.refresh_from_db()
+    assert named.name == "uplink"
+
+
 def test_interface_networks_refresh(device):
     """Test the interface parent networks refresh upon reparenting of a
     Network object"""
@@ -368,6 +573,59 @@ def test_interface_networks_refresh(device):
     assert intf_obj.get_networks() == ["10.1.1.0/27"]
 
 
+def test_interface_networks_refresh_bulk(
+    site, django_assert_max_num_queries, django_capture_on_commit_callbacks
+):
+    """Reparenting addresses refreshes every affected Interface at once."""
+    models.Network.objects.create(cidr="10.1.0.0/16", site=site)
+    interfaces = []
+    for i in range(1, 11):
+        device = models.Device.objects.create(site=site, hostname=f"foo{i}")
+        interfaces.append(
+            models.Interface.objects.create(
+                device=device, name="eth0", addresses=[f"10.1.1.{i}/32"]
+            )
+        )
+
+    # The number of queries doesn't depend on the number of Interfaces.
+    with django_assert_max_num_queries(15):
+        models.Network.objects.create(cidr="10.1.1.0/24", site=site)
+    for interface in interfaces:
+        interface.refresh_from_db()
+        assert interface.get_networks() == ["10.1.1.0/24"]
+
+    # Deferred refreshes happen once the transaction is committed.
+    with (
+        django_capture_on_commit_callbacks(execute=True) as callbacks,
+        interface_module.deferred_address_refresh(),
+    ):
+        models.Network.objects.create(cidr="10.1.1.0/25", site=site)
+        models.Network.objects.create(cidr="10.1.1.0/26", site=site)
+        interfaces[0].refresh_from_db()
+        assert interfaces[0].get_networks() == ["10.1.1.0/24"]
+    refreshes = [
+        c for c in callbacks if "deferred_address_refresh" in c.__qualname__
+    ]
+    assert len(refreshes) == 1
+    interfaces[0].refresh_from_db()
+    assert interfaces[0].get_networks() == ["10.1.1.0/26"]
+
+
+def test_interface_networks_force_delete(site):
+    """Forcefully deleting the network of an address refreshes Interfaces."""
+    models.Network.objects.create(cidr="10.1.0.0/16", site=site)
+    network = models.Network.objects.create(cidr="10.1.1.0/24", site=site)
+    device = models.Device.objects.create(site=site, hostname="foo")
+    interface = models.Interface.objects.create(
+        device=device, name="eth0", addresses=["10.1.1.1/32"]
+    )
+    assert interface.get_networks() == ["10.1.1.0/24"]
+
+    network.delete(force_delete=True)
+    interface.refresh_from_db()
+    assert interface.get_networks() == ["10.1.0.0/16"]
+
+
 def test_network_delete_blocked_by_assignment(device):
     """Deleting a Network that has an active Interface assignment should raise
     ProtectedError."""
@@ -450,6 +708,30 @@ def test_set_addresses_overwrite_reverts_old_network_state(device):
     assert new_addr.state == models.Network.ASSIGNED
 
 
+def test_set_addresses_overwrite_keeps_assignments(device):
+    """Addresses assigned before and after an overwrite stay assigned."""
+    site = device.site
+    models.Network.objects.create(cidr="10.6.6.0/24", site=site)
+    iface = models.Interface.objects.create(device=device, name="eth0")
+    iface.set_addresses(["10.6.6.1/32", "10.6.6.2/32"])
+
+    kept = models.Network.objects.get_by_address("10.6.6.1/32", site=site)
+    assignment = kept.assignments.get()
+
+    iface.set_addresses(["10.6.6.1/32", "10.6.6.3/32"], overwrite=True)
+    assert sorted(iface.get_addresses()) == ["10.6.6.1/32", "10.6.6.3/32"]
+
+    # The kept address was never unassigned.
+    assert kept.assignments.get().id == assignment.id
+    version = kept.version
+    kept.refresh_from_db()
+    assert kept.version == version
+    assert kept.state == models.Network.ASSIGNED
+
+    removed = models.Network.objects.get_by_address("10.6.6.2/32", site=site)
+    assert removed.state == models.Network.ALLOCATED
+
+
 def test_multi_device_assignment_preserves_state(device):
     """Deleting one of two cross-device assignments should keep ASSIGNED."""
     site = device.site
@@ -5,6 +5,8 @@ pytestmark = pytest.mark.django_db
 
 import ipaddress
 
+from django.db.models.signals import post_save, pre_save
+
 from nsot import exc, models
 
 
@@ -385,3 +387,77 @@ def test_strict_allocation_3(site):
     )
     expected = [ipaddress.ip_network("2001:db8:abcd:12::8000:0/128")]
     assert parent.get_next_network(128, strict=True) == expected
+
+
+def test_state_change_saves_changed_fields(site, django_assert_num_queries):
+    parent = models.Network.objects.create(site=site, cidr="10.3.0.0/16")
+    child = models.Network.objects.create(site=site, cidr="10.3.1.0/24")
+
+    # A state change is written without recomputing the tree.
+    child = models.Network.objects.get(id=child.id)
+    with django_assert_num_queries(1):
+        child.set_reserved()
+    child.refresh_from_db()
+    assert child.state == models.Network.RESERVED
+    assert child.parent_id == parent.id
+
+    # Saving an unchanged object does nothing at all.
+    with django_assert_num_queries(0):
+        child.save()
+
+    # Invalid states are still rejected.
+    child.state = "bogus"
+    with pytest.raises(exc.ValidationError):
+        child.save()
+
+
+def test_unchanged_attributes_are_not_rewritten(site):
+    models.Attribute.objects.create(
+        site=site, resource_name="Network", name="owner"
+    )
+    network = models.Network.objects.create(site=site, cidr="10.4.0.0/16")
+    network.set_attributes({"owner": "jathan"})
+    network.save()
+    value_ids = list(network.attributes.values_list("id", flat=True))
+
+    network.set_attributes({"owner": "jathan"})
+    assert list(network.attributes.values_list("id", flat=True)) == value_ids
+
+    network.set_attributes({"owner": "gary"})
+    network.save()
+    network.refresh_from_db()
+    assert network.get_attributes() == {"owner": "gary"}
+
+
+def test_changed_fields_save_sends_signals(site):
+    network = models.Network.objects.create(site=site, cidr="10.5.0.0/16")
+    network = models.Network.objects.get(id=network.id)
+
+    sent = []
+
+    def receiver(signal, instance, update_fields, **kwargs):
+        sent.append((signal, instance, update_fields))
+
+    signals = (pre_save, post_save)
+    for signal in signals:
+        signal.connect(receiver, sender=models.Network)
+    try:
+        # Saving only the state, or nothing at all, still notifies receivers.
+        network.state = models.Network.RESERVED
+        network.save()
+        network.save()
+    finally:
+        for signal in signals:
+            signal.disconnect(receiver, sender=models.Network)
+
+    assert sent == [
+        (pre_save, network, frozenset(["state", "version"])),
+        (post_save, network, frozenset(["state", "version"])),
+        (pre_save, network, frozenset()),
+        (post_save, network, frozenset()),
+    ]
+
+    # Any other field is validated by a full save.
+    network.network_address = "bogus"
+    with pytest.raises(exc.ValidationError):
+        network.save()
@@ -96,6 +96,58 @@ class TestPartialAttributeUpdate:
         with pytest.raises(exc.ValidationError):
             device.set_attributes({"req_attr": None}, partial=True)
 
+    def test_partial_concurrent_writers(self, device_with_attrs):
+        """Writers holding stale copies don't lose each other's updates."""
+        first = models.Device.objects.get(id=device_with_attrs.id)
+        second = models.Device.objects.get(id=device_with_attrs.id)
+
+        first.set_attributes({"owner": "gary"}, partial=True)
+        first.save()
+        second.set_attributes({"role": "br"}, partial=True)
+        second.save()
+
+        device_with_attrs.refresh_from_db()
+        assert device_with_attrs.get_attributes() == {
+            "owner": "gary",
+            "metro": "lax",
+            "role": "br",
+        }
+
+    def test_version_bumped_on_change(self, device_with_attrs):
+        """The version only changes when the object does."""
+        device = models.Device.objects.get(id=device_with_attrs.id)
+        version, etag = device.version, device.etag
+
+        device.save()
+        assert device.version == version
+
+        device.set_attributes({"owner": "gary"}, partial=True)
+        device.save()
+        device.refresh_from_db()
+        assert device.version == version + 1
+        assert device.etag != etag
+
+    def test_version_bumped_without_save(self, device_with_attrs):
+        """Attributes are stored right away, and so is the version."""
+        device = models.Device.objects.get(id=device_with_attrs.id)
+        version = device.version
+
+        device.set_attributes({"owner": "gary"}, partial=True)
+        assert device.version == version + 1
+        assert "version" not in device.get_dirty_fields()
+
+        device.refresh_from_db()
+        assert device.version == version + 1
+        assert device.get_attributes()["owner"] == "gary"
+
+    def test_dirty_in_place(self, device_with_attrs):
+        """Changes made to the attributes cache in-place are detected."""
+        device = models.Device.objects.get(id=device_with_attrs.id)
+        assert device.get_dirty_fields() == set()
+
+        device._attributes_cache["owner"] = "gary"
+        assert device.get_dirty_fields() == {"_attributes_cache"}
+
 
 class TestFullAttributeUpdate:
     """set_attributes(partial=False) should still replace all (PUT behaviour)."""
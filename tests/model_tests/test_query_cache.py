@@ -0,0 +1,93 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from nsot import exc, models, util
+
+
+@pytest.fixture
+def devices(site):
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="role"
+    )
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="owner"
+    )
+    return [
+        models.Device.objects.create(
+            site=site, hostname=hostname, attributes=attributes
+        )
+        for hostname, attributes in [
+            ("spine1", {"role": "spine", "owner": "jathan"}),
+            ("spine2", {"role": "spine", "owner": "gary"}),
+            ("leaf1", {"role": "leaf", "owner": "jathan"}),
+        ]
+    ]
+
+
+def test_query_cached(site, devices, cache, django_assert_num_queries):
+    spine1, spine2, leaf1 = devices
+
+    def spines(query="role=spine"):
+        objects = models.Device.objects.cached_set_query(query, site.id)
+        return list(objects.order_by("id"))
+
+    assert spines() == [spine1, spine2]
+
+    # Cached IDs only cost the query for the objects themselves, including
+    # for equivalent queries written differently.
+    with django_assert_num_queries(1):
+        assert spines() == [spine1, spine2]
+    with django_assert_num_queries(1):
+        assert spines("  role='spine'") == [spine1, spine2]
+
+    # Changes to other attributes don't invalidate it.
+    spine1.set_attributes({"owner": "gary"}, partial=True)
+    with django_assert_num_queries(1):
+        assert spines() == [spine1, spine2]
+
+    # Changes to attributes in the query, creation and deletion do.
+    leaf1.set_attributes({"role": "spine"}, partial=True)
+    assert spines() == [spine1, spine2, leaf1]
+
+    spine3 = models.Device.objects.create(
+        site=site, hostname="spine3", attributes={"role": "spine"}
+    )
+    assert spines() == [spine1, spine2, leaf1, spine3]
+
+    spine2.delete()
+    assert spines() == [spine1, leaf1, spine3]
+
+
+def test_query_cached_errors(site, devices, cache):
+    with pytest.raises(exc.ValidationError):
+        models.Device.objects.cached_set_query("bogus=1", site.id)
+
+    for _ in range(2):
+        with pytest.raises(exc.ValidationError):
+            models.Device.objects.cached_set_query(
+                "role=spine", site.id, unique=True
+            )
+    obj = models.Device.objects.cached_set_query(
+        "role=leaf", site.id, unique=True
+    ).get()
+    assert obj.hostname == "leaf1"
+
+
+def test_generation_bumped_on_commit(
+    site, devices, cache, django_capture_on_commit_callbacks
+):
+    leaf1 = devices[2]
+    key = util.generation_key(site.id, "Device", "role")
+
+    # Results cached by other readers until the change is committed must not
+    # be reachable after it.
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        leaf1.set_attributes({"role": "spine"}, partial=True)
+    (before_commit,) = util.get_generations([key])
+
+    for callback in callbacks:
+        callback()
+    (after_commit,) = util.get_generations([key])
+    assert after_commit > before_commit
@@ -0,0 +1,107 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from nsot import models
+from nsot.models import reaper
+
+
+@pytest.fixture
+def expired():
+    return timezone.now() - timedelta(hours=1)
+
+
+def test_reap_devices(site, user, expired):
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="owner"
+    )
+    models.Network.objects.create(site=site, cidr="10.1.0.0/24")
+    device = models.Device.objects.create(
+        site=site,
+        hostname="foo-bar1",
+        expires_at=expired,
+        attributes={"owner": "jathan"},
+    )
+    interface = models.Interface.objects.create(
+        device=device, name="eth0", addresses=["10.1.0.1/32"]
+    )
+    address = interface.assignments.get().address
+    keep = models.Device.objects.create(site=site, hostname="foo-bar2")
+
+    results = reaper.reap_expired(user, chunk_size=1)
+    assert results["Device"] == (1, 0)
+    assert list(models.Device.objects.all()) == [keep]
+
+    # Dependents are gone and the address is no longer assigned.
+    assert not models.Interface.objects.exists()
+    assert not models.Assignment.objects.exists()
+    assert not models.Value.objects.exists()
+    address.refresh_from_db()
+    assert address.state == models.Network.ALLOCATED
+
+    # Only the expired Device itself is recorded.
+    change = models.Change.objects.get(event="Delete")
+    assert change.resource_name == "Device"
+    assert change.resource["hostname"] == "foo-bar1"
+    assert change.user == user
+
+
+def test_reap_networks_leaves_first(site, user, expired):
+    parent = models.Network.objects.create(
+        site=site, cidr="10.2.0.0/16", expires_at=expired
+    )
+    for cidr in ("10.2.1.0/24", "10.2.1.1/32", "10.2.2.0/24"):
+        models.Network.objects.create(site=site, cidr=cidr, expires_at=expired)
+    active = models.Network.objects.create(
+        site=site, cidr="10.3.0.0/16", expires_at=expired
+    )
+    models.Network.objects.create(site=site, cidr="10.3.1.0/24")
+
+    results = reaper.reap_expired(user, resource_names=["Network"])
+    assert results == {"Network": (4, 1)}
+    assert not models.Network.objects.filter(id=parent.id).exists()
+
+    # A Network whose children haven't expired is left alone.
+    assert models.Network.objects.filter(id=active.id).exists()
+    assert models.Network.objects.count() == 2
+
+
+def test_reap_skips_circuit_endpoints(circuit, user, expired):
+    models.Interface.objects.update(expires_at=expired)
+
+    assert reaper.reap_expired(user)["Interface"] == (0, 2)
+    assert models.Interface.objects.count() == 2
+
+    models.Circuit.objects.update(expires_at=expired)
+    results = reaper.reap_expired(user)
+    assert results["Circuit"] == (1, 0)
+    assert results["Interface"] == (2, 0)
+
+
+def test_command(site, user, expired):
+    models.Device.objects.create(
+        site=site, hostname="foo-bar1", expires_at=expired
+    )
+    out = StringIO()
+    call_command("reap", "--user", user.email, "-r", "Device", stdout=out)
+    assert out.getvalue() == "Device: 1 deleted.\n"
+    assert not models.Device.objects.exists()
+
+
+def test_command_schedule_disabled(site, user, expired):
+    models.Device.objects.create(
+        site=site, hostname="foo-bar1", expires_at=expired
+    )
+    out = StringIO()
+    call_command(
+        "reap", "--user", user.email, "--schedule", "-i", "0", stdout=out
+    )
+    assert out.getvalue() == ""
+    assert models.Device.objects.exists()
@@ -0,0 +1,132 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+
+from nsot import exc, models
+
+
+@pytest.fixture
+def attributes(site):
+    for name in ("role", "state", "owner"):
+        models.Attribute.objects.create(
+            site=site, resource_name="Device", name=name
+        )
+
+
+def make_device(site, hostname, **attributes):
+    device = models.Device.objects.create(site=site, hostname=hostname)
+    device.set_attributes(attributes)
+    device.save()
+    return device
+
+
+def test_materialized_on_create(site, attributes):
+    spine = make_device(site, "spine1", role="spine")
+    leaf = make_device(site, "leaf1", role="leaf")
+    make_device(site, "leaf2", role="leaf", state="decom")
+    make_device(site, "border1", role="border")
+
+    saved = models.SavedQuery.objects.create(
+        site=site,
+        resource_name="Device",
+        name="fabric",
+        query="role=spine +role=leaf -state=decom",
+    )
+
+    assert saved.get_member_ids() == sorted([spine.id, leaf.id])
+    assert saved.version == 1
+    assert saved.attribute_names == {"role", "state"}
+
+
+def test_attribute_names_regex(site, attributes):
+    """Only a trailing ``_regex`` is stripped from attribute names."""
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="foo_regex_bar"
+    )
+    saved = models.SavedQuery(
+        site=site,
+        resource_name="Device",
+        name="regex",
+        query="role_regex=^sp foo_regex_bar=baz",
+    )
+    assert saved.attribute_names == {"role", "foo_regex_bar"}
+
+
+def test_incremental_refresh(site, attributes):
+    spine = make_device(site, "spine1", role="spine")
+    saved = models.SavedQuery.objects.create(
+        site=site, resource_name="Device", name="spines", query="role=spine"
+    )
+    assert saved.get_member_ids() == [spine.id]
+    version = saved.version
+
+    # Unrelated attribute changes don't bump the version.
+    spine.set_attributes({"owner": "jathan"}, partial=True)
+    saved.refresh_from_db()
+    assert saved.version == version
+
+    # Relevant attribute changes update the membership.
+    spine2 = make_device(site, "spine2", role="spine")
+    saved.refresh_from_db()
+    assert saved.get_member_ids() == [spine.id, spine2.id]
+    assert saved.version == version + 1
+
+    spine.set_attributes({"role": "leaf"}, partial=True)
+    saved.refresh_from_db()
+    assert saved.get_member_ids() == [spine2.id]
+
+    # Deleted resources are removed.
+    spine2.delete()
+    saved.refresh_from_db()
+    assert saved.get_member_ids() == []
+
+
+def test_difference_matches_new_resources(site, attributes):
+    saved = models.SavedQuery.objects.create(
+        site=site, resource_name="Device", name="live", query="-state=decom"
+    )
+    assert saved.get_member_ids() == []
+
+    device = models.Device.objects.create(site=site, hostname="foo-bar1")
+    assert saved.get_member_ids() == [device.id]
+
+
+def test_query_change_refreshes(site, attributes):
+    spine = make_device(site, "spine1", role="spine")
+    leaf = make_device(site, "leaf1", role="leaf")
+    saved = models.SavedQuery.objects.create(
+        site=site, resource_name="Device", name="q", query="role=spine"
+    )
+    assert saved.get_member_ids() == [spine.id]
+
+    saved.query = "role=leaf"
+    saved.save()
+    assert saved.get_member_ids() == [leaf.id]
+
+
+def test_validation(site, attributes):
+    with pytest.raises(exc.ValidationError):
+        models.SavedQuery.objects.create(
+            site=site, resource_name="Device", name="bad", query="bogus=1"
+        )
+
+    with pytest.raises(exc.ValidationError):
+        models.SavedQuery.objects.create(
+            site=site, resource_name="Device", name="empty", query=""
+        )
+
+    with pytest.raises(exc.ValidationError):
+        models.SavedQuery.objects.create(
+            site=site, resource_name="Bogus", name="bogus", query="role=a"
+        )
+
+    models.SavedQuery.objects.create(
+        site=site, resource_name="Device", name="ok", query="role=spine"
+    )
+    with pytest.raises(DjangoValidationError):
+        models.SavedQuery.objects.create(
+            site=site, resource_name="Device", name="ok", query="role=leaf"
+        )
@@ -0,0 +1,163 @@
+import pytest
+from django.db.models.signals import pre_save
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from nsot import models
+from nsot.models import cascade, topology
+
+
+@pytest.fixture
+def devices(site):
+    return [
+        models.Device.objects.create(site=site, hostname=f"foo{i}")
+        for i in range(6)
+    ]
+
+
+def connect(a, z, name="eth0"):
+    return models.Circuit.objects.create(
+        endpoint_a=models.Interface.objects.create(
+            device=a, name=f"{name}-{z.hostname}"
+        ),
+        endpoint_z=models.Interface.objects.create(
+            device=z, name=f"{name}-{a.hostname}"
+        ),
+    )
+
+
+def test_graph(devices):
+    """Test traversing the graph of Devices connected by Circuits."""
+    # foo0 - foo1 - foo2 - foo3, foo0 = foo4 (twice), foo5 alone.
+    d = {device.hostname: device.id for device in devices}
+    c01 = connect(devices[0], devices[1])
+    c12 = connect(devices[1], devices[2])
+    c23 = connect(devices[2], devices[3])
+    c04 = connect(devices[0], devices[4])
+    c04b = connect(devices[0], devices[4], name="eth1")
+
+    # Loops and single-sided Circuits aren't edges.
+    models.Circuit.objects.create(
+        endpoint_a=models.Interface.objects.create(
+            device=devices[5], name="eth0"
+        ),
+        endpoint_z=models.Interface.objects.create(
+            device=devices[5], name="eth1"
+        ),
+    )
+    models.Circuit.objects.create(
+        endpoint_a=models.Interface.objects.create(
+            device=devices[3], name="eth9"
+        )
+    )
+
+    graph = topology.TopologyGraph.build(devices[0].site_id)
+    assert list(graph.devices) == [d[f"foo{i}"] for i in range(5)]
+
+    assert graph.neighbors(d["foo0"]) == {
+        d["foo1"]: [c01.id],
+        d["foo4"]: [c04.id, c04b.id],
+    }
+    assert graph.neighbors(d["foo2"]) == {
+        d["foo1"]: [c12.id],
+        d["foo3"]: [c23.id],
+    }
+    assert graph.neighbors(d["foo5"]) == {}
+
+    assert graph.neighborhood(d["foo0"]) == {d["foo1"]: 1, d["foo4"]: 1}
+    assert graph.neighborhood(d["foo0"], hops=2) == {
+        d["foo1"]: 1,
+        d["foo2"]: 2,
+        d["foo4"]: 1,
+    }
+    assert graph.neighborhood(d["foo4"], hops=10) == {
+        d["foo0"]: 1,
+        d["foo1"]: 2,
+        d["foo2"]: 3,
+        d["foo3"]: 4,
+    }
+    assert graph.neighborhood(d["foo5"], hops=10) == {}
+
+    assert graph.shortest_path(d["foo4"], d["foo3"]) == (
+        [d["foo4"], d["foo0"], d["foo1"], d["foo2"], d["foo3"]],
+        [c04.id, c01.id, c12.id, c23.id],
+    )
+    assert graph.shortest_path(d["foo3"], d["foo4"]) == (
+        [d["foo3"], d["foo2"], d["foo1"], d["foo0"], d["foo4"]],
+        [c23.id, c12.id, c01.id, c04.id],
+    )
+    assert graph.shortest_path(d["foo1"], d["foo1"]) == ([d["foo1"]], [])
+    assert graph.shortest_path(d["foo1"], d["foo5"]) is None
+    assert graph.shortest_path(d["foo5"], 0) is None
+
+
+def test_cached_graph(devices, cache, django_assert_num_queries):
+    """Test that graphs are cached until Circuits or Interfaces change."""
+    site_id = devices[0].site_id
+    circuit = connect(devices[0], devices[1])
+
+    with django_assert_num_queries(1):
+        graph = topology.get_graph(site_id)
+    with django_assert_num_queries(0):
+        assert topology.get_graph(site_id).devices == graph.devices
+
+    # Creating a Circuit
+    other = connect(devices[1], devices[2])
+    assert topology.get_graph(site_id).neighbors(devices[1].id) == {
+        devices[0].id: [circuit.id],
+        devices[2].id: [other.id],
+    }
+
+    # Changing the endpoints of a Circuit
+    circuit.endpoint_z = models.Interface.objects.create(
+        device=devices[3], name="eth1"
+    )
+    circuit.save()
+    assert topology.get_graph(site_id).neighbors(devices[0].id) == {
+        devices[3].id: [circuit.id]
+    }
+
+    # Moving an Interface to another Device
+    endpoint = circuit.endpoint_z
+    endpoint.device = devices[4]
+    endpoint.save()
+    assert topology.get_graph(site_id).neighbors(devices[0].id) == {
+        devices[4].id: [circuit.id]
+    }
+
+    # Saving an Interface that hasn't moved doesn't change anything.
+    topology.get_graph(site_id)
+    endpoint.description = "uplink"
+    endpoint.save()
+    with django_assert_num_queries(0):
+        topology.get_graph(site_id)
+
+    # Deleting Circuits
+    other.delete()
+    assert topology.get_graph(site_id).neighbors(devices[1].id) == {}
+    cascade.delete_cascade(models.Circuit, [circuit.id])
+    assert len(topology.get_graph(site_id).devices) == 0
+
+
+def test_cached_graph_during_save(devices, cache):
+    """Test that graphs built while an Interface is saved aren't kept."""
+    site_id = devices[0].site_id
+    circuit = connect(devices[0], devices[1])
+    topology.get_graph(site_id)
+
+    # Stands in for a reader building the graph before the row is written.
+    def build_graph(sender, instance, **kwargs):
+        topology.get_graph(site_id)
+
+    pre_save.connect(build_graph, sender=models.Interface)
+    try:
+        endpoint = circuit.endpoint_z
+        endpoint.device = devices[2]
+        endpoint.save()
+    finally:
+        pre_save.disconnect(build_graph, sender=models.Interface)
+
+    assert topology.get_graph(site_id).neighbors(devices[0].id) == {
+        devices[2].id: [circuit.id]
+    }
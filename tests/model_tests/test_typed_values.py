@@ -0,0 +1,93 @@
+import pytest
+
+# Allow everything in there to access the DB
+pytestmark = pytest.mark.django_db
+
+from nsot import exc, models
+
+
+def query(q):
+    return list(models.Device.objects.set_query(q).order_by("id"))
+
+
+@pytest.fixture
+def devices(site):
+    models.Attribute.objects.create(
+        site=site,
+        resource_name="Device",
+        name="rack_unit",
+        constraints={"type": "int"},
+    )
+    models.Attribute.objects.create(
+        site=site,
+        resource_name="Device",
+        name="mgmt_ip",
+        constraints={"type": "ip"},
+    )
+    models.Attribute.objects.create(
+        site=site, resource_name="Device", name="owner"
+    )
+    devices = []
+    for hostname, attributes in [
+        ("foo-bar1", {"rack_unit": "4", "mgmt_ip": "10.1.0.1"}),
+        ("foo-bar2", {"rack_unit": "31", "mgmt_ip": "192.168.0.1"}),
+        ("foo-bar3", {"rack_unit": "40", "mgmt_ip": "2001:db8::1"}),
+    ]:
+        device = models.Device.objects.create(site=site, hostname=hostname)
+        device.set_attributes(attributes)
+        devices.append(device)
+    return devices
+
+
+def test_comparisons(site, devices):
+    device1, device2, device3 = devices
+
+    assert query("rack_unit>30") == [device2, device3]
+    assert query("rack_unit>=31 -rack_unit>39") == [device2]
+    assert query("rack_unit<5 +rack_unit=40") == [device1, device3]
+
+    # Containment works within each address family.
+    assert query("mgmt_ip<<10.0.0.0/8") == [device1]
+    assert query("mgmt_ip<<0.0.0.0/0") == [device1, device2]
+    assert query("mgmt_ip<<2001:db8::/32") == [device3]
+
+    # Operators must match the attribute's type.
+    with pytest.raises(exc.ValidationError):
+        query("owner>3")
+    with pytest.raises(exc.ValidationError):
+        query("rack_unit<<10.0.0.0/8")
+    with pytest.raises(exc.ValidationError):
+        query("rack_unit>thirty")
+
+
+def test_typed_validation(site, devices):
+    with pytest.raises(exc.ValidationError):
+        devices[0].set_attributes({"rack_unit": "4.5"})
+    with pytest.raises(exc.ValidationError):
+        devices[0].set_attributes({"mgmt_ip": "10.0.0.0/8"})
+
+    with pytest.raises(exc.ValidationError):
+        models.Attribute.objects.create(
+            site=site,
+            resource_name="Device",
+            name="bogus",
+            constraints={"type": "date"},
+        )
+
+
+def test_retyped_values(site, devices):
+    _, device2, device3 = devices
+    owner = models.Attribute.objects.get(name="owner")
+    device2.set_attributes({"owner": "15"}, partial=True)
+    device3.set_attributes({"owner": "jathan"}, partial=True)
+
+    # Existing values are indexed when a type is added.
+    owner.constraints = {"type": "float"}
+    owner.save()
+    assert query("owner>=14.5") == [device2]
+
+    owner.constraints = {}
+    owner.save()
+    with pytest.raises(exc.ValidationError):
+        query("owner>=14.5")
+    assert not models.Value.objects.filter(value_float__isnull=False).exists()
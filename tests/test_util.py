@@ -57,6 +57,21 @@ def test_parse_set_query():
         util.parse_set_query('foo="bar')  # Unbalanced quotes
 
 
+def test_parse_set_query_operators():
+    """Comparison and containment operators are parsed into ``op``."""
+    result = util.parse_set_query(
+        "rack_unit>30 +rack_unit<=2 -peer_ip<<10.0.0.0/8 note=a<b"
+    )
+    assert result == [
+        ("intersection", "rack_unit", "30"),
+        ("union", "rack_unit", "2"),
+        ("difference", "peer_ip", "10.0.0.0/8"),
+        ("intersection", "note", "a<b"),
+    ]
+    assert [q.op for q in result] == [">", "<=", "<<", "="]
+    assert util.parse_set_query("cluster")[0].op == "="
+
+
 PARENT = "10.47.216.0/22"
 HOSTS = [
     "10.47.216.9/32",
@@ -227,6 +242,30 @@ def test_slugify():
         assert util.slugify(case) == expected
 
 
+def test_regex_literals():
+    """Test ``util.regex_literals()``."""
+    cases = [
+        (r"^spine[0-9]+\.lax", ["spine", ".lax"]),
+        ("foo(bar)?baz", ["foo", "baz"]),
+        ("ab?cde", ["cde"]),
+        ("ab{2}cd", ["cd"]),
+        (r"\dabc", ["abc"]),
+        ("x[]a]yz", ["yz"]),
+        ("[bd]r", []),
+        ("br|dr", []),
+        ("(?i)spine", []),
+        # Escapes of character codes aren't taken as literals.
+        (r"spine\x2d1", ["spine"]),
+        (r"ab\012cd", ["ab", "cd"]),
+        (r"caf\u00e9xy", ["caf", "xy"]),
+        (r"ab\U0001f600cd", ["ab", "cd"]),
+        (r"ab\N{EM DASH}cd", ["ab", "cd"]),
+        (r"(ab)\1cd", ["cd"]),
+    ]
+    for pattern, expected in cases:
+        assert util.regex_literals(pattern) == expected
+
+
 def test_slugify_interface():
     """Test ``util.slugify_interface``."""
 
@@ -249,6 +288,37 @@ def test_slugify_interface():
         util.slugify_interface(name="bogus")
 
 
+def test_mac_to_int():
+    """Test ``util.mac_to_int()``."""
+    expected = 0x001C732A6062
+    for value in (
+        "00:1c:73:2a:60:62",
+        "00-1C-73-2A-60-62",
+        "001c.732a.6062",
+        "001c:732a:6062",
+        "001c732a6062",
+        "122191241314",
+        122191241314,
+    ):
+        assert util.mac_to_int(value) == expected
+
+    # Octets may be written without leading zeros, as the field allows.
+    assert util.mac_to_int("0:1:2:3:4:5") == 0x000102030405
+
+    for value in (
+        "bogus",
+        "00:1c:73:2a:60",
+        "00_1c_73_2a_60_62",
+        "a-abbccddeeff",
+        "aabb:ccddeeff",
+        2**48,
+        -1,
+        None,
+    ):
+        with pytest.raises(ValueError, match="Invalid MAC address"):
+            util.mac_to_int(value)
+
+
 def test_get_field_attr():
     """Test ``util.get_field_attr()``."""
     model = models.Interface
@@ -264,3 +334,14 @@ def test_get_field_attr():
     assert util.get_field_attr(model, "bogus", attr_name) == ""
     assert util.get_field_attr(model, "bogus", "bogus") == ""
     assert util.get_field_attr("bogus", "bogus", "bogus") == ""
+
+
+def test_rename_set_query():
+    """Only the renamed attribute is changed, including regex terms."""
+    query = "owner=jathan +owner_regex=ga -owners=x 'owner=a b' owner"
+    assert util.rename_set_query(query, "owner", "team") == (
+        "team=jathan +team_regex=ga -owners=x 'team=a b' team"
+    )
+    assert util.parse_set_query(
+        util.rename_set_query("rack>=3 -rack<<x", "rack", "ru")
+    ) == [("intersection", "ru", "3"), ("difference", "ru", "x")]